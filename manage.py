@@ -6,7 +6,13 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meta_project.settings')
+    # The test runner gets eager Celery and in-process stand-ins for Redis
+    default_settings = 'meta_project.settings_test' if sys.argv[1:2] == ['test'] else 'meta_project.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
+
+    # Must run before Django is imported so gevent can patch the standard library
+    from meta_project.green import patch_if_enabled
+    patch_if_enabled(sys.argv)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
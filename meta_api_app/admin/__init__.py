@@ -1,10 +1,22 @@
 from django.contrib import admin
 
+from meta_api_app.admin.activity import DailyActivityAdmin
+from meta_api_app.admin.archive import ArchivedAccountAdmin
 from meta_api_app.admin.game_account import GameAccountAdmin
-from meta_api_app.models import GameAccount
+from meta_api_app.admin.guild import GuildAdmin
+from meta_api_app.admin.season import SeasonRewardRunAdmin
+from meta_api_app.admin.sharding import AccountLookupAdmin
+from meta_api_app.models import AccountLookup, ArchivedAccount, DailyActivity, GameAccount, Guild, SeasonRewardRun
+from meta_api_app.services.sharding import is_sharded
 
 admin.site.site_header = "Meta Backend Database Admin Panel"
 admin.site.site_title = "Meta Backend Database Admin Panel"
 admin.site.index_title = "Welcome to Meta Backend Database Admin Panel"
 
 admin.site.register(GameAccount, GameAccountAdmin)
+admin.site.register(Guild, GuildAdmin)
+admin.site.register(DailyActivity, DailyActivityAdmin)
+admin.site.register(SeasonRewardRun, SeasonRewardRunAdmin)
+admin.site.register(ArchivedAccount, ArchivedAccountAdmin)
+if is_sharded():
+    admin.site.register(AccountLookup, AccountLookupAdmin)
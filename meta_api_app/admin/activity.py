@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+
+class DailyActivityAdmin(admin.ModelAdmin):
+    """Read-only view of the persisted activity rollups; rows are written by the activity tasks."""
+    list_display = ['day', 'active_users', 'new_users', 'updated_at']
+    date_hierarchy = 'day'
+    exclude = ['active_bitmap', 'new_bitmap']
+    readonly_fields = ['day', 'active_users', 'new_users', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
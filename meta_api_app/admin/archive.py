@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from meta_api_app.services.archive import restore_account
+
+
+class ArchivedAccountAdmin(admin.ModelAdmin):
+    """Archived accounts are moved back by a login or the restore action, not edited here."""
+    list_display = ['id', 'username', 'email', 'reason', 'archived_at']
+    list_filter = ['reason']
+    search_fields = ['=username', '=email']
+    readonly_fields = ['id', 'username', 'email', 'reason', 'archived_at', 'data']
+    actions = ['restore_accounts']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def restore_accounts(self, request, queryset):
+        """Move the selected accounts back into the GameAccount table."""
+        restored = sum(1 for archived in queryset if restore_account(archived) is not None)
+        self.message_user(request, f"{restored} accounts restored.")
+    restore_accounts.short_description = "Restore selected accounts"
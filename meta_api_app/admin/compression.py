@@ -0,0 +1,26 @@
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from meta_project.middleware.compression import compression_stats
+
+
+def compression_stats_view(request):
+    """Compression ratio and time per algorithm, as seen by the worker serving this page."""
+    if request.method == 'POST':
+        compression_stats.reset()
+        messages.success(request, "Compression totals of this worker reset.")
+        return redirect('meta_compression_stats')
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Response compression',
+        'stats': sorted(compression_stats.snapshot().items()),
+    }
+    return TemplateResponse(request, 'admin/compression/stats.html', context)
+
+
+urlpatterns = [
+    path('', admin.site.admin_view(compression_stats_view), name='meta_compression_stats'),
+]
@@ -0,0 +1,83 @@
+from django.contrib import admin
+
+from meta_api_app.services.season import DEFAULT_SEASON_RULES
+from meta_api_app.services.sharding import shard_aliases
+
+
+class LevelRangeListFilter(admin.SimpleListFilter):
+    """
+    Filter accounts by level bucket.
+    The buckets are fixed, so no SELECT DISTINCT level is needed to render the sidebar.
+    """
+    title = 'level'
+    parameter_name = 'level_range'
+
+    # (lookup, label, lower bound inclusive, upper bound exclusive or None)
+    BUCKETS = [
+        ('1-9', '1 - 9', 1, 10),
+        ('10-24', '10 - 24', 10, 25),
+        ('25-49', '25 - 49', 25, 50),
+        ('50-99', '50 - 99', 50, 100),
+        ('100+', '100 and above', 100, None),
+    ]
+
+    def lookups(self, request, model_admin):
+        return [(lookup, label) for lookup, label, _, _ in self.BUCKETS]
+
+    def queryset(self, request, queryset):
+        for lookup, _, lower, upper in self.BUCKETS:
+            if self.value() == lookup:
+                queryset = queryset.filter(level__gte=lower)
+                if upper is not None:
+                    queryset = queryset.filter(level__lt=upper)
+                return queryset
+        return queryset
+
+
+class RankTierListFilter(admin.SimpleListFilter):
+    """
+    Filter accounts by rank tier.
+    The tiers are the season reward tiers, so no SELECT DISTINCT rank_tier is needed to render the sidebar.
+    """
+    title = 'rank tier'
+    parameter_name = 'rank_tier'
+
+    def lookups(self, request, model_admin):
+        return [(tier, tier) for tier in DEFAULT_SEASON_RULES['rewards']]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(rank_tier=self.value())
+        return queryset
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """
+    Pick the shard a sharded account changelist reads from (the first shard by default).
+    The queryset itself is switched in GameAccountAdmin.get_queryset, so the other
+    filters' choices come from the same shard.
+    """
+    title = 'shard'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        return [(shard, shard) for shard in shard_aliases()]
+
+    def choices(self, changelist):
+        # No "All" entry: one shard is listed at a time
+        current = selected_shard(self.value())
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': lookup == current,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        return queryset
+
+
+def selected_shard(value):
+    """The shard named by the `shard` changelist parameter, or the first shard."""
+    shards = shard_aliases()
+    return value if value in shards else shards[0]
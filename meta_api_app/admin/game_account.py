@@ -1,6 +1,30 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.db.models import Max, Min
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
 from django import forms
+
+from meta_api_app.admin.filters import LevelRangeListFilter, RankTierListFilter, ShardListFilter, selected_shard
+from meta_api_app.admin.paginator import EstimatedCountPaginator
 from meta_api_app.models import GameAccount
+from meta_api_app.services.export import EXPORT_FORMATS, export_chunks, resolve_fields
+from meta_api_app.services.sharding import (
+    ShardingError, account_queryset, create_account, is_sharded, require_unsharded,
+)
+from meta_api_app.tasks import bulk_account_action
+from meta_api_app.tasks.account import DAILY_BONUS_AMOUNT, apply_bulk_action, dump_filter
+from meta_api_app.tasks.dispatch import dispatch
+
+# Search terms shorter than this cannot use the trigram indexes, so they only
+# hit the prefix-searchable fields in large table mode.
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+# "Select all" bulk actions are queued as background tasks covering this many ids each
+BULK_ACTION_CHUNK_SIZE = 5000
 
 
 class GameAccountAdminForm(forms.ModelForm):
@@ -23,24 +47,42 @@ class GameAccountAdminForm(forms.ModelForm):
         if password:
             game_account.set_password(password)
 
+        # An edited stat is the new base for lazy regeneration
+        now = timezone.now()
+        if 'energy' in self.changed_data:
+            game_account.energy_updated_at = now
+        if 'health_points' in self.changed_data:
+            game_account.health_updated_at = now
+
         if commit:
             game_account.save()
         return game_account
 
 
+class GameAccountChangeList(ChangeList):
+    """Changelist that only loads the columns shown in list_display."""
+
+    def get_results(self, request):
+        # Applied here rather than in get_queryset so bulk actions still get full rows
+        self.queryset = self.queryset.only(*self.model_admin.get_changelist_only_fields(request))
+        super().get_results(request)
+
+
 class GameAccountAdmin(admin.ModelAdmin):
     form = GameAccountAdminForm
     list_display = [
         'username', 'display_name', 'character_name', 'email', 'level', 'experience_points', 
         'coins', 'gems', 'rank_tier', 'is_active', 'last_login_at'
     ]
-    search_fields = ['username', 'email', 'display_name', 'character_name', 'guild_name']
+    search_fields = ['username', 'email', 'display_name', 'character_name', 'guild__name']
     list_filter = [
         'is_active', 'level', 'rank_tier', 'created_at', 'last_login_at'
     ]
     readonly_fields = [
-        'created_at', 'updated_at', 'last_login_at', 'total_playtime_minutes'
+        'created_at', 'updated_at', 'last_login_at', 'total_playtime_minutes',
+        'energy_updated_at', 'health_updated_at', 'friends_count', 'version'
     ]
+    autocomplete_fields = ['guild']
     
     # Custom list display formatting
     def get_list_display(self, request):
@@ -55,6 +97,73 @@ class GameAccountAdmin(admin.ModelAdmin):
         ('last_login_at', admin.DateFieldListFilter),
     ]
 
+    # Large table mode (settings.ADMIN_LARGE_TABLE_MODE): estimated counts,
+    # index-backed prefix/trigram search, fixed-choice filters and narrow rows
+    large_table_search_fields = ['^username', '^email', 'display_name', 'character_name', 'guild__name']
+    large_table_list_filter = [
+        'is_active',
+        RankTierListFilter,
+        LevelRangeListFilter,
+        ('created_at', admin.DateFieldListFilter),
+        ('last_login_at', admin.DateFieldListFilter),
+    ]
+    @property
+    def show_full_result_count(self):
+        # Read per changelist so the mode can be switched without a restart (and in tests)
+        return not settings.ADMIN_LARGE_TABLE_MODE
+
+    def get_list_filter(self, request):
+        list_filter = self.large_table_list_filter if settings.ADMIN_LARGE_TABLE_MODE else self.list_filter
+        if is_sharded():
+            return [ShardListFilter, *list_filter]
+        return list_filter
+
+    def get_search_fields(self, request):
+        if not settings.ADMIN_LARGE_TABLE_MODE:
+            search_fields = self.search_fields
+        else:
+            search_term = request.GET.get('q', '').strip()
+            if len(search_term) < MIN_TRIGRAM_TERM_LENGTH:
+                search_fields = [field for field in self.large_table_search_fields if field.startswith('^')]
+            else:
+                search_fields = self.large_table_search_fields
+        if is_sharded():
+            # Guilds are on the default database and cannot be joined from a shard
+            return [field for field in search_fields if 'guild__' not in field]
+        return search_fields
+
+    def get_queryset(self, request):
+        """Sharded accounts are listed one shard at a time (the shard list filter)."""
+        queryset = super().get_queryset(request)
+        if is_sharded():
+            queryset = queryset.using(selected_shard(request.GET.get(ShardListFilter.parameter_name)))
+        return queryset
+
+    def get_object(self, request, object_id, from_field=None):
+        if not is_sharded() or from_field is not None:
+            return super().get_object(request, object_id, from_field)
+        try:
+            account_id = int(object_id)
+        except (TypeError, ValueError):
+            return None
+        return account_queryset(account_id).filter(pk=account_id).first()
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if settings.ADMIN_LARGE_TABLE_MODE:
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_changelist(self, request, **kwargs):
+        if settings.ADMIN_LARGE_TABLE_MODE:
+            return GameAccountChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_changelist_only_fields(self, request):
+        """Columns the changelist needs: the displayed fields plus the primary key."""
+        model_fields = {field.name for field in self.model._meta.concrete_fields}
+        fields = [name for name in self.get_list_display(request) if name in model_fields]
+        return [self.model._meta.pk.name, *fields]
+
     def get_fieldsets(self, request, obj=None):
         """Customizes fieldsets based on whether object is being created or modified."""
         if not obj:
@@ -73,8 +182,8 @@ class GameAccountAdmin(admin.ModelAdmin):
                 }),
                 ('Player Stats', {
                     'fields': (
-                        'health_points', 'max_health_points', 
-                        'energy', 'max_energy'
+                        'health_points', 'max_health_points', 'health_regen_per_hour',
+                        'energy', 'max_energy', 'energy_regen_per_hour'
                     ),
                     'classes': ('collapse',)
                 }),
@@ -85,7 +194,7 @@ class GameAccountAdmin(admin.ModelAdmin):
                     'classes': ('collapse',)
                 }),
                 ('Social Features', {
-                    'fields': ('friends_count', 'guild_name'),
+                    'fields': ('friends_count', 'guild'),
                     'classes': ('collapse',)
                 }),
             ]
@@ -103,8 +212,8 @@ class GameAccountAdmin(admin.ModelAdmin):
                 }),
                 ('Player Stats', {
                     'fields': (
-                        'health_points', 'max_health_points', 
-                        'energy', 'max_energy'
+                        'health_points', 'max_health_points', 'health_regen_per_hour', 'health_updated_at',
+                        'energy', 'max_energy', 'energy_regen_per_hour', 'energy_updated_at'
                     ),
                 }),
                 ('Game Progress', {
@@ -120,10 +229,10 @@ class GameAccountAdmin(admin.ModelAdmin):
                     'classes': ('collapse',)
                 }),
                 ('Social Features', {
-                    'fields': ('friends_count', 'guild_name'),
+                    'fields': ('friends_count', 'guild'),
                 }),
                 ('Timestamps', {
-                    'fields': ('last_login_at', 'created_at', 'updated_at'),
+                    'fields': ('last_login_at', 'created_at', 'updated_at', 'version'),
                     'classes': ('collapse',)
                 }),
             ]
@@ -140,33 +249,122 @@ class GameAccountAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         """Ensure password is saved correctly through admin interface."""
         # 'password' from the form is already handled in form's save method
-        # Just call the superclass method to save the model
+        if not change:
+            # Allocates the id and shard when accounts are sharded
+            create_account(obj)
+            return
         super().save_model(request, obj, form, change)
     
     # Custom actions for bulk operations
-    actions = ['reset_energy', 'add_daily_bonus', 'deactivate_accounts']
+    actions = ['reset_energy', 'add_daily_bonus', 'deactivate_accounts', 'export_ndjson', 'export_csv']
     
+    def _run_bulk_action(self, request, queryset, action):
+        """
+        Run a set-based account action. Selections spanning every matching row
+        are queued as id ranges carrying the changelist filter, so only the id
+        bounds are read in the request. Returns (accounts updated or batches queued, queued).
+        """
+        if request.POST.get('select_across') != '1':
+            return apply_bulk_action(queryset, action), False
+
+        bounds = queryset.aggregate(first_id=Min('id'), last_id=Max('id'))
+        if bounds['first_id'] is None:
+            return 0, False
+        account_filter = dump_filter(queryset)
+        batches = 0
+        for first_id in range(bounds['first_id'], bounds['last_id'] + 1, BULK_ACTION_CHUNK_SIZE):
+            last_id = min(first_id + BULK_ACTION_CHUNK_SIZE - 1, bounds['last_id'])
+            dispatch(
+                bulk_account_action, action, first_id, last_id, account_filter=account_filter, using=queryset.db
+            )
+            batches += 1
+        return batches, True
+
     def reset_energy(self, request, queryset):
         """Reset energy to maximum for selected accounts."""
-        updated = 0
-        for account in queryset:
-            account.restore_energy()
-            updated += 1
-        self.message_user(request, f'{updated} accounts had their energy restored.')
+        updated, queued = self._run_bulk_action(request, queryset, 'reset_energy')
+        if queued:
+            self.message_user(request, f'Restoring the energy of the selected accounts is queued in {updated} batches.')
+        else:
+            self.message_user(request, f'{updated} accounts had their energy restored.')
     reset_energy.short_description = "Reset energy to maximum for selected accounts"
     
     def add_daily_bonus(self, request, queryset):
         """Add daily bonus coins to selected accounts."""
-        bonus_amount = 100  # Daily bonus amount
-        updated = 0
-        for account in queryset:
-            account.add_coins(bonus_amount)
-            updated += 1
-        self.message_user(request, f'Added {bonus_amount} coins to {updated} accounts.')
+        bonus_amount = DAILY_BONUS_AMOUNT
+        updated, queued = self._run_bulk_action(request, queryset, 'add_daily_bonus')
+        if queued:
+            self.message_user(request, f'Adding {bonus_amount} coins to the selected accounts is queued in {updated} batches.')
+        else:
+            self.message_user(request, f'Added {bonus_amount} coins to {updated} accounts.')
     add_daily_bonus.short_description = "Add daily bonus (100 coins) to selected accounts"
     
     def deactivate_accounts(self, request, queryset):
         """Deactivate selected accounts."""
-        updated = queryset.update(is_active=False)
-        self.message_user(request, f'{updated} accounts were deactivated.')
-    deactivate_accounts.short_description = "Deactivate selected accounts"
\ No newline at end of file
+        updated, queued = self._run_bulk_action(request, queryset, 'deactivate_accounts')
+        if queued:
+            self.message_user(request, f'Deactivating the selected accounts is queued in {updated} batches.')
+        else:
+            self.message_user(request, f'{updated} accounts were deactivated.')
+    deactivate_accounts.short_description = "Deactivate selected accounts"
+
+    def _export_response(self, queryset, export_format, fields=None, after_id=None):
+        response = StreamingHttpResponse(
+            export_chunks(queryset, resolve_fields(fields), export_format, after_id=after_id),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="game_accounts.{export_format}"'
+        return response
+
+    def _check_export(self, request):
+        try:
+            require_unsharded("Account export")
+        except ShardingError as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+            return False
+        return True
+
+    def export_ndjson(self, request, queryset):
+        """Stream the selected accounts as NDJSON."""
+        if not self._check_export(request):
+            return None
+        return self._export_response(queryset, 'ndjson')
+    export_ndjson.short_description = "Export selected accounts (NDJSON)"
+
+    def export_csv(self, request, queryset):
+        """Stream the selected accounts as CSV."""
+        if not self._check_export(request):
+            return None
+        return self._export_response(queryset, 'csv')
+    export_csv.short_description = "Export selected accounts (CSV)"
+
+    def get_urls(self):
+        urls = [
+            path('export/', self.admin_site.admin_view(self.export_view), name='meta_api_app_gameaccount_export'),
+        ]
+        return urls + super().get_urls()
+
+    def export_view(self, request):
+        """
+        Stream every account, e.g. export/?format=csv&fields=username,level&after_id=1000&active_only=1
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            require_unsharded("Account export")
+        except ShardingError as e:
+            return HttpResponseBadRequest(str(e))
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f'Unknown format: {export_format}')
+        fields = [field.strip() for field in request.GET.get('fields', '').split(',') if field.strip()]
+        try:
+            resolve_fields(fields)
+            after_id = int(request.GET['after_id']) if request.GET.get('after_id') else None
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        queryset = GameAccount.objects.all()
+        if request.GET.get('active_only'):
+            queryset = queryset.filter(is_active=True)
+        return self._export_response(queryset, export_format, fields, after_id)
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from meta_api_app.services.guilds import recompute_guild_aggregates
+
+
+class GuildAdmin(admin.ModelAdmin):
+    list_display = ['name', 'member_count', 'total_experience', 'best_score', 'created_at']
+    search_fields = ['^name']
+    ordering = ['name']
+    # Aggregates are maintained from member changes; edit members, not these
+    readonly_fields = ['member_count', 'total_experience', 'best_score', 'created_at', 'updated_at']
+    actions = ['recompute_aggregates']
+
+    def recompute_aggregates(self, request, queryset):
+        """Rebuild member count, total XP and best score from the members."""
+        updated = recompute_guild_aggregates(list(queryset.values_list('id', flat=True)))
+        self.message_user(request, f"Aggregates recomputed for {updated} guilds.")
+    recompute_aggregates.short_description = "Recompute aggregates from members"
@@ -0,0 +1,21 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from meta_project.pagination import estimate_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate instead of COUNT(*) for large results.
+    Small results (and backends without estimates) still get an exact count.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = None
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
@@ -0,0 +1,78 @@
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from meta_project.profiling import (
+    PROFILE_HEADER, clear_flag, create_token, get_flag, get_profile, list_profiles, profiling_config, set_flag,
+)
+
+MAX_FLAG_REQUESTS = 1000
+MAX_FLAG_MINUTES = 24 * 60
+
+
+def _check_access(request):
+    # Profiles hold raw SQL and header tokens start profiling; superusers only
+    if not request.user.is_superuser:
+        raise PermissionDenied
+
+
+def _positive_int(value, default, maximum):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def profile_list_view(request):
+    """Buffered request profiles, the admin flag and header token issuing."""
+    _check_access(request)
+    config = profiling_config()
+    token = None
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        if action == 'set_flag':
+            prefix = request.POST.get('path_prefix', '').strip() or '/'
+            max_requests = _positive_int(request.POST.get('max_requests'), 10, MAX_FLAG_REQUESTS)
+            minutes = _positive_int(request.POST.get('minutes'), 10, MAX_FLAG_MINUTES)
+            set_flag(prefix, max_requests, minutes)
+            messages.success(request, f"Profiling the next {max_requests} requests under {prefix} for {minutes} minutes.")
+        elif action == 'clear_flag':
+            clear_flag()
+            messages.success(request, "Profiling flag cleared.")
+        elif action == 'create_token':
+            token = create_token(request.user.get_username())
+        if token is None:
+            return redirect('meta_profiling_list')
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'profiles': list_profiles(),
+        'flag': get_flag(),
+        'config': config,
+        'header': PROFILE_HEADER,
+        'token': token,
+    }
+    return TemplateResponse(request, 'admin/profiling/profile_list.html', context)
+
+
+def profile_detail_view(request, profile_id):
+    _check_access(request)
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise Http404('Profile not found; it may have been overwritten.')
+    context = {
+        **admin.site.each_context(request),
+        'title': f"Profile {profile_id}: {profile['method']} {profile['path']}",
+        'profile': profile,
+    }
+    return TemplateResponse(request, 'admin/profiling/profile_detail.html', context)
+
+
+urlpatterns = [
+    path('', admin.site.admin_view(profile_list_view), name='meta_profiling_list'),
+    path('<int:profile_id>/', admin.site.admin_view(profile_detail_view), name='meta_profiling_detail'),
+]
@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+
+class SeasonRewardRunAdmin(admin.ModelAdmin):
+    """Read-only progress of the season reward jobs; rows are written by manage.py season_rewards."""
+    list_display = ['season', 'status', 'last_id', 'max_id', 'processed_accounts', 'started_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'season', 'rules', 'status', 'max_id', 'last_id', 'processed_accounts', 'started_at', 'updated_at', 'finished_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+
+class AccountLookupAdmin(admin.ModelAdmin):
+    """Read-only view of the account shard index; rows are written by registration and manage.py rebalance_shards."""
+    list_display = ['id', 'username', 'email', 'shard', 'updated_at']
+    list_filter = ['shard']
+    search_fields = ['^username', '^email']
+    show_full_result_count = False
+    readonly_fields = ['id', 'username', 'email', 'shard', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
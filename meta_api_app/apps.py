@@ -4,4 +4,9 @@ from django.apps import AppConfig
 class MetaApiAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'meta_api_app'
-    verbose_name = 'Meta Backend APIs'
\ No newline at end of file
+    verbose_name = 'Meta Backend APIs'
+
+    def ready(self):
+        from meta_api_app import signals  # noqa: F401
+        # Load the Celery app with Django so shared_task binds to it
+        from meta_project.celery import app  # noqa: F401
@@ -1,6 +1,7 @@
 import datetime
 import logging
 import traceback
+import uuid
 
 import jwt
 from django.conf import settings
@@ -11,6 +12,8 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from meta_api_app.jwt_keys import decode_token, encode_token
+from meta_api_app.services.tokens import revoked_jtis, validate
 from meta_api_app.models import GameAccount
 
 logger = logging.getLogger(__name__)
@@ -49,7 +52,8 @@ class MetaJWTAuthentication(JWTAuthentication):
             logger.debug(f"MetaJWTAuthentication token: {token}")
 
             try:
-                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'], options={'verify_iat': False})
+                # Cached decode plus the revocation check (meta_api_app/services/tokens.py)
+                payload = validate(token)
                 logger.debug(f"MetaJWTAuthentication payload decoded successfully")
             except Exception as e:
                 logger.error(f"JWT decode error: {str(e)}")
@@ -83,12 +87,14 @@ class MetaJWTAuthentication(JWTAuthentication):
     @staticmethod
     def authenticate_refresh_token(refresh_token):
         try:
-            payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=['HS256'])
+            payload = decode_token(refresh_token)
 
             logger.debug(f"MetaJWTAuthentication payload: {payload}")
 
             if not payload.get('refresh'):
                 raise AuthenticationFailed('Invalid refresh token')
+            if revoked_jtis([payload]):
+                raise AuthenticationFailed('Refresh token revoked')
 
             username = payload.get('username')
             day = payload.get('day')
@@ -177,6 +183,7 @@ class MetaJWTAuthentication(JWTAuthentication):
             'user_id': username,
             'exp': int((now + datetime.timedelta(days=1)).timestamp()),
             'iat': int(now.timestamp()),
+            'jti': uuid.uuid4().hex,
         }
 
         refresh_payload = {
@@ -187,12 +194,13 @@ class MetaJWTAuthentication(JWTAuthentication):
             'user_id': username,
             'exp': int((now + datetime.timedelta(days=7)).timestamp()),
             'iat': int(now.timestamp()),
+            'jti': uuid.uuid4().hex,
             'refresh': True
         }
 
-        # Create access and refresh tokens
-        access_token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
-        refresh_token = jwt.encode(refresh_payload, settings.SECRET_KEY, algorithm='HS256')
+        # Create access and refresh tokens (HS256, or EdDSA/ES256 with a kid header, see jwt_keys.py)
+        access_token = encode_token(payload)
+        refresh_token = encode_token(refresh_payload)
 
         logger.debug(f"access_token: {access_token}")
         logger.debug(f"refresh_token: {refresh_token}")
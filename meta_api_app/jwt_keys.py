@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+except ImportError:  # Optional dependency, only needed for EdDSA/ES256 signing
+    serialization = ec = ed25519 = None
+
+logger = logging.getLogger(__name__)
+
+SYMMETRIC_ALGORITHM = 'HS256'
+ASYMMETRIC_ALGORITHMS = ('EdDSA', 'ES256')
+DEFAULT_KEYS_DIR = 'jwt_keys'
+DEFAULT_JWKS_MAX_AGE = 300
+# Refresh tokens are the longest-lived tokens; a retired key is kept published until they expire
+MAX_TOKEN_LIFETIME = timedelta(days=7)
+# Seconds between checks of the keys directory for rotated keys
+RELOAD_INTERVAL = 30
+KID_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def jwt_config():
+    config = getattr(settings, 'META_JWT', {})
+    return {
+        'algorithm': config.get('algorithm', SYMMETRIC_ALGORITHM),
+        'accept_hs256': config.get('accept_hs256', True),
+        'keys_dir': os.path.join(settings.BASE_DIR, config.get('keys_dir', DEFAULT_KEYS_DIR)),
+        'jwks_max_age': config.get('jwks_max_age', DEFAULT_JWKS_MAX_AGE),
+    }
+
+
+def _require_cryptography():
+    if serialization is None:
+        raise ImproperlyConfigured("EdDSA/ES256 JWT signing requires the 'cryptography' package.")
+
+
+def kid_created_at(kid):
+    """Creation time encoded in a generated kid; hand-named keys count as old."""
+    try:
+        return datetime.strptime(kid.split('-')[0], KID_FORMAT).replace(tzinfo=dt_timezone.utc)
+    except ValueError:
+        return datetime.min.replace(tzinfo=dt_timezone.utc)
+
+
+class SigningKey:
+    def __init__(self, kid, private_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = 'EdDSA'
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(private_key.curve, ec.SECP256R1):
+            self.algorithm = 'ES256'
+        else:
+            raise ImproperlyConfigured(f"JWT key {kid}: only Ed25519 and P-256 keys are supported.")
+        self.created_at = kid_created_at(kid)
+
+    def jwk(self):
+        algorithm = jwt.get_algorithm_by_name(self.algorithm)
+        return {**algorithm.to_jwk(self.public_key, as_dict=True), 'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'}
+
+
+class KeyRing:
+    """
+    Signing keys loaded from `<keys_dir>/<kid>.pem`.
+
+    Every key is accepted for verification and published in the JWKS. A new
+    key only starts signing once it has been published for two JWKS cache
+    lifetimes, so verifiers that cache the JWKS already know its kid.
+    """
+
+    def __init__(self, keys, jwks_max_age):
+        self.keys = {key.kid: key for key in keys}
+        self.jwks_max_age = jwks_max_age
+        self.jwks_body = json.dumps({'keys': [key.jwk() for key in self.sorted_keys()]}).encode()
+
+    @classmethod
+    def load(cls, keys_dir, jwks_max_age):
+        keys = []
+        if os.path.isdir(keys_dir):
+            pem_files = [name for name in os.listdir(keys_dir) if name.endswith('.pem')]
+            if pem_files:
+                _require_cryptography()
+            for name in pem_files:
+                with open(os.path.join(keys_dir, name), 'rb') as f:
+                    private_key = serialization.load_pem_private_key(f.read(), password=None)
+                keys.append(SigningKey(name[:-len('.pem')], private_key))
+        return cls(keys, jwks_max_age)
+
+    def sorted_keys(self):
+        return sorted(self.keys.values(), key=lambda key: (key.created_at, key.kid))
+
+    def active(self, now=None):
+        """Newest key that has been published long enough, else the oldest one."""
+        keys = self.sorted_keys()
+        if not keys:
+            return None
+        now = now or datetime.now(dt_timezone.utc)
+        publish_delay = timedelta(seconds=2 * self.jwks_max_age)
+        published = [key for key in keys if key.created_at + publish_delay <= now]
+        return published[-1] if published else keys[0]
+
+    def retired(self, now=None):
+        """Keys whose successor has been signing for longer than any token lives."""
+        now = now or datetime.now(dt_timezone.utc)
+        active = self.active(now)
+        if active is None:
+            return []
+        publish_delay = timedelta(seconds=2 * self.jwks_max_age)
+        cutoff = now - MAX_TOKEN_LIFETIME - publish_delay
+        return [key for key in self.sorted_keys() if key.created_at < active.created_at and active.created_at < cutoff]
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+_keyring = None
+_keyring_state = None
+_keyring_checked = 0.0
+_keyring_lock = threading.Lock()
+
+
+def _keys_dir_state(keys_dir):
+    try:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns) for entry in os.scandir(keys_dir) if entry.name.endswith('.pem')
+        ))
+    except FileNotFoundError:
+        return ()
+
+
+def get_keyring():
+    """Process-wide key ring, reloaded when the keys directory changes (checked every RELOAD_INTERVAL s)."""
+    global _keyring, _keyring_state, _keyring_checked
+    if _keyring is not None and time.monotonic() - _keyring_checked < RELOAD_INTERVAL:
+        return _keyring
+    with _keyring_lock:
+        if _keyring is not None and time.monotonic() - _keyring_checked < RELOAD_INTERVAL:
+            return _keyring
+        config = jwt_config()
+        state = _keys_dir_state(config['keys_dir'])
+        if _keyring is None or state != _keyring_state:
+            _keyring = KeyRing.load(config['keys_dir'], config['jwks_max_age'])
+            _keyring_state = state
+            logger.info(f"Loaded JWT signing keys: {', '.join(_keyring.keys) or 'none'}")
+        _keyring_checked = time.monotonic()
+        return _keyring
+
+
+def reset_keyring():
+    global _keyring, _keyring_state
+    with _keyring_lock:
+        _keyring = None
+        _keyring_state = None
+
+
+def generate_key(keys_dir, algorithm):
+    """Write a new private key as `<kid>.pem` (owner-readable only) and return its kid."""
+    _require_cryptography()
+    if algorithm == 'EdDSA':
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == 'ES256':
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+    kid = f"{datetime.now(dt_timezone.utc).strftime(KID_FORMAT)}-{algorithm.lower()}"
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    os.makedirs(keys_dir, mode=0o700, exist_ok=True)
+    fd = os.open(os.path.join(keys_dir, f'{kid}.pem'), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(pem)
+    return kid
+
+
+def encode_token(payload):
+    """Sign with the active asymmetric key (kid header) when configured, otherwise HS256."""
+    config = jwt_config()
+    if config['algorithm'] == SYMMETRIC_ALGORITHM:
+        return jwt.encode(payload, settings.SECRET_KEY, algorithm=SYMMETRIC_ALGORITHM)
+    key = get_keyring().active()
+    if key is None:
+        raise ImproperlyConfigured(
+            f"META_JWT algorithm is {config['algorithm']} but {config['keys_dir']} has no keys "
+            "(run `manage.py rotate_jwt_keys`)."
+        )
+    return jwt.encode(payload, key.private_key, algorithm=key.algorithm, headers={'kid': key.kid})
+
+
+def decode_token(token, **kwargs):
+    """
+    Verify a token signed with either a published key (by kid) or, while
+    `accept_hs256` is on, the shared HS256 secret. The algorithm comes from
+    the key, never from the token header alone.
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get('alg')
+    if algorithm == SYMMETRIC_ALGORITHM:
+        if not jwt_config()['accept_hs256']:
+            raise jwt.InvalidAlgorithmError("HS256 tokens are no longer accepted")
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[SYMMETRIC_ALGORITHM], **kwargs)
+    key = get_keyring().get(header.get('kid'))
+    if key is None:
+        raise jwt.InvalidTokenError(f"Unknown signing key: {header.get('kid')}")
+    return jwt.decode(token, key.public_key, algorithms=[key.algorithm], **kwargs)
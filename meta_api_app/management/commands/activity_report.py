@@ -0,0 +1,45 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from meta_api_app.services.activity import get_activity_tracker
+
+RETENTION_OFFSETS = (1, 7, 30)
+
+
+class Command(BaseCommand):
+    help = "Report DAU/WAU/MAU and cohort retention from the daily activity bitmaps."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--day', default=None, help="Report day (YYYY-MM-DD, default: today).")
+        parser.add_argument('--persist', action='store_true', help="Snapshot the day's bitmaps into DailyActivity first.")
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options['day']) if options['day'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f"Invalid --day: {options['day']}")
+
+        tracker = get_activity_tracker()
+        if options['persist']:
+            tracker.hydrate([day])
+            tracker.persist([day])
+
+        started = time.perf_counter()
+        summary = tracker.summary(day)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(self.style.SUCCESS(f"Activity for {day} ({elapsed:.1f} ms)"))
+        for name, value in summary.items():
+            self.stdout.write(f"  {name.upper():<4} {value}")
+
+        self.stdout.write(self.style.SUCCESS("\nRetention of cohorts returning on this day"))
+        for offset in RETENTION_OFFSETS:
+            cohort_day = day - timedelta(days=offset)
+            result = tracker.retention(cohort_day, offset)
+            rate = f"{result['rate']:.1%}" if result['rate'] is not None else "n/a"
+            self.stdout.write(
+                f"  day-{offset:<3} cohort {cohort_day}: {result['retained']}/{result['cohort']} ({rate})"
+            )
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from meta_api_app.models import GameAccount
+from meta_api_app.services.archive import (
+    archive_cold_accounts, cold_accounts, hot_table_sizes, lookup_latency,
+)
+from meta_api_app.services.sharding import ShardingError, require_unsharded
+
+
+class Command(BaseCommand):
+    help = (
+        "Move deactivated and long-idle accounts to the archive table in batches and report "
+        "the hot table's index sizes and login lookup latency before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-days', type=int, default=settings.META_ARCHIVE_IDLE_DAYS,
+                            help="Archive accounts without a login for this many days.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Accounts moved per transaction.")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many accounts.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the accounts that would be archived.")
+        parser.add_argument('--compact', action='store_true',
+                            help="Rebuild the hot table's indexes afterwards (PostgreSQL REINDEX CONCURRENTLY, SQLite VACUUM).")
+        parser.add_argument('--samples', type=int, default=200, help="Accounts sampled for the lookup latency.")
+
+    def handle(self, *args, **options):
+        if options['idle_days'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--idle-days and --batch-size must be positive.")
+        try:
+            require_unsharded("Account archiving")
+        except ShardingError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            cold = cold_accounts(options['idle_days']).count()
+            total = GameAccount.objects.count()
+            self.stdout.write(self.style.SUCCESS(
+                f"{cold} of {total} accounts would be archived (idle for {options['idle_days']} days or deactivated)"
+            ))
+            return
+
+        before_sizes = hot_table_sizes()
+        before_latency = lookup_latency(options['samples'])
+
+        started = time.perf_counter()
+        archived = archive_cold_accounts(
+            options['idle_days'], options['batch_size'], options['limit'], progress=self._progress(started)
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} accounts in {elapsed:.1f}s"))
+
+        if options['compact'] and archived:
+            self._compact()
+
+        self._report_sizes(before_sizes, hot_table_sizes(), options['compact'])
+        after_latency = lookup_latency(options['samples'])
+        if before_latency and after_latency:
+            self.stdout.write(
+                f"Login lookup: mean {before_latency['mean']:.0f} -> {after_latency['mean']:.0f} us, "
+                f"p95 {before_latency['p95']:.0f} -> {after_latency['p95']:.0f} us"
+            )
+
+    def _compact(self):
+        table = connection.ops.quote_name(GameAccount._meta.db_table)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"REINDEX TABLE CONCURRENTLY {table}")
+            elif connection.vendor == 'sqlite':
+                cursor.execute("VACUUM")
+
+    def _report_sizes(self, before, after, compacted):
+        if not before:
+            self.stdout.write("Index sizes are not available on this database.")
+            return
+        if connection.vendor == 'postgresql' and not compacted:
+            self.stdout.write("Freed index pages are reused, not returned; run with --compact to shrink the indexes.")
+        self.stdout.write(f"  {'relation':<48} {'before':>12} {'after':>12}")
+        for name in sorted(before):
+            self.stdout.write(f"  {name:<48} {before[name]:>12,} {after.get(name, 0):>12,}")
+        self.stdout.write(f"  {'total':<48} {sum(before.values()):>12,} {sum(after.values()):>12,}")
+
+    def _progress(self, started):
+        def report(archived, last_id):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {archived} archived, up to id {last_id} "
+                f"({archived / elapsed if elapsed else 0:.0f} accounts/s)"
+            )
+        return report
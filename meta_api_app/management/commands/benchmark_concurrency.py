@@ -0,0 +1,111 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SERVER_COMMANDS = {
+    # Django's threaded server: one OS thread per in-flight request
+    'sync': ['runserver', '--noreload'],
+    'gevent': ['rungevent'],
+}
+
+
+class Command(BaseCommand):
+    help = "Compare throughput and latency of the sync (threaded) and gevent servers under concurrent load."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['sync', 'gevent', 'both'], default='both')
+        parser.add_argument('--path', default='/health/', help="Request path to load.")
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--body', default='', help="JSON request body.")
+        parser.add_argument('--header', action='append', default=[], help="Extra 'Name: value' header (repeatable).")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--port', type=int, default=9811)
+
+    def handle(self, *args, **options):
+        modes = ['sync', 'gevent'] if options['mode'] == 'both' else [options['mode']]
+        for mode in modes:
+            process = self._start_server(mode, options['port'])
+            try:
+                timings, errors, elapsed = self._load(options)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+            self._report(mode, timings, errors, elapsed)
+
+    def _start_server(self, mode, port):
+        env = dict(os.environ, META_SERVER_MODE=mode)
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        process = subprocess.Popen(
+            [sys.executable, manage_py, *SERVER_COMMANDS[mode], f'127.0.0.1:{port}'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"{mode} server did not start on port {port}")
+
+    def _load(self, options):
+        headers = {'Host': 'localhost', 'Content-Type': 'application/json'}
+        for header in options['header']:
+            name, _, value = header.partition(':')
+            headers[name.strip()] = value.strip()
+
+        remaining = iter(range(options['requests']))
+        lock = threading.Lock()
+        timings = []
+        errors = []
+
+        def worker():
+            connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                start = time.perf_counter()
+                try:
+                    connection.request(options['method'], options['path'], body=options['body'] or None, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status < 500
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    (timings if ok else errors).append(elapsed)
+            connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors, time.perf_counter() - start
+
+    def _report(self, mode, timings, errors, elapsed):
+        if not timings:
+            self.stdout.write(self.style.ERROR(f"{mode:>6}: no successful requests ({len(errors)} errors)"))
+            return
+        ordered = sorted(timings)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        self.stdout.write(
+            f"{mode:>6}: {len(timings) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(timings) * 1000:7.1f} ms  p99 {p99 * 1000:7.1f} ms  "
+            f"errors {len(errors)}"
+        )
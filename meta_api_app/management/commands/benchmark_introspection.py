@@ -0,0 +1,59 @@
+import json
+import logging
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.services.tokens import decode_cache
+
+INTROSPECT_PATH = '/api/token/introspect/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure token introspection throughput: one request per token versus batched calls, "
+        "with a cold and a warm decode cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=2000, help="Number of distinct tokens to validate.")
+        parser.add_argument('--batch-size', type=int, default=100, help="Tokens per introspection call.")
+
+    def handle(self, *args, **options):
+        if options['tokens'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--tokens and --batch-size must be positive.")
+        tokens = [
+            MetaJWTAuthentication._create_tokens(f'player{i}', 'monday', 'may', f'{i % 10 ** 8:08d}')['access']
+            for i in range(options['tokens'])
+        ]
+        caller = MetaJWTAuthentication._create_tokens('server', 'monday', 'may', '12345678')['access']
+        factory = RequestFactory(HTTP_HOST='localhost', HTTP_AUTHORIZATION=f'Bearer {caller}')
+        handler = BaseHandler()
+        handler.load_middleware()
+
+        def call(batch):
+            request = factory.post(INTROSPECT_PATH, json.dumps({'tokens': batch}), content_type='application/json')
+            response = handler.get_response(request)
+            if response.status_code != 200:
+                raise CommandError(f"Introspection returned {response.status_code}: {response.content[:200]!r}")
+
+        logging.disable(logging.WARNING)
+        try:
+            for label, batch_size in (('per token', 1), (f'batch {options["batch_size"]}', options['batch_size'])):
+                for cache_state in ('cold', 'warm'):
+                    if cache_state == 'cold':
+                        decode_cache.clear()
+                    started = time.perf_counter()
+                    for start in range(0, len(tokens), batch_size):
+                        call(tokens[start:start + batch_size])
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label:>12} {cache_state}: {len(tokens) / elapsed:10.0f} tokens/s  "
+                        f"({elapsed * 1000:8.1f} ms, {-(-len(tokens) // batch_size)} calls)"
+                    )
+        finally:
+            logging.disable(logging.NOTSET)
+        self.stdout.write(self.style.SUCCESS(f"decode cache: {decode_cache.stats()}"))
@@ -0,0 +1,86 @@
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+
+# The MIDDLEWARE list every request ran through before FullStackMiddleware
+LEGACY_MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'meta_project.middleware.compression.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+class Command(BaseCommand):
+    help = "Compare per-request middleware overhead of the legacy stack and the routing-aware lean stack."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/game/profile/', help="Request path to benchmark.")
+        parser.add_argument('--requests', type=int, default=5000, help="Number of timed requests per stack.")
+        parser.add_argument('--warmup', type=int, default=200, help="Untimed requests before measuring.")
+        parser.add_argument('--session-cookie', default='', help="Send this session cookie value with each request.")
+
+    def handle(self, *args, **options):
+        stacks = [
+            ('legacy', LEGACY_MIDDLEWARE),
+            ('lean', list(settings.MIDDLEWARE)),
+        ]
+        results = {}
+        for name, middleware in stacks:
+            results[name] = self._run(middleware, options)
+            self._report(name, results[name])
+
+        legacy_mean = statistics.fmean(results['legacy'])
+        lean_mean = statistics.fmean(results['lean'])
+        saved = legacy_mean - lean_mean
+        self.stdout.write(self.style.SUCCESS(
+            f"lean stack saves {saved:.1f} us/request "
+            f"({saved / legacy_mean * 100 if legacy_mean else 0:.1f}%) on {options['path']}"
+        ))
+
+    def _run(self, middleware, options):
+        factory = RequestFactory(HTTP_HOST='localhost')
+        if options['session_cookie']:
+            factory.cookies[settings.SESSION_COOKIE_NAME] = options['session_cookie']
+
+        # 4xx responses are logged by django.request; keep that out of the timings
+        logging.disable(logging.WARNING)
+        try:
+            with override_settings(MIDDLEWARE=middleware, DEBUG=False):
+                return self._time_requests(factory, options)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def _time_requests(self, factory, options):
+        handler = BaseHandler()
+        handler.load_middleware()
+
+        for _ in range(options['warmup']):
+            handler.get_response(factory.get(options['path']))
+
+        timings = []
+        for _ in range(options['requests']):
+            request = factory.get(options['path'])
+            start = time.perf_counter()
+            handler.get_response(request)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+        return timings
+
+    def _report(self, name, timings):
+        ordered = sorted(timings)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        self.stdout.write(
+            f"{name:>6}: mean {statistics.fmean(timings):8.1f} us  "
+            f"p50 {statistics.median(timings):8.1f} us  p99 {p99:8.1f} us  "
+            f"({len(timings)} requests)"
+        )
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meta_api_app.models import GameAccount
+from meta_api_app.services.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_chunks, resolve_fields
+from meta_api_app.services.sharding import ShardingError, require_unsharded
+
+
+class Command(BaseCommand):
+    help = "Stream GameAccount rows to NDJSON or CSV with constant memory, resumable from an id checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--fields', default='', help="Comma-separated columns (default: all except password_hash).")
+        parser.add_argument('--output', default='-', help="Output file, '-' for stdout.")
+        parser.add_argument('--after-id', type=int, default=None, help="Only export accounts with a greater id.")
+        parser.add_argument('--checkpoint', default=None, help="File holding the last exported id and output size; resumes from it when present.")
+        parser.add_argument('--checkpoint-every', type=int, default=10000, help="Rows between checkpoint writes.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per cursor round trip.")
+        parser.add_argument('--active-only', action='store_true', help="Skip inactive accounts.")
+
+    def handle(self, *args, **options):
+        try:
+            require_unsharded("Account export")
+        except ShardingError as e:
+            raise CommandError(str(e))
+        try:
+            fields = resolve_fields([field.strip() for field in options['fields'].split(',') if field.strip()])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        after_id = options['after_id']
+        offset = None
+        checkpoint = options['checkpoint']
+        if checkpoint and os.path.exists(checkpoint):
+            after_id, offset = self._read_checkpoint(checkpoint)
+            self.stderr.write(f"Resuming after id {after_id}")
+
+        queryset = GameAccount.objects.all()
+        if options['active_only']:
+            queryset = queryset.filter(is_active=True)
+
+        to_stdout = options['output'] == '-'
+        resuming = after_id is not None and not to_stdout and os.path.exists(options['output'])
+        if resuming and offset is not None:
+            # Rows written after the checkpoint are exported again below
+            with open(options['output'], 'r+b') as f:
+                f.truncate(offset)
+        output = sys.stdout if to_stdout else open(options['output'], 'a' if resuming else 'w', newline='')
+
+        state = {'rows': 0, 'last_id': after_id}
+
+        def on_row(row):
+            state['rows'] += 1
+            state['last_id'] = row[0]
+
+        started = time.perf_counter()
+        try:
+            written_rows = 0
+            for chunk in export_chunks(
+                queryset, fields, options['format'], after_id=after_id,
+                chunk_size=options['chunk_size'], include_header=not resuming, on_row=on_row,
+            ):
+                output.write(chunk)
+                # Chunks end on a row, so the last id and the output size checkpoint the same point
+                if checkpoint and state['rows'] - written_rows >= options['checkpoint_every']:
+                    output.flush()
+                    self._write_checkpoint(checkpoint, state['last_id'], None if to_stdout else output.tell())
+                    written_rows = state['rows']
+            output.flush()
+            if checkpoint and state['last_id'] is not None:
+                self._write_checkpoint(checkpoint, state['last_id'], None if to_stdout else output.tell())
+        finally:
+            if not to_stdout:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {state['rows']} accounts in {elapsed:.1f}s "
+            f"({state['rows'] / elapsed if elapsed else 0:.0f} rows/s), last id {state['last_id']}"
+        ))
+
+    @staticmethod
+    def _read_checkpoint(path):
+        """(last id, output size in bytes or None); checkpoints without a size hold only the id."""
+        with open(path) as f:
+            values = f.read().split()
+        try:
+            last_id = int(values[0]) if values else 0
+            offset = int(values[1]) if len(values) > 1 else None
+        except ValueError:
+            raise CommandError(f"Invalid checkpoint file: {path}")
+        return last_id, offset
+
+    @staticmethod
+    def _write_checkpoint(path, last_id, offset=None):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(last_id) if offset is None else f'{last_id} {offset}')
+        os.replace(tmp_path, path)
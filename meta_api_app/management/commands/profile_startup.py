@@ -0,0 +1,104 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so every import is measured cold
+STARTUP_SCRIPT = """
+import json, os, time
+t0 = time.perf_counter()
+os.environ['DJANGO_SETTINGS_MODULE'] = {settings_module!r}
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+t1 = time.perf_counter()
+django.setup()
+t2 = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+t3 = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+t4 = time.perf_counter()
+print('STARTUP_TIMINGS ' + json.dumps({{
+    'settings': t1 - t0, 'app_registry_ready': t2 - t1,
+    'url_resolver': t3 - t2, 'middleware_chain': t4 - t3, 'total': t4 - t0,
+}}))
+"""
+
+re_importtime = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+class Command(BaseCommand):
+    help = "Report import-time cost per module and app-ready time of a cold process."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'meta_project.settings'),
+            help="Settings module to profile (e.g. meta_project.settings_api)."
+        )
+        parser.add_argument('--top', type=int, default=25, help="Number of modules to list.")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT.format(settings_module=options['settings_module'])
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+
+        timings = None
+        for line in result.stdout.splitlines():
+            if line.startswith('STARTUP_TIMINGS '):
+                timings = json.loads(line[len('STARTUP_TIMINGS '):])
+        if result.returncode != 0 or timings is None:
+            raise CommandError(f"Startup script failed:\n{result.stderr[-2000:]}")
+
+        modules = []
+        packages = defaultdict(int)
+        for line in result.stderr.splitlines():
+            match = re_importtime.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+            packages[self._package(module)] += int(self_us)
+
+        top_modules = sorted(modules, reverse=True)[:options['top']]
+        top_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'settings_module': options['settings_module'],
+                'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.items()},
+                'packages_self_ms': {name: round(us / 1000, 2) for name, us in top_packages},
+                'modules_cumulative_ms': {module: round(cumulative / 1000, 2) for cumulative, _, _, module in top_modules},
+            }, indent=2))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Startup profile for {options['settings_module']}"))
+        for name, seconds in timings.items():
+            self.stdout.write(f"  {name:<20} {seconds * 1000:9.1f} ms")
+
+        self.stdout.write(self.style.SUCCESS("\nImport time by package (self)"))
+        for name, us in top_packages:
+            self.stdout.write(f"  {us / 1000:9.1f} ms  {name}")
+
+        self.stdout.write(self.style.SUCCESS("\nSlowest imports (cumulative)"))
+        for cumulative, self_us, depth, module in top_modules:
+            self.stdout.write(f"  {cumulative / 1000:9.1f} ms  (self {self_us / 1000:6.1f} ms)  {module}")
+
+    @staticmethod
+    def _package(module):
+        parts = module.split('.')
+        # Group django.contrib.* and the project's own packages one level deeper
+        if parts[0] in ('django', 'meta_api_app', 'meta_project') and len(parts) > 2 and parts[1] == 'contrib':
+            return '.'.join(parts[:3])
+        if parts[0] in ('django', 'meta_api_app', 'meta_project', 'rest_framework_simplejwt') and len(parts) > 1:
+            return '.'.join(parts[:2])
+        return parts[0]
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from meta_project.profiling import PROFILE_HEADER, create_token, profiling_config
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Meta-Profile header value; requests sending it are profiled (see /meta-admin/profiling/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('label', nargs='?', default='cli', help="Who or what the token is for; shown on its profiles.")
+
+    def handle(self, *args, **options):
+        max_age = profiling_config()['token_max_age']
+        self.stdout.write(f"{PROFILE_HEADER}: {create_token(options['label'])}")
+        self.stderr.write(f"Valid for {max_age} seconds.")
@@ -0,0 +1,73 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meta_api_app.services.sharding import (
+    is_sharded, misplaced_accounts, move_accounts, planned_moves, reconcile_shard, shard_aliases, shard_counts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring sharded game accounts to their hashed shard: index accounts missing from the lookup "
+        "index, remove copies left by interrupted moves, then move misplaced accounts in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Accounts moved per transaction.")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after moving this many accounts.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many accounts would move where.")
+
+    def handle(self, *args, **options):
+        if not is_sharded():
+            raise CommandError("Sharding is not enabled ([sharding] enabled = true in the config file).")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        before = shard_counts()
+        self._report_counts("Accounts per shard", before)
+
+        if options['dry_run']:
+            self._report_moves(planned_moves(), "would move")
+            return
+
+        for shard in shard_aliases():
+            added, removed = reconcile_shard(shard)
+            if added or removed:
+                self.stdout.write(f"  {shard}: indexed {added} accounts, removed {removed} stale copies")
+
+        started = time.perf_counter()
+        moved = 0
+        moves = Counter()
+        limit = options['limit']
+        for batch in misplaced_accounts(options['batch_size']):
+            for (source, target), ids in batch.items():
+                if limit is not None:
+                    ids = ids[:limit - moved]
+                count = move_accounts(ids, source, target)
+                moves[(source, target)] += count
+                moved += count
+                if limit is not None and moved >= limit:
+                    break
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {moved} moved ({moved / elapsed if elapsed else 0:.0f} accounts/s)")
+            if limit is not None and moved >= limit:
+                break
+
+        self._report_moves(moves, "moved")
+        self._report_counts("Accounts per shard after rebalancing", shard_counts(), before)
+
+    def _report_counts(self, title, counts, before=None):
+        self.stdout.write(title)
+        for shard, count in counts.items():
+            change = f" ({count - before.get(shard, 0):+d})" if before is not None else ""
+            self.stdout.write(f"  {shard:<24} {count:>12,}{change}")
+
+    def _report_moves(self, moves, verb):
+        if not moves:
+            self.stdout.write(self.style.SUCCESS("Every account is on its shard."))
+            return
+        for (source, target), count in sorted(moves.items()):
+            self.stdout.write(f"  {source} -> {target}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"{sum(moves.values())} accounts {verb}"))
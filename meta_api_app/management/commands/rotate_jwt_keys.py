@@ -0,0 +1,61 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meta_api_app.jwt_keys import (
+    ASYMMETRIC_ALGORITHMS, SYMMETRIC_ALGORITHM, KeyRing, generate_key, jwt_config,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a new JWT signing key. It is published in the JWKS right away and "
+        "starts signing after two JWKS cache lifetimes; old keys keep verifying until pruned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--algorithm', choices=ASYMMETRIC_ALGORITHMS, default=None,
+            help="Key type (default: META_JWT algorithm, or EdDSA while it is HS256).",
+        )
+        parser.add_argument('--prune', action='store_true', help="Delete keys no token can still be signed with.")
+        parser.add_argument('--list', action='store_true', help="Only list the keys and their state.")
+
+    def handle(self, *args, **options):
+        config = jwt_config()
+        keys_dir = config['keys_dir']
+
+        if not options['list']:
+            algorithm = options['algorithm'] or config['algorithm']
+            if algorithm == SYMMETRIC_ALGORITHM:
+                algorithm = 'EdDSA'
+            try:
+                kid = generate_key(keys_dir, algorithm)
+            except (ValueError, FileExistsError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Generated {algorithm} key {kid} in {keys_dir}"))
+
+        keyring = KeyRing.load(keys_dir, config['jwks_max_age'])
+        now = datetime.now(dt_timezone.utc)
+        active = keyring.active(now)
+        retired = {key.kid for key in keyring.retired(now)}
+
+        if options['prune'] and retired:
+            for kid in sorted(retired):
+                os.remove(os.path.join(keys_dir, f'{kid}.pem'))
+                self.stdout.write(f"Pruned {kid}")
+            keyring = KeyRing.load(keys_dir, config['jwks_max_age'])
+            retired = set()
+
+        self.stdout.write(f"Signing algorithm: {config['algorithm']} (HS256 accepted: {config['accept_hs256']})")
+        for key in keyring.sorted_keys():
+            if active is not None and key.kid == active.kid:
+                state = 'active'
+            elif key.kid in retired:
+                state = 'retired'
+            elif active is not None and key.created_at > active.created_at:
+                state = 'published'
+            else:
+                state = 'verify only'
+            self.stdout.write(f"  {key.kid:<32} {key.algorithm:<6} {state}")
@@ -0,0 +1,38 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from meta_project.green import is_green
+from meta_project.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Serve the WSGI application with cooperative gevent workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('addrport', nargs='?', default='0.0.0.0:9711', help="host:port to bind.")
+        parser.add_argument('--pool-size', type=int, default=None, help="Maximum concurrent greenlets (default: GEVENT_POOL_SIZE).")
+
+    def handle(self, *args, **options):
+        if not is_green():
+            raise CommandError("gevent has not patched this process; start it with `python manage.py rungevent`.")
+
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+
+        host, _, port = options['addrport'].rpartition(':')
+        pool_size = options['pool_size'] or settings.GEVENT_POOL_SIZE
+        application = get_wsgi_application()
+        if settings.WARMUP_ON_START:
+            warm_up(application)
+
+        server = WSGIServer((host or '0.0.0.0', int(port)), application, spawn=Pool(pool_size), log=None)
+        self.stdout.write(f"Serving on http://{host or '0.0.0.0'}:{port}/ with up to {pool_size} greenlets")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop(timeout=5)
@@ -0,0 +1,85 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meta_api_app.models import SeasonRewardRun
+from meta_api_app.services.season import (
+    DEFAULT_SEASON_RULES, SeasonRewardError, preview, run_chunks, start_run, validate_rules,
+)
+from meta_api_app.services.sharding import ShardingError, require_unsharded
+from meta_api_app.tasks.season import apply_season_rewards
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply season-end rewards and rank decay to every account with set-based UPDATEs "
+        "in id-range chunks. Interrupted runs resume from their checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('season', help="Season identifier (e.g. 2026-S3); each season is rewarded once.")
+        parser.add_argument('--rules', default=None, help="JSON file with 'rewards' and 'decay' (default: built-in rules).")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Account ids per UPDATE.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be awarded without writing.")
+        parser.add_argument('--async', action='store_true', dest='run_async', help="Queue the Celery task instead of running here.")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        try:
+            require_unsharded("Season rewards")
+        except ShardingError as e:
+            raise CommandError(str(e))
+        rules = DEFAULT_SEASON_RULES
+        if options['rules']:
+            try:
+                with open(options['rules'], encoding='utf-8') as f:
+                    rules = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Cannot read rules: {e}")
+
+        try:
+            rules = validate_rules(rules)
+            if options['dry_run']:
+                return self._dry_run(options['season'], rules)
+            if options['run_async']:
+                result = apply_season_rewards.delay(options['season'], rules, options['chunk_size'])
+                self.stdout.write(self.style.SUCCESS(f"Queued season {options['season']} as task {result.id}"))
+                return
+            run = start_run(options['season'], rules)
+            if run.last_id:
+                self.stdout.write(f"Resuming {run.season} after account id {run.last_id}")
+            started = time.perf_counter()
+            run = run_chunks(run, options['chunk_size'], progress=self._progress(started))
+        except SeasonRewardError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Season {run.season}: rewarded {run.processed_accounts} accounts in {elapsed:.1f}s"
+        ))
+
+    def _dry_run(self, season, rules):
+        run = SeasonRewardRun.objects.filter(season=season).first()
+        if run is not None:
+            self.stdout.write(f"Season {season} is {run.status} ({run.progress:.0%}); counts cover the whole table")
+        started = time.perf_counter()
+        report = preview(rules)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(f"Dry run for season {season} ({elapsed:.1f} ms)"))
+        self.stdout.write(f"  {'tier':<10} {'accounts':>10} {'coins':>12} {'gems':>10} {'experience':>12} {'level ups':>10}  decays to")
+        for row in report:
+            self.stdout.write(
+                f"  {row['rank_tier']:<10} {row['accounts']:>10} {row['total_coins']:>12} {row['total_gems']:>10} "
+                f"{row['total_experience']:>12} {row['level_ups']:>10}  {row['decays_to']}"
+            )
+
+    def _progress(self, started):
+        def report(run):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {run.progress:6.1%}  id {run.last_id}/{run.max_id}, {run.processed_accounts} accounts "
+                f"({run.processed_accounts / elapsed if elapsed else 0:.0f} accounts/s)"
+            )
+        return report
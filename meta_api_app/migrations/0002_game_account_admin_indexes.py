@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gameaccount',
+            index=models.Index(fields=['level'], name='game_account_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gameaccount',
+            index=models.Index(fields=['created_at'], name='game_account_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gameaccount',
+            index=models.Index(fields=['last_login_at'], name='game_account_last_login_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Columns searched from the admin changelist. Django compiles icontains and
+# istartswith on PostgreSQL to UPPER("col"::text) LIKE UPPER(%s), so the
+# trigram indexes are built on that exact expression.
+TRIGRAM_COLUMNS = ['username', 'email', 'display_name', 'character_name', 'guild_name']
+TABLE = 'meta_api_app_gameaccount'
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS game_account_{column}_trgm '
+            f'ON {TABLE} USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS game_account_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('meta_api_app', '0002_game_account_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0003_game_account_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameaccount',
+            name='energy_regen_per_hour',
+            field=models.PositiveIntegerField(default=12, help_text='Energy points regenerated per hour (0 disables regeneration).'),
+        ),
+        migrations.AddField(
+            model_name='gameaccount',
+            name='energy_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='The date-time energy was last persisted.'),
+        ),
+        migrations.AddField(
+            model_name='gameaccount',
+            name='health_regen_per_hour',
+            field=models.PositiveIntegerField(default=0, help_text='Health points regenerated per hour (0 disables regeneration).'),
+        ),
+        migrations.AddField(
+            model_name='gameaccount',
+            name='health_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='The date-time health_points was last persisted.'),
+        ),
+        migrations.AlterField(
+            model_name='gameaccount',
+            name='energy',
+            field=models.PositiveIntegerField(default=100, help_text='Energy points as of energy_updated_at; regenerates on read.'),
+        ),
+        migrations.AlterField(
+            model_name='gameaccount',
+            name='health_points',
+            field=models.PositiveIntegerField(default=100, help_text='Health points as of health_updated_at; regenerates on read.'),
+        ),
+    ]
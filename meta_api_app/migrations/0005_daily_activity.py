@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0004_game_account_lazy_regeneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='The calendar day (TIME_ZONE) this rollup covers.', unique=True)),
+                ('active_users', models.PositiveIntegerField(default=0, help_text='Distinct accounts that logged in or registered on this day.')),
+                ('new_users', models.PositiveIntegerField(default=0, help_text='Accounts registered on this day.')),
+                ('active_bitmap', models.BinaryField(default=bytes, help_text='Bitmap of active account ids (bit n = account id n).')),
+                ('new_bitmap', models.BinaryField(default=bytes, help_text='Bitmap of account ids registered on this day.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date-time the rollup was last refreshed.')),
+            ],
+            options={
+                'verbose_name': 'Daily Activity Rollup',
+                'verbose_name_plural': 'Daily Activity Rollups',
+                'ordering': ['-day'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0005_daily_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Guild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Unique guild/clan name.', max_length=100, unique=True)),
+                ('member_count', models.PositiveIntegerField(default=0, help_text='Number of accounts in the guild.')),
+                ('total_experience', models.BigIntegerField(default=0, help_text="Sum of the members' experience points.")),
+                ('best_score', models.BigIntegerField(default=0, help_text='Highest score of any member.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The date-time the guild was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date-time the guild or its aggregates were updated.')),
+            ],
+            options={
+                'verbose_name': 'Guild',
+                'verbose_name_plural': 'Guilds',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['-total_experience', 'id'], name='guild_total_experience_idx'), models.Index(fields=['-best_score', 'id'], name='guild_best_score_idx'), models.Index(fields=['-member_count', 'id'], name='guild_member_count_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='gameaccount',
+            name='guild',
+            field=models.ForeignKey(blank=True, help_text='The guild/clan the player belongs to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='members', to='meta_api_app.guild'),
+        ),
+        migrations.AddIndex(
+            model_name='gameaccount',
+            index=models.Index(fields=['guild', '-highest_score'], name='game_account_guild_score_idx'),
+        ),
+    ]
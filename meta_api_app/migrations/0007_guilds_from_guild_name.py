@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Trim
+
+
+def create_guilds_from_names(apps, schema_editor):
+    """One Guild per distinct (trimmed) guild_name; members are linked with a single UPDATE."""
+    GameAccount = apps.get_model('meta_api_app', 'GameAccount')
+    Guild = apps.get_model('meta_api_app', 'Guild')
+    db_alias = schema_editor.connection.alias
+
+    named = GameAccount.objects.using(db_alias).exclude(guild_name__isnull=True).exclude(guild_name='')
+    names = (
+        named.annotate(name=Trim('guild_name')).exclude(name='')
+        .values_list('name', flat=True).distinct().order_by()
+    )
+    Guild.objects.using(db_alias).bulk_create([Guild(name=name) for name in names], batch_size=1000)
+    # Looked up per row through the unique index on Guild.name
+    named.update(guild_id=Subquery(Guild.objects.using(db_alias).filter(name=Trim(OuterRef('guild_name'))).values('id')[:1]))
+
+    totals = (
+        GameAccount.objects.using(db_alias).filter(guild__isnull=False).values('guild_id')
+        .annotate(members=Count('id'), experience=Sum('experience_points'), best=Max('highest_score')).order_by()
+    )
+    guilds = [
+        Guild(id=row['guild_id'], member_count=row['members'], total_experience=row['experience'] or 0,
+              best_score=row['best'] or 0)
+        for row in totals
+    ]
+    Guild.objects.using(db_alias).bulk_update(guilds, ['member_count', 'total_experience', 'best_score'], batch_size=1000)
+
+
+def restore_guild_names(apps, schema_editor):
+    GameAccount = apps.get_model('meta_api_app', 'GameAccount')
+    Guild = apps.get_model('meta_api_app', 'Guild')
+    db_alias = schema_editor.connection.alias
+    GameAccount.objects.using(db_alias).filter(guild__isnull=False).update(
+        guild_name=Subquery(Guild.objects.using(db_alias).filter(id=OuterRef('guild_id')).values('name')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0006_guilds'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_guilds_from_names, restore_guild_names),
+    ]
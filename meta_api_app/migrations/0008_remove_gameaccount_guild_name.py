@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # Kept apart from 0007 so the column is only dropped after the data is committed
+    dependencies = [
+        ('meta_api_app', '0007_guilds_from_guild_name'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='gameaccount',
+            name='guild_name',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def reset_friends_count(apps, schema_editor):
+    # friends_count had no edges behind it; it now counts Friendship rows, of which there are none yet
+    GameAccount = apps.get_model('meta_api_app', 'GameAccount')
+    GameAccount.objects.using(schema_editor.connection.alias).exclude(friends_count=0).update(friends_count=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0009_guild_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Friendship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The date-time the friendship was created.')),
+                ('account', models.ForeignKey(help_text='The player whose friend list this edge belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='friendships', to='meta_api_app.gameaccount')),
+                ('friend', models.ForeignKey(help_text='The befriended player.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meta_api_app.gameaccount')),
+            ],
+            options={
+                'verbose_name': 'Friendship',
+                'verbose_name_plural': 'Friendships',
+                'indexes': [models.Index(fields=['account', '-created_at', '-id'], name='friendship_account_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('account', 'friend'), name='friendship_unique_edge'), models.CheckConstraint(condition=models.Q(('account', models.F('friend')), _negated=True), name='friendship_not_self')],
+            },
+        ),
+        migrations.RunPython(reset_friends_count, migrations.RunPython.noop),
+    ]
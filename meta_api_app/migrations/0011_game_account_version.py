@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0010_friendships'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameaccount',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Incremented on every change; profile updates only apply to the version they were based on.'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0011_game_account_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonRewardRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(help_text='Season identifier; a season is rewarded at most once.', max_length=50, unique=True)),
+                ('rules', models.JSONField(help_text='Rewards and rank decay applied by this run.')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], default='running', help_text='Run state.', max_length=20)),
+                ('max_id', models.BigIntegerField(help_text='Highest account id when the run started; later accounts are not rewarded.')),
+                ('last_id', models.BigIntegerField(default=0, help_text='Checkpoint: accounts with id <= last_id are done.')),
+                ('processed_accounts', models.BigIntegerField(default=0, help_text='Accounts rewarded so far.')),
+                ('started_at', models.DateTimeField(auto_now_add=True, help_text='The date-time the run was started.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date-time of the last checkpoint.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='The date-time the run completed.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Season Reward Run',
+                'verbose_name_plural': 'Season Reward Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:11
+
+import meta_api_app.models.archive
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0012_season_reward_runs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAccount',
+            fields=[
+                ('id', models.BigIntegerField(help_text="The account's id in the GameAccount table.", primary_key=True, serialize=False)),
+                ('username', models.CharField(help_text='Username of the archived account.', max_length=150, unique=True)),
+                ('email', models.EmailField(help_text='Email of the archived account.', max_length=254, unique=True)),
+                ('data', models.JSONField(encoder=meta_api_app.models.archive.ArchiveJSONEncoder, help_text='Column values of the account and its friend ids.')),
+                ('reason', models.CharField(help_text='Why the account was archived (inactive or idle).', max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True, help_text='The date-time the account was archived.')),
+            ],
+            options={
+                'verbose_name': 'Archived Game Account',
+                'verbose_name_plural': 'Archived Game Accounts',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 19:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meta_api_app', '0013_archived_accounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountLookup',
+            fields=[
+                ('id', models.BigAutoField(help_text="The account's id on its shard.", primary_key=True, serialize=False)),
+                ('username', models.CharField(help_text='Username of the account.', max_length=150, unique=True)),
+                ('email', models.EmailField(help_text='Email of the account.', max_length=254, unique=True)),
+                ('shard', models.CharField(db_index=True, help_text='Database alias the account row is stored on.', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The date-time the entry was last changed.')),
+            ],
+            options={
+                'verbose_name': 'Account Shard Lookup',
+                'verbose_name_plural': 'Account Shard Lookups',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='friendship',
+            name='account',
+            field=models.ForeignKey(db_constraint=False, help_text='The player whose friend list this edge belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='friendships', to='meta_api_app.gameaccount'),
+        ),
+        migrations.AlterField(
+            model_name='friendship',
+            name='friend',
+            field=models.ForeignKey(db_constraint=False, help_text='The befriended player.', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meta_api_app.gameaccount'),
+        ),
+        migrations.AlterField(
+            model_name='gameaccount',
+            name='guild',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='The guild/clan the player belongs to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='members', to='meta_api_app.guild'),
+        ),
+    ]
@@ -1 +1,7 @@
+from meta_api_app.models.activity import DailyActivity
+from meta_api_app.models.archive import ArchivedAccount
+from meta_api_app.models.friendship import Friendship
+from meta_api_app.models.guild import Guild
 from meta_api_app.models.game_account import GameAccount
+from meta_api_app.models.season import SeasonRewardRun
+from meta_api_app.models.sharding import AccountLookup
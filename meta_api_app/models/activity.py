@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class DailyActivity(models.Model):
+    """
+    Persisted daily rollup of the activity bitmaps (see meta_api_app/services/activity.py).
+    Counts are refreshed with every batch of activity events; the bitmaps are
+    snapshotted by the rollup_activity task so history survives the live store.
+    """
+    day = models.DateField(unique=True, help_text="The calendar day (TIME_ZONE) this rollup covers.")
+    active_users = models.PositiveIntegerField(default=0, help_text="Distinct accounts that logged in or registered on this day.")
+    new_users = models.PositiveIntegerField(default=0, help_text="Accounts registered on this day.")
+    active_bitmap = models.BinaryField(default=bytes, help_text="Bitmap of active account ids (bit n = account id n).")
+    new_bitmap = models.BinaryField(default=bytes, help_text="Bitmap of account ids registered on this day.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="The date-time the rollup was last refreshed.")
+
+    class Meta:
+        verbose_name = "Daily Activity Rollup"
+        verbose_name_plural = "Daily Activity Rollups"
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day} ({self.active_users} active, {self.new_users} new)"
@@ -0,0 +1,38 @@
+from django.core.serializers.json import DjangoJSONEncoder
+import datetime
+
+from django.db import models
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder keeps only milliseconds; restored timestamps must be exact."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ArchivedAccount(models.Model):
+    """
+    Cold storage for inactive or long-idle game accounts (see meta_api_app/services/archive.py).
+
+    The row keeps the account's id; every other column is kept in `data`, so
+    the hot table's indexes no longer carry it. Username and email stay unique
+    here, and registration checks this table too, so they remain unique across
+    both tables. An account is moved back on its next successful login.
+    """
+    id = models.BigIntegerField(primary_key=True, help_text="The account's id in the GameAccount table.")
+    username = models.CharField(max_length=150, unique=True, help_text="Username of the archived account.")
+    email = models.EmailField(unique=True, help_text="Email of the archived account.")
+    data = models.JSONField(encoder=ArchiveJSONEncoder, help_text="Column values of the account and its friend ids.")
+    reason = models.CharField(max_length=20, help_text="Why the account was archived (inactive or idle).")
+    archived_at = models.DateTimeField(auto_now_add=True, help_text="The date-time the account was archived.")
+
+    class Meta:
+        verbose_name = "Archived Game Account"
+        verbose_name_plural = "Archived Game Accounts"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.username} (archived {self.reason})"
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class Friendship(models.Model):
+    """
+    One directed edge of the friend graph. Every friendship is stored as two
+    edges (a -> b and b -> a), so a player's friend list is a single index
+    range scan on `account` (see meta_api_app/services/friends.py).
+    """
+    # No database constraints: with sharding the accounts live on other databases
+    account = models.ForeignKey(
+        'meta_api_app.GameAccount', on_delete=models.CASCADE, related_name='friendships', db_constraint=False,
+        help_text="The player whose friend list this edge belongs to."
+    )
+    friend = models.ForeignKey(
+        'meta_api_app.GameAccount', on_delete=models.CASCADE, related_name='+', db_constraint=False,
+        help_text="The befriended player."
+    )
+    created_at = models.DateTimeField(auto_now_add=True, help_text="The date-time the friendship was created.")
+
+    class Meta:
+        verbose_name = "Friendship"
+        verbose_name_plural = "Friendships"
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'friend'], name='friendship_unique_edge'),
+            models.CheckConstraint(condition=~models.Q(account=models.F('friend')), name='friendship_not_self'),
+        ]
+        indexes = [
+            # Friend list pages, newest first (keyset on created_at, id)
+            models.Index(fields=['account', '-created_at', '-id'], name='friendship_account_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} -> {self.friend_id}"
@@ -1,7 +1,39 @@
+from datetime import timedelta
+
 from django.contrib.auth.hashers import make_password, check_password
 from django.db import models
 from django.utils import timezone
 
+from meta_project.green import run_blocking
+
+DEFAULT_ENERGY_REGEN_PER_HOUR = 12
+
+# Writes limited to these columns do not bump GameAccount.version (login bookkeeping)
+UNVERSIONED_FIELDS = frozenset({'last_login_at'})
+
+# Attributes whose changes are folded into the member's guild aggregates
+GUILD_TRACKED_FIELDS = ('guild_id', 'experience_points', 'highest_score')
+
+
+def regenerate(stored, maximum, since, rate_per_hour, now=None):
+    """
+    Compute a lazily regenerating value.
+
+    `stored` is the value at `since`; it grows by `rate_per_hour` up to `maximum`.
+    Returns (current value, anchor) where anchor is the timestamp to persist with
+    the current value so partial progress towards the next point is kept.
+    """
+    now = now or timezone.now()
+    if since is None or rate_per_hour <= 0 or stored >= maximum:
+        return stored, now
+    seconds_per_point = 3600 / rate_per_hour
+    gained = int((now - since).total_seconds() // seconds_per_point)
+    if gained <= 0:
+        return stored, since
+    if stored + gained >= maximum:
+        return maximum, now
+    return stored + gained, since + timedelta(seconds=gained * seconds_per_point)
+
 
 class GameAccount(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -23,10 +55,14 @@ class GameAccount(models.Model):
     gems = models.BigIntegerField(default=0, help_text="Premium in-game currency (gems/diamonds).")
     
     # Player Stats
-    health_points = models.PositiveIntegerField(default=100, help_text="Current health/life points of the player.")
+    health_points = models.PositiveIntegerField(default=100, help_text="Health points as of health_updated_at; regenerates on read.")
     max_health_points = models.PositiveIntegerField(default=100, help_text="Maximum health/life points of the player.")
-    energy = models.PositiveIntegerField(default=100, help_text="Current energy points for gameplay activities.")
+    health_updated_at = models.DateTimeField(default=timezone.now, help_text="The date-time health_points was last persisted.")
+    health_regen_per_hour = models.PositiveIntegerField(default=0, help_text="Health points regenerated per hour (0 disables regeneration).")
+    energy = models.PositiveIntegerField(default=100, help_text="Energy points as of energy_updated_at; regenerates on read.")
     max_energy = models.PositiveIntegerField(default=100, help_text="Maximum energy points the player can have.")
+    energy_updated_at = models.DateTimeField(default=timezone.now, help_text="The date-time energy was last persisted.")
+    energy_regen_per_hour = models.PositiveIntegerField(default=DEFAULT_ENERGY_REGEN_PER_HOUR, help_text="Energy points regenerated per hour (0 disables regeneration).")
     
     # Game Progress
     current_stage = models.PositiveIntegerField(default=1, help_text="Current stage/level the player is on.")
@@ -41,27 +77,74 @@ class GameAccount(models.Model):
     
     # Social Features
     friends_count = models.PositiveIntegerField(default=0, help_text="Number of friends the player has.")
-    guild_name = models.CharField(max_length=100, blank=True, null=True, help_text="Name of the guild/clan the player belongs to.")
+    # No database constraint: with sharding the guilds live on the default database only
+    guild = models.ForeignKey(
+        'meta_api_app.Guild', on_delete=models.SET_NULL, null=True, blank=True, related_name='members',
+        db_constraint=False,
+        help_text="The guild/clan the player belongs to."
+    )
     
+    # Optimistic concurrency: bumped by every write, compared by profile updates
+    version = models.PositiveIntegerField(default=0, help_text="Incremented on every change; profile updates only apply to the version they were based on.")
+
     # Timestamps
     last_login_at = models.DateTimeField(null=True, blank=True, help_text="The date-time when the user last logged into the game.")
     created_at = models.DateTimeField(auto_now_add=True, help_text="The date-time the game account was created.")
     updated_at = models.DateTimeField(auto_now=True, help_text="The date-time the game account was updated.")
 
+    # Guild-tracked values as loaded from the database (see guild_snapshot)
+    _guild_snapshot = None
+
     class Meta:
         verbose_name = "Meta Game Account (GameAccount)"
         verbose_name_plural = "Meta Game Accounts (GameAccounts)"
         ordering = ['username']
+        indexes = [
+            # Back the admin changelist range/date filters
+            models.Index(fields=['level'], name='game_account_level_idx'),
+            models.Index(fields=['created_at'], name='game_account_created_idx'),
+            models.Index(fields=['last_login_at'], name='game_account_last_login_idx'),
+            # Recomputes a guild's best score without scanning its members
+            models.Index(fields=['guild', '-highest_score'], name='game_account_guild_score_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} (Level {self.level})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not set(update_fields) <= UNVERSIONED_FIELDS:
+            self.version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._guild_snapshot = instance.guild_snapshot()
+        return instance
+
+    def guild_snapshot(self):
+        """
+        (guild_id, experience_points, highest_score) as loaded, used to apply
+        guild aggregate deltas on save; None when one of them is deferred.
+        """
+        if any(name not in self.__dict__ for name in GUILD_TRACKED_FIELDS):
+            return None
+        return tuple(self.__dict__[name] for name in GUILD_TRACKED_FIELDS)
+
+    @property
+    def guild_name(self):
+        return self.guild.name if self.guild_id else None
+
     def set_password(self, raw_password):
-        self.password_hash = make_password(raw_password)
+        # Hashing is CPU-bound; under gevent it runs on a worker thread
+        self.password_hash = run_blocking(make_password, raw_password)
         self.password_changed_at = timezone.now()
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password_hash)
+        return run_blocking(check_password, raw_password, self.password_hash)
     
     def update_last_login(self):
         """Update the last login timestamp to current time."""
@@ -90,18 +173,40 @@ class GameAccount(models.Model):
             return True
         return False
     
+    def current_energy(self, now=None):
+        """Energy including regeneration since energy_updated_at."""
+        return regenerate(self.energy, self.max_energy, self.energy_updated_at, self.energy_regen_per_hour, now)[0]
+
+    def current_health_points(self, now=None):
+        """Health points including regeneration since health_updated_at."""
+        return regenerate(
+            self.health_points, self.max_health_points, self.health_updated_at, self.health_regen_per_hour, now
+        )[0]
+
+    def _settle_energy(self, now):
+        """Fold regeneration into the stored value; returns the current energy."""
+        self.energy, self.energy_updated_at = regenerate(
+            self.energy, self.max_energy, self.energy_updated_at, self.energy_regen_per_hour, now
+        )
+        return self.energy
+
     def restore_energy(self, amount=None):
         """Restore energy points to maximum or by specified amount."""
+        now = timezone.now()
         if amount is None:
             self.energy = self.max_energy
+            self.energy_updated_at = now
         else:
-            self.energy = min(self.energy + amount, self.max_energy)
-        self.save(update_fields=['energy'])
+            current = self._settle_energy(now)
+            self.energy = min(current + amount, self.max_energy)
+        self.save(update_fields=['energy', 'energy_updated_at'])
     
     def spend_energy(self, amount):
         """Spend energy points if sufficient."""
-        if self.energy >= amount:
-            self.energy -= amount
-            self.save(update_fields=['energy'])
+        now = timezone.now()
+        current = self._settle_energy(now)
+        if current >= amount:
+            self.energy = current - amount
+            self.save(update_fields=['energy', 'energy_updated_at'])
             return True
         return False
\ No newline at end of file
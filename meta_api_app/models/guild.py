@@ -0,0 +1,41 @@
+from django.db import models
+
+# Written only by F() deltas and recomputes, never from an in-memory instance
+AGGREGATE_FIELDS = ('member_count', 'total_experience', 'best_score')
+
+
+class Guild(models.Model):
+    """
+    A guild/clan. Member count, total XP and best score are denormalized and
+    kept current by atomic delta updates (see meta_api_app/services/guilds.py),
+    so listings and leaderboards never aggregate over GameAccount.
+    """
+    name = models.CharField(max_length=100, unique=True, help_text="Unique guild/clan name.")
+    member_count = models.PositiveIntegerField(default=0, help_text="Number of accounts in the guild.")
+    total_experience = models.BigIntegerField(default=0, help_text="Sum of the members' experience points.")
+    best_score = models.BigIntegerField(default=0, help_text="Highest score of any member.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="The date-time the guild was created.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="The date-time the guild or its aggregates were updated.")
+
+    class Meta:
+        verbose_name = "Guild"
+        verbose_name_plural = "Guilds"
+        ordering = ['name']
+        indexes = [
+            # Back the guild leaderboards (keyset pagination appends id)
+            models.Index(fields=['-total_experience', 'id'], name='guild_total_experience_idx'),
+            models.Index(fields=['-best_score', 'id'], name='guild_best_score_idx'),
+            models.Index(fields=['-member_count', 'id'], name='guild_member_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.member_count} members)"
+
+    def save(self, *args, **kwargs):
+        # A full save of a loaded guild would overwrite the aggregates with stale values
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
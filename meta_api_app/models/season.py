@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class SeasonRewardRun(models.Model):
+    """
+    Progress of one season-end reward job (see meta_api_app/services/season.py).
+    The checkpoint is advanced in the same transaction as each chunk's UPDATE,
+    so a resumed run neither skips nor repeats accounts.
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [(STATUS_RUNNING, 'Running'), (STATUS_COMPLETED, 'Completed')]
+
+    season = models.CharField(max_length=50, unique=True, help_text="Season identifier; a season is rewarded at most once.")
+    rules = models.JSONField(help_text="Rewards and rank decay applied by this run.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING, help_text="Run state.")
+    max_id = models.BigIntegerField(help_text="Highest account id when the run started; later accounts are not rewarded.")
+    last_id = models.BigIntegerField(default=0, help_text="Checkpoint: accounts with id <= last_id are done.")
+    processed_accounts = models.BigIntegerField(default=0, help_text="Accounts rewarded so far.")
+    started_at = models.DateTimeField(auto_now_add=True, help_text="The date-time the run was started.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="The date-time of the last checkpoint.")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="The date-time the run completed.")
+
+    class Meta:
+        verbose_name = "Season Reward Run"
+        verbose_name_plural = "Season Reward Runs"
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.season} ({self.status}, {self.last_id}/{self.max_id})"
+
+    @property
+    def progress(self):
+        return min(1.0, self.last_id / self.max_id) if self.max_id else 1.0
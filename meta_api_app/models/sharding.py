@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class AccountLookup(models.Model):
+    """
+    Global index of sharded game accounts (see meta_api_app/services/sharding.py).
+
+    Lives on the default database only. Its id sequence allocates account
+    ids, so ids stay unique across shards, and its unique username and email
+    columns keep those unique across shards. `shard` is where the account
+    row is stored; the rebalance command moves rows to their hashed shard.
+    """
+    id = models.BigAutoField(primary_key=True, help_text="The account's id on its shard.")
+    username = models.CharField(max_length=150, unique=True, help_text="Username of the account.")
+    email = models.EmailField(unique=True, help_text="Email of the account.")
+    shard = models.CharField(max_length=64, db_index=True, help_text="Database alias the account row is stored on.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="The date-time the entry was last changed.")
+
+    class Meta:
+        verbose_name = "Account Shard Lookup"
+        verbose_name_plural = "Account Shard Lookups"
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.username} -> {self.shard}"
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ACCOUNT_MODEL = 'gameaccount'
+LOOKUP_MODEL = 'accountlookup'
+
+
+class AccountShardRouter:
+    """
+    Database router installed when [sharding] is enabled (see meta_api_app/services/sharding.py).
+
+    An account instance stays on the shard it was loaded from or saved to.
+    Account queries without an instance hint go to the default database, so
+    code that reads accounts by id picks the shard explicitly with
+    account_queryset()/in_bulk(). Every other model lives on the default
+    database only. Shards get this app's schema (the account table, plus
+    empty tables that deletion cascades look at), without the lookup index
+    and without the data migrations.
+    """
+
+    def __init__(self):
+        self.shards = set(settings.META_SHARDING.get('shards', [DEFAULT_DB_ALIAS]))
+
+    def _db_for(self, model, **hints):
+        if model._meta.model_name != ACCOUNT_MODEL:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._meta.model_name == ACCOUNT_MODEL and instance._state.db:
+            return instance._state.db
+        return None
+
+    db_for_read = _db_for
+    db_for_write = _db_for
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Accounts reference guilds and friendships reference accounts across databases
+        if obj1._meta.app_label == obj2._meta.app_label == 'meta_api_app':
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in self.shards:
+            return None
+        # Data migrations (RunPython, no model name) only concern the default database;
+        # shards start empty and receive rows already in the current schema
+        return app_label == 'meta_api_app' and model_name not in (None, LOOKUP_MODEL)
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from meta_api_app.models import Friendship
+
+
+class FriendSerializer(serializers.ModelSerializer):
+    """A friend's public card plus the date the friendship started."""
+    id = serializers.IntegerField(source='friend.id', read_only=True)
+    display_name = serializers.CharField(source='friend.display_name', read_only=True, allow_null=True)
+    character_name = serializers.CharField(source='friend.character_name', read_only=True, allow_null=True)
+    level = serializers.IntegerField(source='friend.level', read_only=True)
+    rank_tier = serializers.CharField(source='friend.rank_tier', read_only=True)
+    guild_name = serializers.CharField(source='friend.guild_name', read_only=True, allow_null=True)
+    friends_since = serializers.DateTimeField(source='created_at', read_only=True)
+
+    class Meta:
+        model = Friendship
+        fields = ['id', 'display_name', 'character_name', 'level', 'rank_tier', 'guild_name', 'friends_since']
+
+
+class FriendRequestSerializer(serializers.Serializer):
+    """Payload for adding a friend."""
+    friend_id = serializers.IntegerField(min_value=1, help_text="Id of the player to befriend.")
@@ -2,15 +2,32 @@ import logging
 
 from rest_framework import serializers
 from meta_api_app.models import GameAccount
-from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from meta_api_app.services.archive import check_archived_password, find_archived, is_archived, restore_account
+from meta_api_app.services.guilds import get_or_create_guild
+from meta_api_app.services.sharding import create_account, find_account
+from meta_project.green import run_blocking
 
 logger = logging.getLogger(__name__)
 
 class GameAccountRegistrationSerializer(serializers.ModelSerializer):
-    """Serializer for game account registration."""
+    """
+    Serializer for game account registration.
+    Uniqueness is enforced by the database: the account is created with a
+    single INSERT and unique-constraint violations become field errors.
+    Names held by archived accounts are rejected in the same transaction.
+    """
     password = serializers.CharField(write_only=True, min_length=6, help_text="Password must be at least 6 characters long.")
     password_confirm = serializers.CharField(write_only=True, help_text="Password confirmation field.")
 
+    # Field errors raised for unique-constraint violations, keyed by column
+    UNIQUE_ERRORS = {
+        'username': "An account with this username already exists.",
+        'email': "An account with this email already exists.",
+    }
+
     class Meta:
         model = GameAccount
         fields = [
@@ -18,22 +35,11 @@ class GameAccountRegistrationSerializer(serializers.ModelSerializer):
             'display_name'
         ]
         extra_kwargs = {
-            'username': {'required': True},
-            'email': {'required': True},
+            # Skip the UniqueValidator exists() queries; the INSERT enforces uniqueness
+            'username': {'required': True, 'validators': []},
+            'email': {'required': True, 'validators': []},
         }
 
-    def validate_email(self, value):
-        """Validate that email is unique."""
-        if GameAccount.objects.filter(email=value).exists():
-            raise serializers.ValidationError("An account with this email already exists.")
-        return value
-
-    def validate_username(self, value):
-        """Validate that username is unique."""
-        if GameAccount.objects.filter(username=value).exists():
-            raise serializers.ValidationError("An account with this username already exists.")
-        return value
-
     def validate(self, attrs):
         """Validate that passwords match."""
         if attrs['password'] != attrs['password_confirm']:
@@ -41,16 +47,47 @@ class GameAccountRegistrationSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        """Create a new game account with hashed password."""
+        """Create a new game account with hashed password in one INSERT."""
         validated_data.pop('password_confirm')  # Remove password confirmation
         password = validated_data.pop('password')
-        
-        # Create the account
-        game_account = GameAccount.objects.create(**validated_data)
-        game_account.set_password(password)
-        game_account.save()
-        
-        return game_account
+        validated_data['password_hash'] = run_blocking(make_password, password)
+
+        try:
+            with transaction.atomic():
+                return create_account(GameAccount(**validated_data), check=self.check_archived)
+        except IntegrityError as e:
+            field = self.unique_violation_field(e)
+            if field is None:
+                raise
+            raise serializers.ValidationError({field: [self.UNIQUE_ERRORS[field]]})
+
+    @classmethod
+    def unique_violation_field(cls, error):
+        """
+        The UNIQUE_ERRORS field whose constraint `error` violated, or None.
+
+        PostgreSQL names the constraint (<table>_<column>_key); its message also
+        echoes the submitted values, so it is not searched. SQLite only reports
+        the columns ("UNIQUE constraint failed: <table>.<column>").
+        """
+        constraint = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+        if constraint:
+            return next((field for field in cls.UNIQUE_ERRORS if constraint.endswith(f'_{field}_key')), None)
+        message = str(error)
+        if 'UNIQUE constraint failed:' in message:
+            columns = message.split(':', 1)[1].split(',')
+            return next((field for field in cls.UNIQUE_ERRORS
+                         if any(column.strip().endswith(f'.{field}') for column in columns)), None)
+        return None
+
+    def check_archived(self, account):
+        # Checked after the INSERT (or, when sharded, the lookup claim) so a concurrent archive
+        # of the same name is seen once its transaction commits (username/email stay unique
+        # across both tables)
+        taken = is_archived(account.username, account.email)
+        if taken:
+            field = 'username' if 'username' in taken else 'email'
+            raise serializers.ValidationError({field: [self.UNIQUE_ERRORS[field]]})
 
 
 class GameAccountLoginSerializer(serializers.Serializer):
@@ -66,16 +103,10 @@ class GameAccountLoginSerializer(serializers.Serializer):
         if not username or not password:
             raise serializers.ValidationError("Both username and password are required.")
 
-        # Try to find account by username or email
-        try:
-            # First try username
-            account = GameAccount.objects.get(username=username)
-        except GameAccount.DoesNotExist:
-            try:
-                # Then try email
-                account = GameAccount.objects.get(email=username)
-            except GameAccount.DoesNotExist:
-                raise serializers.ValidationError("Invalid login credentials.")
+        # Try to find account by username, then email, then in the archive
+        account = find_account(username)
+        if account is None:
+            account = self.restore_archived(username, password)
 
         logger.debug(f"GameAccountLoginSerializer validate for '{account}'")
 
@@ -91,18 +122,40 @@ class GameAccountLoginSerializer(serializers.Serializer):
         logger.debug(f"GameAccountLoginSerializer return {attrs}")
         return attrs
 
+    @staticmethod
+    def restore_archived(username, password):
+        """Move an archived account back to the hot table once its credentials check out."""
+        archived = find_archived(username)
+        if archived is None or not check_archived_password(archived, password):
+            raise serializers.ValidationError("Invalid login credentials.")
+        if not archived.data.get('is_active', True):
+            raise serializers.ValidationError("Account is inactive.")
+        account = restore_account(archived)
+        if account is None:
+            raise serializers.ValidationError("Invalid login credentials.")
+        return account
+
 
 class GameAccountResponseSerializer(serializers.ModelSerializer):
     """Serializer for game account response data (excluding timestamps)."""
-    
+    # Regenerating stats are computed on read; nothing is written until they are spent
+    energy = serializers.IntegerField(source='current_energy', read_only=True)
+    health_points = serializers.IntegerField(source='current_health_points', read_only=True)
+    guild_name = serializers.CharField(read_only=True, allow_null=True)
+
     class Meta:
         model = GameAccount
-        exclude = ['password_hash', 'created_at', 'updated_at']
+        exclude = ['password_hash', 'created_at', 'updated_at', 'energy_updated_at', 'health_updated_at']
 
 
 class GameAccountProfileSerializer(serializers.ModelSerializer):
     """Serializer for game account profile updates."""
-    
+    version = serializers.IntegerField(min_value=0, help_text="The account version this update is based on.")
+    guild_name = serializers.CharField(
+        max_length=100, required=False, allow_blank=True, allow_null=True,
+        help_text="Guild to join (created if it does not exist); blank leaves the current guild."
+    )
+
     class Meta:
         model = GameAccount
         fields = [
@@ -110,9 +163,23 @@ class GameAccountProfileSerializer(serializers.ModelSerializer):
             'health_points', 'max_health_points', 'energy', 'max_energy',
             'current_stage', 'achievements_unlocked', 'rank_tier',
             'total_playtime_minutes', 'games_played', 'games_won', 
-            'highest_score', 'friends_count', 'guild_name'
+            'highest_score', 'friends_count', 'guild_name', 'version'
         ]
         read_only_fields = [
             'level', 'total_playtime_minutes', 'games_played', 
-            'games_won', 'highest_score'
-        ] 
\ No newline at end of file
+            'games_won', 'highest_score', 'friends_count'
+        ] 
+
+    def validate(self, attrs):
+        """Energy and health cannot exceed their (possibly updated) maximums."""
+        for field, maximum in (('energy', 'max_energy'), ('health_points', 'max_health_points')):
+            limit = attrs.get(maximum, getattr(self.instance, maximum, None))
+            if field in attrs and limit is not None and attrs[field] > limit:
+                raise serializers.ValidationError({field: [f"Cannot exceed {maximum} ({limit})."]})
+        return attrs
+
+    def update(self, instance, validated_data):
+        validated_data.pop('version', None)
+        if 'guild_name' in validated_data:
+            instance.guild = get_or_create_guild(validated_data.pop('guild_name'))
+        return super().update(instance, validated_data)
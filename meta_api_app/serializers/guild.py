@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from meta_api_app.models import Guild
+from meta_api_app.services.guilds import LEADERBOARD_METRICS
+
+
+class GuildSerializer(serializers.ModelSerializer):
+    """Public guild card with its precomputed aggregates."""
+
+    class Meta:
+        model = Guild
+        fields = ['id', 'name', 'member_count', 'total_experience', 'best_score']
+
+
+class GuildListQuerySerializer(serializers.Serializer):
+    """Query parameters for the guild list."""
+    q = serializers.CharField(required=False, max_length=100, help_text="Only guilds whose name starts with this text.")
+
+
+class GuildLeaderboardQuerySerializer(serializers.Serializer):
+    """Query parameters for the guild leaderboard."""
+    by = serializers.ChoiceField(choices=LEADERBOARD_METRICS, required=False, default='total_experience', help_text="Aggregate to rank guilds by.")
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from meta_api_app.models import GameAccount
+
+
+class PlayerSearchQuerySerializer(serializers.Serializer):
+    """Query parameters for player search."""
+    q = serializers.CharField(min_length=2, max_length=100, help_text="Display, character or guild name to search for.")
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=50, help_text="Maximum number of results.")
+    cursor = serializers.CharField(required=False, help_text="Continuation cursor returned by the previous page.")
+
+
+class PlayerSearchResultSerializer(serializers.ModelSerializer):
+    """Public player card returned by search."""
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = GameAccount
+        fields = ['id', 'display_name', 'character_name', 'guild_name', 'level', 'rank_tier', 'score']
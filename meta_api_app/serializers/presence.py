@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from meta_api_app.services.presence import MAX_PRESENCE_QUERY, PRESENCE_STATUSES
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    """Payload of a presence heartbeat."""
+    status = serializers.ChoiceField(choices=PRESENCE_STATUSES, required=False, default='online', help_text="Presence status to report.")
+
+
+class PresenceQuerySerializer(serializers.Serializer):
+    """Query parameters of a bulk presence lookup."""
+    ids = serializers.CharField(help_text=f"Comma-separated account ids (at most {MAX_PRESENCE_QUERY}).")
+
+    def validate_ids(self, value):
+        try:
+            ids = {int(part) for part in value.split(',') if part.strip()}
+        except ValueError:
+            raise serializers.ValidationError("ids must be comma-separated integers.")
+        if not ids:
+            raise serializers.ValidationError("At least one id is required.")
+        if len(ids) > MAX_PRESENCE_QUERY:
+            raise serializers.ValidationError(f"At most {MAX_PRESENCE_QUERY} ids per query.")
+        return sorted(ids)
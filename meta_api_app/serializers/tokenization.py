@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -9,4 +10,17 @@ class MetaTokenObtainSerializer(serializers.Serializer):
     random = serializers.CharField(required=True)
 
 class MetaTokenRefreshSerializer(serializers.Serializer):
-    refresh = serializers.CharField(required=True)
\ No newline at end of file
+    refresh = serializers.CharField(required=True)
+
+
+class TokenIntrospectionSerializer(serializers.Serializer):
+    """Payload of a bulk token introspection."""
+    tokens = serializers.ListField(
+        child=serializers.CharField(max_length=4096), allow_empty=False,
+        help_text="Access tokens to validate (at most META_INTROSPECT_MAX_TOKENS).",
+    )
+
+    def validate_tokens(self, value):
+        if len(value) > settings.META_INTROSPECT_MAX_TOKENS:
+            raise serializers.ValidationError(f"At most {settings.META_INTROSPECT_MAX_TOKENS} tokens per call.")
+        return value
@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+
+from meta_api_app.models import ArchivedAccount, GameAccount, Guild
+from meta_api_app.services.guilds import recompute_guild_aggregates
+
+# Columns an import may set. Ids and timestamps are assigned here; friends_count
+# is derived from Friendship edges and version counts this database's updates.
+IMPORTABLE_FIELDS = {
+    field.name: field for field in GameAccount._meta.concrete_fields
+    if field.name not in (
+        'id', 'created_at', 'updated_at', 'health_updated_at', 'energy_updated_at', 'friends_count', 'version',
+    )
+}
+REQUIRED_FIELDS = ('username', 'email')
+TRUE_VALUES = {'1', 't', 'true', 'y', 'yes'}
+FALSE_VALUES = {'0', 'f', 'false', 'n', 'no'}
+
+
+def read_records(path, input_format=None):
+    """Yield (line number, record dict) from a CSV or NDJSON file without loading it whole."""
+    input_format = input_format or ('csv' if path.endswith('.csv') else 'ndjson')
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == 'csv':
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {'__error__': f'Invalid JSON: {e}'}
+
+
+def _init_hash_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash_password(password):
+    return make_password(password)
+
+
+class AccountImporter:
+    """
+    Bulk-insert accounts in batches.
+
+    Each batch is validated, checked for username/email conflicts with IN
+    queries on the hot and archive tables, hashed across a process pool and
+    written with one bulk_create. Rows that fail are written to the rejects
+    file instead of aborting the import.
+    """
+
+    def __init__(self, batch_size=1000, workers=None, rejects=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.rejects = rejects
+        self.stats = {'read': 0, 'inserted': 0, 'rejected': 0, 'hash_seconds': 0.0, 'insert_seconds': 0.0}
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_hash_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'meta_project.settings'),),
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def run(self, records, progress=None):
+        started = time.perf_counter()
+        batch = []
+        for line_number, record in records:
+            self.stats['read'] += 1
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+                if progress is not None:
+                    progress(self.stats, time.perf_counter() - started)
+        if batch:
+            self.import_batch(batch)
+        self.stats['seconds'] = time.perf_counter() - started
+        return self.stats
+
+    def reject(self, line_number, record, reason):
+        self.stats['rejected'] += 1
+        if self.rejects is None:
+            return
+        safe_record = {key: value for key, value in record.items() if key not in ('password', 'password_hash')}
+        self.rejects.write(json.dumps({'line': line_number, 'reason': reason, 'record': safe_record}, default=str) + '\n')
+
+    def import_batch(self, batch):
+        accounts = []
+        passwords = []
+        seen_usernames = set()
+        seen_emails = set()
+
+        for line_number, record in batch:
+            account, password, error = self.build_account(record)
+            if error is None and account.username in seen_usernames:
+                error = 'Duplicate username in input.'
+            if error is None and account.email in seen_emails:
+                error = 'Duplicate email in input.'
+            if error is not None:
+                self.reject(line_number, record, error)
+                continue
+            seen_usernames.add(account.username)
+            seen_emails.add(account.email)
+            accounts.append((line_number, record, account))
+            passwords.append(password)
+
+        # One query each for existing usernames and emails of the whole batch, in both account tables
+        taken_usernames = set()
+        taken_emails = set()
+        for model in (GameAccount, ArchivedAccount):
+            taken_usernames.update(model.objects.filter(username__in=seen_usernames).values_list('username', flat=True))
+            taken_emails.update(model.objects.filter(email__in=seen_emails).values_list('email', flat=True))
+
+        pending = []
+        pending_passwords = []
+        for (line_number, record, account), password in zip(accounts, passwords):
+            if account.username in taken_usernames:
+                self.reject(line_number, record, 'An account with this username already exists.')
+            elif account.email in taken_emails:
+                self.reject(line_number, record, 'An account with this email already exists.')
+            else:
+                pending.append((line_number, record, account))
+                pending_passwords.append(password)
+
+        self.assign_guilds(pending)
+        self.hash_passwords([account for _, _, account in pending], pending_passwords)
+        self.insert(pending)
+
+    def build_account(self, record):
+        """Return (unsaved account, raw password or None, error message or None)."""
+        if '__error__' in record:
+            return None, None, record['__error__']
+        missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+        if missing:
+            return None, None, f"Missing required fields: {', '.join(missing)}"
+        password = record.get('password')
+        if not password and not record.get('password_hash'):
+            return None, None, 'Missing password or password_hash.'
+
+        values = {}
+        for name, field in IMPORTABLE_FIELDS.items():
+            value = record.get(name)
+            if value is None or value == '':
+                continue
+            if isinstance(field, models.BooleanField) and isinstance(value, str):
+                lowered = value.strip().lower()
+                if lowered not in TRUE_VALUES | FALSE_VALUES:
+                    return None, None, f"{name}: expected a boolean, got {value!r}"
+                values[name] = lowered in TRUE_VALUES
+                continue
+            try:
+                values[field.attname] = field.to_python(value)
+            except ValidationError as e:
+                return None, None, f"{name}: {'; '.join(e.messages)}"
+        return GameAccount(**values), password or None, None
+
+    def assign_guilds(self, pending):
+        """Resolve `guild_name` columns to guilds, creating missing ones in one bulk insert."""
+        names = {(record.get('guild_name') or '').strip() for _, record, _ in pending} - {''}
+        if not names:
+            return
+        Guild.objects.bulk_create([Guild(name=name) for name in names], ignore_conflicts=True)
+        guild_ids = dict(Guild.objects.filter(name__in=names).values_list('name', 'id'))
+        for _, record, account in pending:
+            name = (record.get('guild_name') or '').strip()
+            if name:
+                account.guild_id = guild_ids[name]
+
+    def hash_passwords(self, accounts, passwords):
+        """Hash raw passwords in the process pool; pre-hashed rows keep their hash."""
+        to_hash = [(account, password) for account, password in zip(accounts, passwords) if password]
+        if not to_hash:
+            return
+        started = time.perf_counter()
+        raw_passwords = [password for _, password in to_hash]
+        if self._executor is not None:
+            chunksize = max(1, len(raw_passwords) // (self.workers * 4))
+            hashes = self._executor.map(_hash_password, raw_passwords, chunksize=chunksize)
+        else:
+            hashes = map(_hash_password, raw_passwords)
+        for (account, _), password_hash in zip(to_hash, hashes):
+            account.password_hash = password_hash
+        self.stats['hash_seconds'] += time.perf_counter() - started
+
+    def insert(self, pending):
+        if not pending:
+            return
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                GameAccount.objects.bulk_create([account for _, _, account in pending], batch_size=self.batch_size)
+            self.stats['inserted'] += len(pending)
+        except IntegrityError:
+            # A concurrent writer took a username/email after the check; fall back to per-row savepoints
+            for line_number, record, account in pending:
+                try:
+                    with transaction.atomic():
+                        account.pk = None
+                        account.save(force_insert=True)
+                    self.stats['inserted'] += 1
+                except IntegrityError as e:
+                    self.reject(line_number, record, f'Unique constraint conflict: {e}')
+        # bulk_create skips the save signals that keep guild aggregates current
+        guild_ids = {account.guild_id for _, _, account in pending if account.guild_id}
+        if guild_ids:
+            recompute_guild_aggregates(guild_ids)
+        self.stats['insert_seconds'] += time.perf_counter() - started
@@ -0,0 +1,254 @@
+import logging
+import threading
+import uuid
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from meta_api_app.models import DailyActivity
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Bitmap kinds; "active" marks any login or registration, "new" marks registrations
+ACTIVE = 'active'
+NEW = 'new'
+KINDS = (ACTIVE, NEW)
+
+# Live bitmaps kept in the store; older days are reloaded from DailyActivity on demand
+LIVE_DAYS = 40
+
+WINDOWS = {'dau': 1, 'wau': 7, 'mau': 30}
+
+
+def set_bits(bitmap, offsets):
+    """Set bit `offset` of a bytearray using Redis SETBIT ordering (MSB first)."""
+    for offset in offsets:
+        index = offset >> 3
+        if index >= len(bitmap):
+            bitmap.extend(bytes(index + 1 - len(bitmap)))
+        bitmap[index] |= 0x80 >> (offset & 7)
+
+
+def bit_count(bitmap):
+    return int.from_bytes(bitmap, 'little').bit_count()
+
+
+def combine(bitmaps, operator):
+    """
+    OR/AND bitmaps of different lengths.
+    Bytes are read little-endian so a shorter bitmap is implicitly zero-padded
+    at the end and each byte keeps its position in the result.
+    """
+    if not bitmaps:
+        return b''
+    length = max(len(bitmap) for bitmap in bitmaps)
+    values = [int.from_bytes(bitmap, 'little') for bitmap in bitmaps]
+    result = values[0]
+    for value in values[1:]:
+        result = result | value if operator == 'or' else result & value
+    return result.to_bytes(length, 'little')
+
+
+class InMemoryBitmapStore:
+    """Process-local stand-in for the Redis bitmap commands (dev and SQLite setups)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bitmaps = {}
+
+    def set_bits(self, key, offsets):
+        with self._lock:
+            set_bits(self._bitmaps.setdefault(key, bytearray()), offsets)
+
+    def get(self, key):
+        with self._lock:
+            bitmap = self._bitmaps.get(key)
+            return bytes(bitmap) if bitmap is not None else None
+
+    def merge(self, key, data):
+        with self._lock:
+            current = self._bitmaps.get(key, bytearray())
+            self._bitmaps[key] = bytearray(combine([current, data], 'or'))
+
+    def count(self, key):
+        with self._lock:
+            return bit_count(self._bitmaps.get(key, b''))
+
+    def combined_count(self, keys, operator):
+        with self._lock:
+            bitmaps = [self._bitmaps.get(key, b'') for key in keys]
+            return bit_count(combine(bitmaps, operator))
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._bitmaps.pop(key, None)
+
+
+class RedisBitmapStore:
+    """Bitmaps stored with SETBIT/BITCOUNT/BITOP, shared by every web and worker process."""
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._ttl = LIVE_DAYS * 86400
+
+    def set_bits(self, key, offsets):
+        pipe = self._client.pipeline(transaction=False)
+        for offset in offsets:
+            pipe.setbit(key, offset, 1)
+        pipe.expire(key, self._ttl)
+        pipe.execute()
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def merge(self, key, data):
+        scratch = f'{key}:merge:{uuid.uuid4().hex}'
+        pipe = self._client.pipeline()
+        pipe.set(scratch, data, ex=60)
+        pipe.bitop('OR', key, key, scratch)
+        pipe.expire(key, self._ttl)
+        pipe.delete(scratch)
+        pipe.execute()
+
+    def count(self, key):
+        return self._client.bitcount(key)
+
+    def combined_count(self, keys, operator):
+        scratch = f'activity:scratch:{uuid.uuid4().hex}'
+        pipe = self._client.pipeline()
+        pipe.bitop(operator.upper(), scratch, *keys)
+        pipe.bitcount(scratch)
+        pipe.delete(scratch)
+        return pipe.execute()[1]
+
+    def delete(self, keys):
+        if keys:
+            self._client.delete(*keys)
+
+
+def bitmap_key(kind, day):
+    return f'activity:{kind}:{day.isoformat()}'
+
+
+class ActivityTracker:
+    """
+    Daily active-user bitmaps (bit n = account id n) with persisted rollups.
+
+    Logins and registrations are marked in per-day bitmaps, so DAU/WAU/MAU
+    are a BITCOUNT of an OR over 1/7/30 days and day-N retention is the AND
+    of a registration cohort with a later day. Days missing from the live
+    store are reloaded from the DailyActivity snapshots.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._hydrated = set()
+        self._hydrate_lock = threading.Lock()
+
+    def record(self, events):
+        """Mark a batch of {'kind', 'account_id', 'day'} events and refresh the day counts."""
+        offsets = {}
+        for event in events:
+            day = date.fromisoformat(event['day'])
+            offsets.setdefault((event['kind'], day), set()).add(event['account_id'])
+            if event['kind'] == NEW:
+                offsets.setdefault((ACTIVE, day), set()).add(event['account_id'])
+
+        days = sorted({day for _, day in offsets})
+        self._prune()
+        self.hydrate(days)
+        for (kind, day), account_ids in offsets.items():
+            self.store.set_bits(bitmap_key(kind, day), account_ids)
+        self.persist(days, include_bitmaps=False)
+        return len(events)
+
+    def hydrate(self, days):
+        """Load persisted bitmaps for days this process has not seen yet."""
+        missing = [day for day in days if day not in self._hydrated]
+        if not missing:
+            return
+        with self._hydrate_lock:
+            missing = [day for day in missing if day not in self._hydrated]
+            rollups = DailyActivity.objects.filter(day__in=missing).only('day', 'active_bitmap', 'new_bitmap')
+            for rollup in rollups:
+                for kind, data in ((ACTIVE, rollup.active_bitmap), (NEW, rollup.new_bitmap)):
+                    if data:
+                        self.store.merge(bitmap_key(kind, rollup.day), bytes(data))
+            self._hydrated.update(missing)
+
+    def _prune(self):
+        cutoff = timezone.localdate() - timedelta(days=LIVE_DAYS)
+        stale = [day for day in self._hydrated if day < cutoff]
+        if stale:
+            self.store.delete([bitmap_key(kind, day) for day in stale for kind in KINDS])
+            self._hydrated.difference_update(stale)
+
+    def persist(self, days, include_bitmaps=True):
+        """Upsert the DailyActivity rows of `days` in one query."""
+        update_fields = ['active_users', 'new_users', 'updated_at']
+        rows = []
+        for day in days:
+            rollup = DailyActivity(
+                day=day,
+                active_users=self.store.count(bitmap_key(ACTIVE, day)),
+                new_users=self.store.count(bitmap_key(NEW, day)),
+                updated_at=timezone.now(),
+            )
+            if include_bitmaps:
+                rollup.active_bitmap = self.store.get(bitmap_key(ACTIVE, day)) or b''
+                rollup.new_bitmap = self.store.get(bitmap_key(NEW, day)) or b''
+            rows.append(rollup)
+        if include_bitmaps:
+            update_fields += ['active_bitmap', 'new_bitmap']
+        DailyActivity.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['day'], update_fields=update_fields
+        )
+
+    def active_users(self, day=None, window=1):
+        """Distinct active accounts over the `window` days ending on `day`."""
+        day = day or timezone.localdate()
+        days = [day - timedelta(days=offset) for offset in range(window)]
+        self.hydrate(days)
+        keys = [bitmap_key(ACTIVE, d) for d in days]
+        if window == 1:
+            return self.store.count(keys[0])
+        return self.store.combined_count(keys, 'or')
+
+    def summary(self, day=None):
+        return {name: self.active_users(day, window) for name, window in WINDOWS.items()}
+
+    def retention(self, cohort_day, offset):
+        """Share of accounts registered on `cohort_day` that were active `offset` days later."""
+        return_day = cohort_day + timedelta(days=offset)
+        self.hydrate([cohort_day, return_day])
+        cohort_key = bitmap_key(NEW, cohort_day)
+        cohort = self.store.count(cohort_key)
+        if not cohort:
+            return {'cohort': 0, 'retained': 0, 'rate': None}
+        retained = self.store.combined_count([cohort_key, bitmap_key(ACTIVE, return_day)], 'and')
+        return {'cohort': cohort, 'retained': retained, 'rate': retained / cohort}
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_activity_tracker():
+    """Redis bitmaps when the Redis cache is configured, otherwise the in-process store."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                if settings.META_ACTIVITY_REDIS_URL and redis is not None:
+                    store = RedisBitmapStore(settings.META_ACTIVITY_REDIS_URL)
+                else:
+                    store = InMemoryBitmapStore()
+                _tracker = ActivityTracker(store)
+    return _tracker
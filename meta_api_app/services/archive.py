@@ -0,0 +1,222 @@
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.hashers import check_password
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from meta_api_app.models import ArchivedAccount, Friendship, GameAccount, Guild
+from meta_api_app.services.friends import MAX_FRIENDS, invalidate_adjacency
+from meta_api_app.services.guilds import recompute_guild_aggregates
+from meta_api_app.services.player_search import get_search_backend
+from meta_api_app.services.sharding import (
+    account_queryset, accounts_atomic, create_account, find_account, in_bulk, is_sharded, require_unsharded,
+    update_accounts, with_guild,
+)
+from meta_project.green import run_blocking
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_FIELDS = GameAccount._meta.concrete_fields
+REASON_INACTIVE = 'inactive'
+REASON_IDLE = 'idle'
+
+
+def cold_accounts(idle_days, now=None):
+    """Deactivated accounts, and accounts without a login (or, if never logged in, created) in `idle_days`."""
+    cutoff = (now or timezone.now()) - timedelta(days=idle_days)
+    return GameAccount.objects.filter(
+        Q(is_active=False) | Q(last_login_at__lt=cutoff) | Q(last_login_at__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def archive_accounts(account_ids):
+    """
+    Move a batch of accounts to ArchivedAccount in one transaction, set-based:
+    one bulk insert, one friends_count update per distinct edge count, one
+    edge delete and one account delete. The account delete skips the per-row
+    delete signals, whose work (friend counters, guild aggregates, search
+    index) is done here for the whole batch. Returns the number archived.
+    """
+    require_unsharded("Account archiving")
+    with transaction.atomic():
+        rows = list(
+            GameAccount.objects.filter(id__in=account_ids).select_for_update()
+            .values(*[field.attname for field in ACCOUNT_FIELDS])
+        )
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+
+        friends = defaultdict(list)
+        for account_id, friend_id in Friendship.objects.filter(account_id__in=ids).values_list('account_id', 'friend_id'):
+            friends[account_id].append(friend_id)
+
+        ArchivedAccount.objects.bulk_create([
+            ArchivedAccount(
+                id=row['id'], username=row['username'], email=row['email'],
+                reason=REASON_IDLE if row['is_active'] else REASON_INACTIVE,
+                data={**row, 'friend_ids': friends[row['id']]},
+            )
+            for row in rows
+        ])
+
+        # Friends that stay in the hot table lose one friend per archived edge
+        lost = defaultdict(list)
+        remaining = (
+            Friendship.objects.filter(friend_id__in=ids).exclude(account_id__in=ids)
+            .values('account_id').annotate(n=Count('id')).order_by()
+        )
+        for row in remaining:
+            lost[row['n']].append(row['account_id'])
+        for count, friend_ids in lost.items():
+            GameAccount.objects.filter(id__in=friend_ids).update(friends_count=Greatest(F('friends_count') - count, 0))
+
+        Friendship.objects.filter(Q(account_id__in=ids) | Q(friend_id__in=ids)).delete()
+        # Raw delete: no cascades are left and the delete signals are handled for the batch here
+        GameAccount.objects.filter(id__in=ids)._raw_delete(connection.alias)
+
+        guild_ids = {row['guild_id'] for row in rows if row['guild_id']}
+        if guild_ids:
+            recompute_guild_aggregates(guild_ids)
+
+    invalidate_adjacency(*ids, *[friend_id for friend_ids in lost.values() for friend_id in friend_ids])
+    backend = get_search_backend()
+    for account_id in ids:
+        backend.remove_account(account_id)
+    return len(ids)
+
+
+def archive_cold_accounts(idle_days, batch_size=1000, limit=None, progress=None):
+    """Archive cold accounts in id order, `batch_size` per transaction. Returns the number archived."""
+    archived = 0
+    last_id = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        ids = list(
+            cold_accounts(idle_days).filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:size]
+        )
+        if not ids:
+            break
+        archived += archive_accounts(ids)
+        last_id = ids[-1]
+        if progress is not None:
+            progress(archived, last_id)
+    return archived
+
+
+def find_archived(username_or_email):
+    return ArchivedAccount.objects.filter(Q(username=username_or_email) | Q(email=username_or_email)).first()
+
+
+def is_archived(username=None, email=None):
+    """Which of `username`/`email` are taken by an archived account (registration uniqueness)."""
+    taken = ArchivedAccount.objects.filter(Q(username=username) | Q(email=email)).values_list('username', 'email')
+    fields = set()
+    for archived_username, archived_email in taken:
+        if archived_username == username:
+            fields.add('username')
+        if archived_email == email:
+            fields.add('email')
+    return fields
+
+
+def check_archived_password(archived, raw_password):
+    return run_blocking(check_password, raw_password, archived.data.get('password_hash', ''))
+
+
+def restore_account(archived):
+    """
+    Move an archived account back into the hot table with its id, creation
+    date and the friendships whose other side is still hot. Concurrent
+    restores of the same account are serialized by the archive row delete;
+    the loser gets the restored account. Accounts archived before sharding
+    was enabled are restored to a new id on a shard.
+    """
+    with transaction.atomic():
+        deleted, _ = ArchivedAccount.objects.filter(pk=archived.pk).delete()
+        if not deleted:
+            return find_account(archived.username)
+
+        values = {
+            field.attname: field.to_python(archived.data[field.attname])
+            for field in ACCOUNT_FIELDS if field.attname in archived.data
+        }
+        if values.get('guild_id') and not Guild.objects.filter(pk=values['guild_id']).exists():
+            values['guild_id'] = None
+        friends = in_bulk(
+            archived.data.get('friend_ids', []),
+            GameAccount.objects.filter(friends_count__lt=MAX_FRIENDS).only('id'),
+        )
+        friend_ids = sorted(friends)[:MAX_FRIENDS]
+        values['friends_count'] = len(friend_ids)
+
+        account = GameAccount(**values)
+        if is_sharded():
+            # The lookup index allocates sharded ids; the archived one may belong to another account
+            account.id = None
+        with accounts_atomic(friend_ids):
+            create_account(account)
+            # auto_now_add stamped the restore time; keep the original creation date
+            GameAccount.objects.using(account._state.db).filter(pk=account.pk).update(created_at=values['created_at'])
+            account.created_at = values['created_at']
+
+            if friend_ids:
+                Friendship.objects.bulk_create(
+                    [Friendship(account_id=account.pk, friend_id=friend_id) for friend_id in friend_ids]
+                    + [Friendship(account_id=friend_id, friend_id=account.pk) for friend_id in friend_ids]
+                )
+                update_accounts(friend_ids, friends_count=F('friends_count') + 1)
+    invalidate_adjacency(account.pk, *friend_ids)
+    logger.info(f"Restored archived account {account.pk}")
+    return with_guild(account_queryset(account.pk)).get(pk=account.pk)
+
+
+def hot_table_sizes():
+    """
+    {relation: bytes} for the GameAccount table and each of its indexes
+    (PostgreSQL statistics or SQLite dbstat); empty when unavailable.
+    """
+    table = GameAccount._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "SELECT %s, pg_relation_size(%s::regclass) UNION ALL "
+                    "SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes WHERE relname = %s",
+                    [table, table, table],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE tbl_name = %s) GROUP BY name",
+                    [table],
+                )
+            else:
+                return {}
+            return dict(cursor.fetchall())
+    except DatabaseError:
+        return {}
+
+
+def lookup_latency(samples=200):
+    """Mean and p95 microseconds of the login lookups (username, then email) over sampled accounts."""
+    max_id = GameAccount.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    candidates = random.sample(range(1, max_id + 1), min(max_id, samples * 4))
+    accounts = list(GameAccount.objects.filter(id__in=candidates).values_list('username', 'email')[:samples])
+    if not accounts:
+        return None
+    timings = []
+    for username, email in accounts:
+        for lookup in ({'username': username}, {'email': email}):
+            started = time.perf_counter()
+            GameAccount.objects.filter(**lookup).values_list('id', flat=True).first()
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {'mean': statistics.fmean(timings), 'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))]}
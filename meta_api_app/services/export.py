@@ -0,0 +1,80 @@
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from meta_api_app.models import GameAccount
+
+# Columns read through a relation, exported under a flat name
+RELATED_EXPORT_FIELDS = {'guild_name': 'guild__name'}
+# Every concrete column except the password hash
+EXPORTABLE_FIELDS = [
+    field.name for field in GameAccount._meta.concrete_fields if field.name != 'password_hash'
+] + list(RELATED_EXPORT_FIELDS)
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+DEFAULT_CHUNK_SIZE = 2000
+# Rows are joined into chunks of roughly this size before being yielded
+BUFFER_SIZE = 64 * 1024
+
+
+def resolve_fields(fields=None):
+    """Validate a column projection; `id` is always included so exports can resume."""
+    if not fields:
+        return list(EXPORTABLE_FIELDS)
+    unknown = [field for field in fields if field not in EXPORTABLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown export fields: {', '.join(unknown)}")
+    return ['id', *[field for field in fields if field != 'id']]
+
+
+def iter_rows(queryset, fields, after_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield value tuples ordered by id.
+    iterator() uses a server-side cursor on PostgreSQL, so memory stays flat.
+    """
+    queryset = queryset.order_by('id')
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+    lookups = [RELATED_EXPORT_FIELDS.get(field, field) for field in fields]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def _format_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_chunks(queryset, fields, export_format, after_id=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                  include_header=True, on_row=None):
+    """
+    Yield the export as text chunks of about BUFFER_SIZE characters.
+    `on_row(row)` is called for every row written, e.g. to checkpoint the last id.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer is not None and include_header:
+        writer.writerow(fields)
+
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in iter_rows(queryset, fields, after_id, chunk_size):
+        if writer is not None:
+            writer.writerow([_format_value(value) for value in row])
+        else:
+            buffer.write(encoder.encode(dict(zip(fields, row))))
+            buffer.write('\n')
+        if on_row is not None:
+            on_row(row)
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import F, Q, prefetch_related_objects
+
+from meta_api_app.models import Friendship, GameAccount
+from meta_api_app.services.sharding import accounts_atomic, in_bulk, is_sharded, update_accounts
+
+# Friend card columns loaded for friend lists
+FRIEND_CARD_FIELDS = ['id', 'display_name', 'character_name', 'level', 'rank_tier', 'guild_id']
+
+# Upper bound on a player's friend list, enforced by the friends_count update
+MAX_FRIENDS = 500
+
+
+class FriendshipError(Exception):
+    """A friend request that cannot be applied (unknown player, self, full list)."""
+
+
+def _adjacency_key(account_id):
+    return f'friends:adjacency:{account_id}'
+
+
+def invalidate_adjacency(*account_ids):
+    cache.delete_many([_adjacency_key(account_id) for account_id in account_ids])
+
+
+def friend_ids(account_id):
+    """
+    Ids of an account's friends, cached per player for META_FRIEND_CACHE_TIMEOUT
+    seconds (0 disables the cache). Invalidated on every add/remove.
+    """
+    timeout = settings.META_FRIEND_CACHE_TIMEOUT
+    if timeout:
+        cached = cache.get(_adjacency_key(account_id))
+        if cached is not None:
+            return cached
+    ids = frozenset(Friendship.objects.filter(account_id=account_id).values_list('friend_id', flat=True))
+    if timeout:
+        cache.set(_adjacency_key(account_id), ids, timeout)
+    return ids
+
+
+def friend_edges(account_id):
+    """
+    Edges of a friend list with the friend's public card loaded in the same
+    query. Sharded friends cannot be joined; attach_friends() loads them per page.
+    """
+    edges = Friendship.objects.filter(account_id=account_id)
+    if is_sharded():
+        return edges.only('id', 'account_id', 'friend_id', 'created_at')
+    return edges.select_related('friend', 'friend__guild').only(
+        'id', 'account_id', 'created_at', 'friend__id', 'friend__display_name', 'friend__character_name',
+        'friend__level', 'friend__rank_tier', 'friend__guild__name',
+    )
+
+
+def attach_friends(edges):
+    """Load the friend cards of a page of friend_edges() from their shards (no-op when not sharded)."""
+    if not is_sharded():
+        return edges
+    friends = in_bulk([edge.friend_id for edge in edges], GameAccount.objects.only(*FRIEND_CARD_FIELDS))
+    prefetch_related_objects(list(friends.values()), 'guild')
+    for edge in edges:
+        if edge.friend_id in friends:
+            edge.friend = friends[edge.friend_id]
+    return edges
+
+
+def add_friend(account_id, friend_id):
+    """
+    Create the two edges of a friendship and bump both friends_count values.
+    Returns False when they already are friends. The count updates double as
+    the MAX_FRIENDS guard, so concurrent requests cannot overfill a list.
+    """
+    if account_id == friend_id:
+        raise FriendshipError("Players cannot befriend themselves.")
+    ids = [account_id, friend_id]
+    try:
+        with accounts_atomic(ids):
+            Friendship.objects.bulk_create([
+                Friendship(account_id=account_id, friend_id=friend_id),
+                Friendship(account_id=friend_id, friend_id=account_id),
+            ])
+            updated = update_accounts(
+                ids, Q(friends_count__lt=MAX_FRIENDS), friends_count=F('friends_count') + 1
+            )
+            if updated != 2:
+                # The edges have no foreign key constraint; unknown players are caught here
+                if len(in_bulk(ids, GameAccount.objects.only('id'))) != 2:
+                    raise FriendshipError("Unknown player.")
+                raise FriendshipError(f"A friend list is full ({MAX_FRIENDS} friends).")
+    except IntegrityError:
+        # The unique edge constraint: they already are friends
+        return False
+    finally:
+        invalidate_adjacency(account_id, friend_id)
+    return True
+
+
+def remove_friend(account_id, friend_id):
+    """Delete both edges and decrement both counters; returns False if they were not friends."""
+    with accounts_atomic([account_id, friend_id]):
+        deleted, _ = Friendship.objects.filter(
+            Q(account_id=account_id, friend_id=friend_id) | Q(account_id=friend_id, friend_id=account_id)
+        ).delete()
+        if deleted:
+            update_accounts(
+                [account_id, friend_id], Q(friends_count__gt=0), friends_count=F('friends_count') - 1
+            )
+    invalidate_adjacency(account_id, friend_id)
+    return bool(deleted)
+
+
+def mutual_friend_count(account_id, other_id):
+    """Friends two players have in common; set intersection when cached, one query otherwise."""
+    if settings.META_FRIEND_CACHE_TIMEOUT:
+        return len(friend_ids(account_id) & friend_ids(other_id))
+    return Friendship.objects.filter(
+        account_id=account_id,
+        friend_id__in=Friendship.objects.filter(account_id=other_id).values('friend_id'),
+    ).count()
+
+
+def release_friendships(account_id):
+    """
+    Before an account is deleted: decrement its friends' counters. The edges
+    cascade with the account, except for a sharded account, whose edges on
+    the default database are deleted here.
+    """
+    ids = list(Friendship.objects.filter(account_id=account_id).values_list('friend_id', flat=True))
+    if ids:
+        update_accounts(ids, Q(friends_count__gt=0), friends_count=F('friends_count') - 1)
+        invalidate_adjacency(*ids)
+    if is_sharded():
+        Friendship.objects.filter(Q(account_id=account_id) | Q(friend_id=account_id)).delete()
+    invalidate_adjacency(account_id)
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, Max, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from meta_api_app.models import GameAccount, Guild
+from meta_api_app.services.sharding import is_sharded, shard_aliases
+
+LEADERBOARD_METRICS = ['total_experience', 'best_score', 'member_count']
+
+
+def get_or_create_guild(name):
+    """Guild for a member-supplied name; blank names mean no guild."""
+    name = (name or '').strip()
+    if not name:
+        return None
+    guild, _ = Guild.objects.get_or_create(name=name)
+    return guild
+
+
+def _update_guild(guild_id, **changes):
+    Guild.objects.filter(pk=guild_id).update(updated_at=timezone.now(), **changes)
+
+
+def recompute_best_score(guild_id):
+    """Reset best_score from the members in one statement (index game_account_guild_score_idx)."""
+    if is_sharded():
+        # Members are spread over the shards: the best of each shard's best
+        best = max(
+            GameAccount.objects.using(shard).filter(guild_id=guild_id)
+            .order_by('-highest_score').values_list('highest_score', flat=True).first() or 0
+            for shard in shard_aliases()
+        )
+        _update_guild(guild_id, best_score=best)
+        return
+    best = GameAccount.objects.filter(guild_id=guild_id).order_by('-highest_score').values('highest_score')[:1]
+    _update_guild(guild_id, best_score=Coalesce(Subquery(best), Value(0)))
+
+
+def apply_member_change(old, new):
+    """
+    Fold one member's change into the guild aggregates with atomic F() deltas.
+
+    `old` and `new` are (guild_id, experience_points, highest_score) tuples;
+    None stands for "not a member" (a new or deleted account). A best score
+    can only be raised by a delta, so it is recomputed when it may have dropped.
+    """
+    old_guild, old_experience, old_score = old or (None, 0, 0)
+    new_guild, new_experience, new_score = new or (None, 0, 0)
+
+    if old_guild == new_guild:
+        if new_guild is None or (old_experience, old_score) == (new_experience, new_score):
+            return
+        _update_guild(
+            new_guild,
+            total_experience=F('total_experience') + (new_experience - old_experience),
+            best_score=Greatest(F('best_score'), Value(new_score)),
+        )
+        if new_score < old_score:
+            recompute_best_score(new_guild)
+        return
+
+    if old_guild is not None:
+        _update_guild(
+            old_guild,
+            member_count=F('member_count') - 1,
+            total_experience=F('total_experience') - old_experience,
+        )
+        if old_score:
+            recompute_best_score(old_guild)
+    if new_guild is not None:
+        _update_guild(
+            new_guild,
+            member_count=F('member_count') + 1,
+            total_experience=F('total_experience') + new_experience,
+            best_score=Greatest(F('best_score'), Value(new_score)),
+        )
+
+
+def recompute_guild_aggregates(guild_ids=None):
+    """
+    Rebuild the aggregates from the members with one GROUP BY (one per shard,
+    merged, when accounts are sharded).
+    Used after bulk writes that bypass save() and to repair drift.
+    """
+    guilds = Guild.objects.all()
+    if guild_ids is not None:
+        guilds = guilds.filter(pk__in=guild_ids)
+    totals = defaultdict(lambda: {'members': 0, 'experience': 0, 'best': 0})
+    for shard in shard_aliases():
+        members = GameAccount.objects.using(shard).filter(guild__isnull=False)
+        if guild_ids is not None:
+            members = members.filter(guild_id__in=guild_ids)
+        rows = members.values('guild_id').annotate(
+            members=Count('id'), experience=Sum('experience_points'), best=Max('highest_score')
+        ).order_by()
+        for row in rows:
+            total = totals[row['guild_id']]
+            total['members'] += row['members']
+            total['experience'] += row['experience'] or 0
+            total['best'] = max(total['best'], row['best'] or 0)
+
+    now = timezone.now()
+    updated = []
+    for guild in guilds.only('id'):
+        row = totals.get(guild.id, {})
+        guild.member_count = row.get('members', 0)
+        guild.total_experience = row.get('experience', 0)
+        guild.best_score = row.get('best', 0)
+        guild.updated_at = now
+        updated.append(guild)
+    Guild.objects.bulk_update(
+        updated, ['member_count', 'total_experience', 'best_score', 'updated_at'], batch_size=1000
+    )
+    return len(updated)
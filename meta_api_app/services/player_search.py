@@ -0,0 +1,296 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Func, Q, Value
+from django.db.models.functions import Greatest, Upper
+
+from meta_api_app.models import GameAccount, Guild
+from meta_api_app.services.sharding import require_unsharded
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ['display_name', 'character_name', 'guild__name']
+
+# Same default as pg_trgm.word_similarity_threshold
+SIMILARITY_THRESHOLD = 0.6
+
+
+def normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+def trigrams(text):
+    """Trigrams of each word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class WordSimilar(Func):
+    """`query <% column`: true when word_similarity reaches the threshold (GIN trigram indexable)."""
+    arg_joiner = ' <%% '
+    template = '(%(expressions)s)'
+    output_field = BooleanField()
+
+
+class WordSimilarity(Func):
+    function = 'word_similarity'
+    output_field = FloatField()
+
+
+class PostgresPlayerSearch:
+    """Search backed by the GIN trigram indexes on UPPER(column) (migration 0003)."""
+
+    def search(self, query, limit, after=None):
+        term = Value(query.upper())
+        columns = [Upper(field) for field in SEARCH_FIELDS]
+
+        # One branch per trigram index: an OR across the guild join cannot be
+        # turned into a BitmapOr and degrades to a sequential scan of the accounts
+        active = GameAccount.objects.filter(is_active=True).order_by()
+        guild_ids = Guild.objects.filter(WordSimilar(term, Upper('name'))).values('id')
+        branches = [
+            active.filter(WordSimilar(term, Upper(field))).values('id')
+            for field in SEARCH_FIELDS if not field.startswith('guild__')
+        ]
+        branches.append(active.filter(guild_id__in=guild_ids).values('id'))
+
+        queryset = (
+            GameAccount.objects.filter(id__in=branches[0].union(*branches[1:]))
+            .select_related('guild')
+            .annotate(score=Greatest(*[WordSimilarity(term, column) for column in columns]))
+        )
+        if after is not None:
+            score, account_id = after
+            queryset = queryset.filter(Q(score__lt=score) | Q(score=score, id__gt=account_id))
+        return list(queryset.order_by('-score', 'id')[:limit])
+
+    def index_account(self, account):
+        pass
+
+    def index_guild(self, guild):
+        pass
+
+    def remove_account(self, account_id):
+        pass
+
+    def reset(self):
+        pass
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class PrefixTrie:
+    """Word prefix trie; every node keeps the ids of all words passing through it."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, word, account_id):
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            node.ids.add(account_id)
+
+    def remove(self, word, account_id):
+        node = self.root
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return
+            node.ids.discard(account_id)
+
+    def find(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+
+class InMemoryPlayerSearch:
+    """
+    In-process prefix-trie and trigram index used where pg_trgm is unavailable (SQLite/dev).
+    Built lazily from the database on first search and kept current by the
+    GameAccount save/delete signals of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._documents = {}
+        self._guild_names = {}
+        self._grams = defaultdict(set)
+        self._trie = PrefixTrie()
+
+    def search(self, query, limit, after=None):
+        self.ensure_loaded()
+        query = normalize(query)
+        query_grams = trigrams(query)
+
+        with self._lock:
+            candidates = set(self._trie.find(query))
+            for gram in query_grams:
+                candidates |= self._grams.get(gram, set())
+            scored = []
+            for account_id in candidates:
+                score = self._score(query, query_grams, self._documents[account_id])
+                if score >= SIMILARITY_THRESHOLD:
+                    scored.append((-score, account_id))
+
+        scored.sort()
+        if after is not None:
+            score, account_id = after
+            scored = [item for item in scored if item > (-score, account_id)]
+        # Accounts deactivated with queryset.update() (bulk actions) skip the save
+        # signal and stay indexed; they are dropped before the page is cut, not after
+        results = []
+        start = 0
+        while len(results) < limit and start < len(scored):
+            batch = scored[start:start + limit - len(results)]
+            start += len(batch)
+            accounts = GameAccount.objects.filter(is_active=True).select_related('guild').in_bulk(
+                [account_id for _, account_id in batch]
+            )
+            for negative_score, account_id in batch:
+                account = accounts.get(account_id)
+                if account is not None:
+                    account.score = -negative_score
+                    results.append(account)
+        return results
+
+    @staticmethod
+    def _score(query, query_grams, values):
+        best = 0.0
+        for value in values:
+            if any(word.startswith(query) for word in value.split()) or value.startswith(query):
+                return 1.0
+            if query_grams:
+                best = max(best, len(query_grams & trigrams(value)) / len(query_grams))
+        return best
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # Guild names are read once instead of joined (or fetched) per account
+            self._guild_names = dict(Guild.objects.values_list('id', 'name'))
+            rows = (
+                GameAccount.objects.filter(is_active=True)
+                .values_list('id', 'display_name', 'character_name', 'guild_id')
+                .iterator(chunk_size=2000)
+            )
+            for account_id, display_name, character_name, guild_id in rows:
+                self._add(account_id, [display_name, character_name, self._guild_names.get(guild_id)])
+            self._loaded = True
+            logger.debug(f"InMemoryPlayerSearch loaded {len(self._documents)} accounts")
+
+    def index_account(self, account):
+        if not self._loaded:
+            return
+        values = [account.display_name, account.character_name, self._guild_name(account)]
+        with self._lock:
+            self._discard(account.id)
+            if account.is_active:
+                self._add(account.id, values)
+
+    def index_guild(self, guild):
+        """Re-index the members of a renamed guild."""
+        if not self._loaded:
+            return
+        self._guild_names[guild.id] = guild.name
+        rows = list(GameAccount.objects.filter(guild=guild, is_active=True).values_list('id', *SEARCH_FIELDS))
+        with self._lock:
+            for account_id, *values in rows:
+                self._discard(account_id)
+                self._add(account_id, values)
+
+    def _guild_name(self, account):
+        """Guild name of a saved account without loading its guild when it is known already."""
+        if account.guild_id is None:
+            return None
+        if GameAccount.guild.is_cached(account):
+            name = account.guild.name
+        else:
+            name = self._guild_names.get(account.guild_id)
+            if name is None:
+                # A guild created after the index was built
+                name = Guild.objects.filter(pk=account.guild_id).values_list('name', flat=True).first()
+        self._guild_names[account.guild_id] = name
+        return name
+
+    def remove_account(self, account_id):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._discard(account_id)
+
+    def reset(self):
+        """Drop the index after changes that bypassed the signals; it is rebuilt on the next search."""
+        with self._lock:
+            self._loaded = False
+            self._documents = {}
+            self._guild_names = {}
+            self._grams = defaultdict(set)
+            self._trie = PrefixTrie()
+
+    def _add(self, account_id, values):
+        values = [normalize(value) for value in values if value]
+        if not values:
+            return
+        self._documents[account_id] = values
+        for value in values:
+            for gram in trigrams(value):
+                self._grams[gram].add(account_id)
+            for word in {value, *value.split()}:
+                self._trie.add(word, account_id)
+
+    def _discard(self, account_id):
+        values = self._documents.pop(account_id, None)
+        if values is None:
+            return
+        for value in values:
+            for gram in trigrams(value):
+                ids = self._grams.get(gram)
+                if ids is not None:
+                    ids.discard(account_id)
+                    if not ids:
+                        del self._grams[gram]
+            for word in {value, *value.split()}:
+                self._trie.remove(word, account_id)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    """PostgreSQL uses its trigram indexes; every other backend gets the in-process index."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if connection.vendor == 'postgresql':
+                    _backend = PostgresPlayerSearch()
+                else:
+                    _backend = InMemoryPlayerSearch()
+    return _backend
+
+
+def search_players(query, limit, after=None):
+    # Both backends read accounts joined with their guild names from one database
+    require_unsharded("Player search")
+    return get_search_backend().search(query, limit, after)
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Statuses a client may report with its heartbeat
+PRESENCE_STATUSES = ['online', 'away', 'in_match']
+# Largest id list accepted by one bulk presence query
+MAX_PRESENCE_QUERY = 500
+
+
+def _presence_cache():
+    return caches['presence']
+
+
+def _key(account_id):
+    return f'account:{account_id}'
+
+
+def heartbeat(account_id, status='online'):
+    """
+    Mark an account present for META_PRESENCE_TTL seconds: one cache SET, no database access.
+    Clients are expected to beat more often than the TTL; a missed beat lets the entry expire.
+    """
+    _presence_cache().set(_key(account_id), f'{status}:{int(time.time())}', settings.META_PRESENCE_TTL)
+
+
+def go_offline(account_id):
+    _presence_cache().delete(_key(account_id))
+
+
+def online_status(account_ids):
+    """
+    {account_id: {'status', 'last_seen'}} for the ids that are present, fetched
+    with a single get_many (MGET on Redis). Absent ids are offline.
+    """
+    keys = {_key(account_id): account_id for account_id in account_ids}
+    found = _presence_cache().get_many(list(keys))
+    result = {}
+    for key, value in found.items():
+        status, _, last_seen = value.partition(':')
+        result[keys[key]] = {'status': status, 'last_seen': int(last_seen)}
+    return result
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from meta_api_app.models import GameAccount
+from meta_api_app.services.guilds import get_or_create_guild
+
+
+class VersionConflict(Exception):
+    """The account changed since the version the client based its update on."""
+
+    def __init__(self, current_version):
+        super().__init__(f"Account is at version {current_version}.")
+        self.current_version = current_version
+
+
+def _current_value(account, field, now):
+    # Regenerating stats are compared with what the client sees, not the stored base
+    if field == 'energy':
+        return account.current_energy(now)
+    if field == 'health_points':
+        return account.current_health_points(now)
+    return getattr(account, field)
+
+
+def update_profile(account, changes, expected_version):
+    """
+    Apply validated profile `changes` with a compare-and-swap on `version`.
+
+    Only columns whose value actually changes are written, in one
+    `UPDATE ... WHERE id = %s AND version = %s` that also bumps the version,
+    so no row lock is taken and a concurrent writer makes it fail instead of
+    being overwritten. Raises VersionConflict when the row has moved on.
+    A changed energy/health value becomes the new regeneration base.
+    """
+    if account.version != expected_version:
+        raise VersionConflict(account.version)
+
+    now = timezone.now()
+    values = {}
+    if 'guild_name' in changes:
+        guild = get_or_create_guild(changes.pop('guild_name'))
+        guild_id = guild.id if guild else None
+        if guild_id != account.guild_id:
+            values['guild'] = guild
+    for field, value in changes.items():
+        if value != _current_value(account, field, now):
+            values[field] = value
+    if 'energy' in values:
+        values['energy_updated_at'] = now
+    if 'health_points' in values:
+        values['health_updated_at'] = now
+    if not values:
+        return account, []
+
+    # The account's own database: its shard when accounts are sharded
+    accounts = GameAccount.objects.using(account._state.db)
+    with transaction.atomic(using=account._state.db):
+        updated = accounts.filter(id=account.id, version=expected_version).update(
+            version=F('version') + 1, updated_at=now, **values
+        )
+        if not updated:
+            current = accounts.filter(id=account.id).values_list('version', flat=True).first()
+            raise VersionConflict(current)
+
+        for field, value in values.items():
+            setattr(account, field, value)
+        account.version = expected_version + 1
+        account.updated_at = now
+        # Same receivers as save() (search index, guild aggregate deltas)
+        update_fields = frozenset({*values, 'version', 'updated_at'})
+        post_save.send(
+            sender=GameAccount, instance=account, created=False, update_fields=update_fields,
+            raw=False, using=account._state.db
+        )
+    return account, sorted(values)
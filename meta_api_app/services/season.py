@@ -0,0 +1,175 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, PositiveIntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from meta_api_app.models import GameAccount, SeasonRewardRun
+from meta_api_app.services.guilds import recompute_guild_aggregates
+from meta_api_app.services.sharding import require_unsharded
+
+logger = logging.getLogger(__name__)
+
+# Same formula as GameAccount.add_experience: one level per 1000 experience points
+EXPERIENCE_PER_LEVEL = 1000
+REWARD_FIELDS = {'coins': 'coins', 'gems': 'gems', 'experience': 'experience_points'}
+
+# Rewards per rank tier and the tier each rank decays to at season end
+DEFAULT_SEASON_RULES = {
+    'rewards': {
+        'Bronze': {'coins': 100, 'gems': 0, 'experience': 200},
+        'Silver': {'coins': 200, 'gems': 5, 'experience': 400},
+        'Gold': {'coins': 400, 'gems': 10, 'experience': 700},
+        'Platinum': {'coins': 800, 'gems': 20, 'experience': 1000},
+        'Diamond': {'coins': 1500, 'gems': 40, 'experience': 1500},
+        'Master': {'coins': 3000, 'gems': 80, 'experience': 2500},
+    },
+    'decay': {
+        'Silver': 'Bronze',
+        'Gold': 'Silver',
+        'Platinum': 'Gold',
+        'Diamond': 'Platinum',
+        'Master': 'Diamond',
+    },
+}
+
+
+class SeasonRewardError(Exception):
+    """A season run that cannot be started or continued."""
+
+
+def validate_rules(rules):
+    """Check the shape of a rules dict; raises SeasonRewardError."""
+    rewards = rules.get('rewards', {})
+    decay = rules.get('decay', {})
+    if not isinstance(rewards, dict) or not isinstance(decay, dict):
+        raise SeasonRewardError("Rules need 'rewards' and 'decay' objects.")
+    for tier, reward in rewards.items():
+        unknown = set(reward) - set(REWARD_FIELDS)
+        if unknown:
+            raise SeasonRewardError(f"{tier}: unknown reward fields {', '.join(sorted(unknown))}")
+        if any(not isinstance(amount, int) or amount < 0 for amount in reward.values()):
+            raise SeasonRewardError(f"{tier}: rewards must be non-negative integers")
+    if any(not isinstance(target, str) or not target for target in decay.values()):
+        raise SeasonRewardError("Decay targets must be rank tier names.")
+    return {'rewards': rewards, 'decay': decay}
+
+
+def _reward_case(rules, name):
+    whens = [
+        When(rank_tier=tier, then=Value(reward[name]))
+        for tier, reward in rules['rewards'].items() if reward.get(name)
+    ]
+    return Case(*whens, default=Value(0)) if whens else None
+
+
+def reward_updates(rules):
+    """
+    UPDATE assignments for a rules dict: currency and experience deltas as CASE
+    over rank_tier, the level recomputed in SQL and the decayed rank. Every
+    right-hand side reads the pre-update row, so the new level uses old XP + reward.
+    """
+    updates = {}
+    for name, field in REWARD_FIELDS.items():
+        delta = _reward_case(rules, name)
+        if delta is not None:
+            updates[field] = F(field) + delta
+    if 'experience_points' in updates:
+        updates['level'] = Greatest(
+            F('level'),
+            updates['experience_points'] / Value(EXPERIENCE_PER_LEVEL) + Value(1),
+            output_field=PositiveIntegerField(),
+        )
+    if rules['decay']:
+        updates['rank_tier'] = Case(
+            *[When(rank_tier=tier, then=Value(target)) for tier, target in rules['decay'].items()],
+            default=F('rank_tier'),
+        )
+    updates['version'] = F('version') + 1
+    updates['updated_at'] = timezone.now()
+    return updates
+
+
+def preview(rules, max_id=None):
+    """
+    Dry run: per rank tier, how many accounts would get what, how many level
+    up and where the rank decays to. Two grouped queries, nothing is written.
+    """
+    require_unsharded("Season rewards")
+    accounts = GameAccount.objects.all()
+    if max_id is not None:
+        accounts = accounts.filter(id__lte=max_id)
+    counts = dict(accounts.values_list('rank_tier').annotate(n=Count('id')).order_by())
+
+    level_ups = {}
+    experience = _reward_case(rules, 'experience')
+    if experience is not None:
+        new_level = (F('experience_points') + experience) / Value(EXPERIENCE_PER_LEVEL) + Value(1)
+        level_ups = dict(
+            accounts.alias(new_level=new_level).filter(new_level__gt=F('level'))
+            .values_list('rank_tier').annotate(n=Count('id')).order_by()
+        )
+
+    report = []
+    for tier, count in sorted(counts.items()):
+        reward = rules['rewards'].get(tier, {})
+        report.append({
+            'rank_tier': tier,
+            'accounts': count,
+            **{f'total_{name}': reward.get(name, 0) * count for name in REWARD_FIELDS},
+            'level_ups': level_ups.get(tier, 0),
+            'decays_to': rules['decay'].get(tier, tier),
+        })
+    return report
+
+
+def start_run(season, rules):
+    """
+    The run for `season`, created with the current highest account id as its end.
+    An unfinished run is resumed; its rules must match the stored ones.
+    """
+    # Id-range chunks and their checkpoint assume a single account table
+    require_unsharded("Season rewards")
+    rules = validate_rules(rules)
+    run = SeasonRewardRun.objects.filter(season=season).first()
+    if run is None:
+        max_id = GameAccount.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        run, _ = SeasonRewardRun.objects.get_or_create(season=season, defaults={'rules': rules, 'max_id': max_id})
+    if run.rules != rules:
+        raise SeasonRewardError(f"Season {season} was started with different rules.")
+    if run.status == SeasonRewardRun.STATUS_COMPLETED:
+        raise SeasonRewardError(f"Season {season} was already rewarded.")
+    return run
+
+
+def run_chunks(run, chunk_size=5000, progress=None):
+    """
+    Apply the run's rules in id-range chunks of `chunk_size`, one UPDATE per
+    chunk. The checkpoint moves with a compare-and-swap in the chunk's
+    transaction, so a second worker on the same season rolls back instead
+    of rewarding twice. `progress(run)` is called after every chunk.
+    """
+    updates = reward_updates(run.rules)
+    while run.last_id < run.max_id:
+        first_id = run.last_id
+        last_id = min(first_id + chunk_size, run.max_id)
+        with transaction.atomic():
+            updated = GameAccount.objects.filter(id__gt=first_id, id__lte=last_id).update(**updates)
+            advanced = SeasonRewardRun.objects.filter(pk=run.pk, last_id=first_id).update(
+                last_id=last_id, processed_accounts=F('processed_accounts') + updated, updated_at=timezone.now()
+            )
+            if not advanced:
+                raise SeasonRewardError(f"Season {run.season} is being processed by another worker.")
+        run.last_id = last_id
+        run.processed_accounts += updated
+        if progress is not None:
+            progress(run)
+
+    # The UPDATEs bypass save(), which keeps guild experience totals current
+    recompute_guild_aggregates()
+    run.status = SeasonRewardRun.STATUS_COMPLETED
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'finished_at', 'updated_at'])
+    logger.info(f"Season {run.season} rewarded {run.processed_accounts} accounts")
+    return run
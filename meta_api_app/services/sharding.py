@@ -0,0 +1,368 @@
+"""
+Optional hash sharding of GameAccount by id ([sharding] in the config file).
+
+Account rows live on the database aliases listed in `shards`. Every other
+model stays on the default database. That includes AccountLookup, the
+global index that allocates account ids and maps ids, usernames and emails
+to the shard holding the row. A new account is placed with a jump
+consistent hash of its id. Appending a shard to the list therefore moves
+only about 1/N of the accounts, and `manage.py rebalance_shards` moves
+them.
+
+Code that reads or writes accounts by id goes through these helpers. They
+fall back to the plain default-database queries when sharding is off.
+"""
+import hashlib
+import logging
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+
+from meta_api_app.models import AccountLookup, GameAccount
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKUP_CACHE_TTL = 300
+ACCOUNT_FIELDS = GameAccount._meta.concrete_fields
+
+
+class ShardingError(Exception):
+    """An operation that is not available while accounts are sharded."""
+
+
+def sharding_config():
+    return getattr(settings, 'META_SHARDING', {})
+
+
+def is_sharded():
+    return bool(sharding_config().get('enabled'))
+
+
+def shard_aliases():
+    """Database aliases holding accounts, in placement order."""
+    if not is_sharded():
+        return [DEFAULT_DB_ALIAS]
+    return list(sharding_config().get('shards', [DEFAULT_DB_ALIAS]))
+
+
+def require_unsharded(feature):
+    """For jobs that scan or join the account table as a whole; raises ShardingError."""
+    if is_sharded():
+        raise ShardingError(f"{feature} is not available while game accounts are sharded.")
+
+
+def jump_hash(key, buckets):
+    """Jump consistent hash (Lamping and Veach): a bucket in [0, buckets) for a 64-bit key."""
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def home_shard(account_id, shards=None):
+    """The shard an account id hashes to (where new accounts are created and rebalancing moves them)."""
+    shards = shards or shard_aliases()
+    return shards[jump_hash(account_id, len(shards))]
+
+
+# --- Lookup index --------------------------------------------------------------
+
+def _cache_ttl():
+    return sharding_config().get('lookup_cache_ttl', DEFAULT_LOOKUP_CACHE_TTL)
+
+
+def _shard_key(account_id):
+    return f'sharding:shard:{account_id}'
+
+
+def _login_key(value):
+    # Usernames and emails are user input; hashed to stay valid cache keys
+    return f"sharding:login:{hashlib.sha1(value.encode()).hexdigest()}"
+
+
+def invalidate_lookup(*account_ids, logins=()):
+    cache.delete_many([_shard_key(account_id) for account_id in account_ids] + [_login_key(value) for value in logins])
+
+
+def shards_of(account_ids):
+    """{shard: [account ids]} for the known ids; unknown ids are left out."""
+    account_ids = list(dict.fromkeys(account_ids))
+    if not is_sharded():
+        return {DEFAULT_DB_ALIAS: account_ids} if account_ids else {}
+    cached = cache.get_many([_shard_key(account_id) for account_id in account_ids])
+    shards = {}
+    missing = []
+    for account_id in account_ids:
+        shard = cached.get(_shard_key(account_id))
+        if shard is None:
+            missing.append(account_id)
+        else:
+            shards[account_id] = shard
+    if missing:
+        found = dict(AccountLookup.objects.filter(pk__in=missing).values_list('id', 'shard'))
+        cache.set_many({_shard_key(account_id): shard for account_id, shard in found.items()}, _cache_ttl())
+        shards.update(found)
+
+    grouped = defaultdict(list)
+    for account_id, shard in shards.items():
+        grouped[shard].append(account_id)
+    return dict(grouped)
+
+
+def shard_of(account_id):
+    """Database alias holding an account, or None when the id is unknown."""
+    for shard in shards_of([account_id]):
+        return shard
+    return None
+
+
+def account_queryset(account_id):
+    """GameAccount queryset on the database holding `account_id` (empty for unknown ids)."""
+    shard = shard_of(account_id)
+    if shard is None:
+        return GameAccount.objects.none()
+    return GameAccount.objects.using(shard)
+
+
+def with_guild(queryset):
+    """
+    Load the guild with the accounts. The guild table is on the default
+    database, so sharded accounts fetch it with a second query instead of a join.
+    """
+    if is_sharded():
+        return queryset.prefetch_related('guild')
+    return queryset.select_related('guild')
+
+
+def find_account(username_or_email):
+    """The account with this username or, failing that, this email (login), or None."""
+    if not is_sharded():
+        queryset = with_guild(GameAccount.objects.all())
+        return queryset.filter(username=username_or_email).first() or queryset.filter(email=username_or_email).first()
+
+    key = _login_key(username_or_email)
+    account_id = cache.get(key)
+    if account_id is not None:
+        account = with_guild(account_queryset(account_id)).filter(pk=account_id).first()
+        if account is not None and username_or_email in (account.username, account.email):
+            return account
+        # Renamed, deleted or moved since it was cached
+        invalidate_lookup(account_id, logins=[username_or_email])
+
+    account_id = (
+        AccountLookup.objects.filter(username=username_or_email).values_list('id', flat=True).first()
+        or AccountLookup.objects.filter(email=username_or_email).values_list('id', flat=True).first()
+    )
+    if account_id is None:
+        return None
+    cache.set(key, account_id, _cache_ttl())
+    return with_guild(account_queryset(account_id)).filter(pk=account_id).first()
+
+
+# --- Reads and writes across shards ------------------------------------------
+
+def in_bulk(account_ids, queryset=None):
+    """{id: account} across shards; `queryset` narrows the columns or rows (e.g. only(), filter())."""
+    queryset = GameAccount.objects.all() if queryset is None else queryset
+    accounts = {}
+    for shard, ids in shards_of(account_ids).items():
+        accounts.update(queryset.using(shard).in_bulk(ids))
+    return accounts
+
+
+def update_accounts(account_ids, condition=Q(), **changes):
+    """One UPDATE per shard for the accounts matching `condition`; returns the number updated."""
+    return sum(
+        GameAccount.objects.using(shard).filter(condition, id__in=ids).update(**changes)
+        for shard, ids in shards_of(account_ids).items()
+    )
+
+
+@contextmanager
+def accounts_atomic(account_ids):
+    """
+    A transaction on the default database and one on each shard holding
+    `account_ids`, rolled back together on an error. They commit one after
+    another, so a failed commit can leave the shards apart.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(transaction.atomic())
+        for shard in shards_of(account_ids):
+            if shard != DEFAULT_DB_ALIAS:
+                stack.enter_context(transaction.atomic(using=shard))
+        yield
+
+
+def create_account(account, check=None):
+    """
+    Insert a new account. When sharded, an AccountLookup row allocates the
+    id and claims the username and email (IntegrityError when taken), then
+    the account is inserted on the id's home shard. `check(account)` runs
+    after the claim and before the shard insert; run inside a transaction so
+    an error in it undoes the claim.
+    """
+    if not is_sharded():
+        account.save(force_insert=True)
+        if check is not None:
+            check(account)
+        return account
+
+    lookup = AccountLookup.objects.create(username=account.username, email=account.email, shard='')
+    lookup.shard = home_shard(lookup.id)
+    lookup.save(update_fields=['shard'])
+    account.id = lookup.id
+    if check is not None:
+        check(account)
+    account.save(force_insert=True, using=lookup.shard)
+    return account
+
+
+def sync_lookup(account, update_fields=None):
+    """Before an existing sharded account is saved: carry a username/email change to the lookup index."""
+    if not is_sharded() or account._state.adding:
+        return
+    if update_fields is not None and not {'username', 'email'} & set(update_fields):
+        return
+    previous = AccountLookup.objects.filter(pk=account.pk).values_list('username', 'email').first()
+    if previous is None or previous == (account.username, account.email):
+        return
+    AccountLookup.objects.filter(pk=account.pk).update(username=account.username, email=account.email)
+    invalidate_lookup(account.pk, logins=previous)
+
+
+def forget_account(account):
+    """After a sharded account is deleted: drop its lookup entry."""
+    if not is_sharded():
+        return
+    AccountLookup.objects.filter(pk=account.pk).delete()
+    invalidate_lookup(account.pk, logins=[account.username, account.email])
+
+
+# --- Rebalancing ---------------------------------------------------------------
+
+def shard_counts():
+    """{shard: account rows stored there}."""
+    return {shard: GameAccount.objects.using(shard).count() for shard in shard_aliases()}
+
+
+def reconcile_shard(shard, batch_size=5000):
+    """
+    Make the lookup index agree with one shard's rows, in id batches:
+    accounts without an entry (created before sharding was enabled) are
+    added, and copies left behind by an interrupted move (the entry points
+    to another shard) are deleted. Returns (added, removed).
+    """
+    added = removed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            GameAccount.objects.using(shard).filter(id__gt=last_id).order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        known = dict(AccountLookup.objects.filter(pk__in=ids).values_list('id', 'shard'))
+        stale = [account_id for account_id, owner in known.items() if owner != shard]
+        if stale:
+            GameAccount.objects.using(shard).filter(id__in=stale)._raw_delete(shard)
+            removed += len(stale)
+        missing = [account_id for account_id in ids if account_id not in known]
+        if missing:
+            rows = GameAccount.objects.using(shard).filter(id__in=missing).values_list('id', 'username', 'email')
+            AccountLookup.objects.bulk_create([
+                AccountLookup(id=account_id, username=username, email=email, shard=shard)
+                for account_id, username, email in rows
+            ])
+            added += len(missing)
+    if added:
+        # Explicit ids do not advance the id sequence on PostgreSQL
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            for statement in connections[DEFAULT_DB_ALIAS].ops.sequence_reset_sql(no_style(), [AccountLookup]):
+                cursor.execute(statement)
+    return added, removed
+
+
+def planned_moves(batch_size=5000):
+    """Counter of (source, target) moves rebalancing needs, from the shards' rows; nothing is written."""
+    shards = shard_aliases()
+    moves = Counter()
+    for shard in shards:
+        last_id = 0
+        while True:
+            ids = list(
+                GameAccount.objects.using(shard).filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            for account_id in ids:
+                target = home_shard(account_id, shards)
+                if target != shard:
+                    moves[(shard, target)] += 1
+    return moves
+
+
+def misplaced_accounts(batch_size=5000):
+    """Yield {(source, target): [ids]} batches of accounts stored away from their home shard."""
+    shards = shard_aliases()
+    last_id = 0
+    while True:
+        rows = list(
+            AccountLookup.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'shard')[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        moves = defaultdict(list)
+        for account_id, shard in rows:
+            target = home_shard(account_id, shards)
+            if shard != target:
+                moves[(shard, target)].append(account_id)
+        if moves:
+            yield dict(moves)
+
+
+def move_accounts(account_ids, source, target):
+    """
+    Copy accounts from `source` to `target`, repoint their lookup entries and
+    delete the source rows. The transactions commit in that order: a crash
+    in between leaves an extra copy that reconcile_shard removes, never a
+    lookup entry pointing at a missing row. Rows are inserted and deleted
+    raw, so save/delete signals (guild aggregates, friend counters) do not
+    see a move. Returns the number moved.
+    """
+    with transaction.atomic(using=source):
+        rows = list(
+            GameAccount.objects.using(source).filter(id__in=account_ids).select_for_update()
+            .values_list(*[field.attname for field in ACCOUNT_FIELDS])
+        )
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            with transaction.atomic(using=target):
+                # Copies left by an earlier interrupted move
+                GameAccount.objects.using(target).filter(id__in=ids)._raw_delete(target)
+                accounts = [
+                    GameAccount(**dict(zip([field.attname for field in ACCOUNT_FIELDS], row)))
+                    for row in rows
+                ]
+                batch_size = connections[target].ops.bulk_batch_size(ACCOUNT_FIELDS, accounts) or len(accounts)
+                for start in range(0, len(accounts), batch_size):
+                    # raw=True keeps created_at/updated_at instead of stamping them again
+                    GameAccount.objects.using(target)._insert(
+                        accounts[start:start + batch_size], fields=ACCOUNT_FIELDS, raw=True, using=target
+                    )
+            AccountLookup.objects.filter(pk__in=ids, shard=source).update(shard=target)
+        GameAccount.objects.using(source).filter(id__in=ids)._raw_delete(source)
+    invalidate_lookup(*ids)
+    return len(ids)
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+
+from meta_api_app.jwt_keys import decode_token
+
+# Claims every Meta token carries; a token without them is not valid
+REQUIRED_CLAIMS = ('username', 'day', 'month', 'random')
+
+
+class TokenDecodeCache:
+    """
+    Bounded LRU of verified token payloads, shared by request authentication
+    and bulk introspection. Entries are dropped at the token's `exp` and after
+    `ttl` seconds, so key rotation or an HS256 cut-off applies within `ttl`.
+    Only successful decodes are cached.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token, now):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token, payload, now):
+        expires_at = now + self.ttl
+        if payload.get('exp') is not None:
+            expires_at = min(expires_at, payload['exp'])
+        with self._lock:
+            self._entries[token] = (payload, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+decode_cache = TokenDecodeCache(settings.META_TOKEN_DECODE_CACHE_SIZE, settings.META_TOKEN_DECODE_CACHE_TTL)
+
+
+def decode(token):
+    """Verified payload of `token`, from the decode cache when possible. Raises jwt.InvalidTokenError."""
+    now = time.time()
+    payload = decode_cache.get(token, now)
+    if payload is None:
+        payload = decode_token(token, options={'verify_iat': False})
+        if decode_cache.max_size:
+            decode_cache.set(token, payload, now)
+    return payload
+
+
+def _revocation_key(jti):
+    return f'jwt:revoked:{jti}'
+
+
+def revoke(payload):
+    """Revoke a decoded token until it expires. Tokens issued without a jti cannot be revoked."""
+    jti = payload.get('jti')
+    if not jti:
+        return False
+    remaining = int(payload.get('exp', 0) - time.time())
+    if remaining > 0:
+        cache.set(_revocation_key(jti), True, remaining)
+    return True
+
+
+def revoked_jtis(payloads):
+    """The jtis among `payloads` that were revoked, with one get_many."""
+    keys = {_revocation_key(payload['jti']): payload['jti'] for payload in payloads if payload.get('jti')}
+    if not keys:
+        return set()
+    return {keys[key] for key in cache.get_many(list(keys))}
+
+
+def validate(token):
+    """Decode, check the claims and the revocation list; used per request by MetaJWTAuthentication."""
+    payload = decode(token)
+    if any(not payload.get(claim) for claim in REQUIRED_CLAIMS):
+        raise jwt.InvalidTokenError('Missing claims')
+    if revoked_jtis([payload]):
+        raise jwt.InvalidTokenError('Token revoked')
+    return payload
+
+
+def introspect(tokens):
+    """
+    Validate a batch of tokens in one pass: decodes go through the shared
+    cache, duplicates are decoded once and the revocation list is read with a
+    single get_many. Returns one result per token, in order.
+    """
+    decoded = {}
+    errors = {}
+    for token in dict.fromkeys(tokens):
+        try:
+            payload = decode(token)
+        except jwt.ExpiredSignatureError:
+            errors[token] = 'expired'
+            continue
+        except jwt.InvalidTokenError:
+            errors[token] = 'invalid'
+            continue
+        if any(not payload.get(claim) for claim in REQUIRED_CLAIMS):
+            errors[token] = 'invalid'
+        else:
+            decoded[token] = payload
+
+    revoked = revoked_jtis(decoded.values())
+    results = []
+    for token in tokens:
+        payload = decoded.get(token)
+        if payload is None:
+            results.append({'active': False, 'error': errors[token]})
+        elif payload.get('jti') in revoked:
+            results.append({'active': False, 'error': 'revoked'})
+        else:
+            results.append({
+                'active': True,
+                'token_type': 'refresh' if payload.get('refresh') else 'access',
+                'exp': payload.get('exp'),
+                'claims': payload,
+            })
+    return results
@@ -0,0 +1,94 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from meta_api_app.models import GameAccount, Guild
+from meta_api_app.models.game_account import GUILD_TRACKED_FIELDS
+from meta_api_app.services.friends import release_friendships
+from meta_api_app.services.guilds import apply_member_change, recompute_guild_aggregates
+from meta_api_app.services.player_search import SEARCH_FIELDS, get_search_backend
+from meta_api_app.services.sharding import forget_account, is_sharded, shard_aliases, sync_lookup
+
+# Model fields whose changes can affect the search index
+SEARCH_MODEL_FIELDS = {field.split('__')[0] for field in SEARCH_FIELDS}
+
+
+@receiver(post_save, sender=GameAccount)
+def index_game_account(sender, instance, update_fields=None, **kwargs):
+    """Keep the player search index current when searchable fields change."""
+    if update_fields is not None and not set(update_fields) & {*SEARCH_MODEL_FIELDS, 'is_active'}:
+        return
+    get_search_backend().index_account(instance)
+
+
+@receiver(post_delete, sender=GameAccount)
+def unindex_game_account(sender, instance, **kwargs):
+    get_search_backend().remove_account(instance.id)
+
+
+@receiver(post_save, sender=Guild)
+def reindex_guild_members(sender, instance, created, update_fields=None, **kwargs):
+    """A rename changes the searchable guild name of every member."""
+    if created or (update_fields is not None and 'name' not in update_fields):
+        return
+    get_search_backend().index_guild(instance)
+
+
+@receiver(post_save, sender=GameAccount)
+def update_guild_aggregates(sender, instance, created, update_fields=None, **kwargs):
+    """Apply the member's guild/XP/score change to the guild aggregates as deltas."""
+    old = None if created else instance._guild_snapshot
+    new = instance.guild_snapshot()
+
+    if update_fields is not None:
+        saved = {name for field in update_fields for name in (field, f'{field}_id')}
+        if not saved & set(GUILD_TRACKED_FIELDS):
+            return
+        if old is not None and new is not None:
+            # Unsaved in-memory changes of other tracked fields are not in the database
+            new = tuple(value if name in saved else previous
+                        for name, value, previous in zip(GUILD_TRACKED_FIELDS, new, old))
+
+    if not created and (old is None or new is None):
+        # Loaded with deferred fields: the previous values are unknown
+        guild_id = instance.__dict__.get('guild_id')
+        if guild_id is not None:
+            recompute_guild_aggregates([guild_id])
+    else:
+        apply_member_change(old, new)
+    instance._guild_snapshot = new
+
+
+@receiver(post_delete, sender=GameAccount)
+def remove_guild_member(sender, instance, **kwargs):
+    old = instance._guild_snapshot or instance.guild_snapshot()
+    if old is not None:
+        apply_member_change(old, None)
+    elif instance.__dict__.get('guild_id') is not None:
+        recompute_guild_aggregates([instance.guild_id])
+
+
+@receiver(pre_delete, sender=GameAccount)
+def release_account_friendships(sender, instance, **kwargs):
+    """The edges cascade with the account; the friends' counters are decremented here."""
+    release_friendships(instance.id)
+
+
+@receiver(pre_save, sender=GameAccount)
+def sync_account_lookup(sender, instance, update_fields=None, **kwargs):
+    """Sharded accounts: a username/email change is claimed in the lookup index before the row is written."""
+    sync_lookup(instance, update_fields)
+
+
+@receiver(post_delete, sender=GameAccount)
+def remove_account_lookup(sender, instance, **kwargs):
+    forget_account(instance)
+
+
+@receiver(pre_delete, sender=Guild)
+def release_sharded_members(sender, instance, using, **kwargs):
+    """The SET_NULL cascade only reaches members on the guild's database; the other shards are updated here."""
+    if not is_sharded():
+        return
+    for shard in shard_aliases():
+        if shard != using:
+            GameAccount.objects.using(shard).filter(guild_id=instance.pk).update(guild=None)
@@ -0,0 +1,5 @@
+from meta_api_app.tasks.account import bulk_account_action, record_logins
+from meta_api_app.tasks.activity import record_activity, rollup_activity
+from meta_api_app.tasks.analytics import record_analytics_events
+from meta_api_app.tasks.cache import warm_caches
+from meta_api_app.tasks.season import apply_season_rewards
@@ -0,0 +1,123 @@
+import base64
+import logging
+import pickle
+
+from celery import shared_task
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from meta_api_app.models import GameAccount
+from meta_api_app.services.player_search import get_search_backend
+from meta_api_app.services.sharding import shard_aliases, shards_of
+
+logger = logging.getLogger(__name__)
+
+RETRY_OPTIONS = {
+    'autoretry_for': (DatabaseError,),
+    'retry_backoff': True,
+    'retry_backoff_max': 600,
+    'retry_jitter': True,
+    'max_retries': 5,
+}
+
+
+@shared_task(**RETRY_OPTIONS)
+def record_logins(events):
+    """
+    Persist last_login_at for a batch of logins in a single UPDATE.
+    `events` is a list of {'account_id', 'logged_in_at'} dicts. Batches can
+    run out of order (retries, several workers), so a stored login that is
+    newer than the batch's is kept.
+    """
+    latest = {}
+    for event in events:
+        logged_in_at = parse_datetime(event['logged_in_at'])
+        account_id = event['account_id']
+        if account_id not in latest or logged_in_at > latest[account_id]:
+            latest[account_id] = logged_in_at
+
+    updated = 0
+    # One UPDATE per shard (a single one when accounts are not sharded)
+    for shard, ids in shards_of(latest).items():
+        accounts = [
+            GameAccount(id=account_id, last_login_at=_later_login(latest[account_id])) for account_id in ids
+        ]
+        GameAccount.objects.using(shard).bulk_update(accounts, ['last_login_at'])
+        updated += len(accounts)
+    logger.debug(f"record_logins updated {updated} accounts from {len(events)} events")
+    return updated
+
+
+def _later_login(logged_in_at):
+    # GREATEST is NULL on SQLite when an argument is NULL, hence the COALESCE
+    value = Value(logged_in_at)
+    return Greatest(Coalesce(F('last_login_at'), value), value)
+
+
+DAILY_BONUS_AMOUNT = 100
+
+# Set-based account updates used by the admin bulk actions; each bumps the
+# optimistic-concurrency version so in-flight profile PATCHes get a 409
+BULK_ACCOUNT_ACTIONS = {
+    'reset_energy': lambda: {'energy': F('max_energy'), 'energy_updated_at': timezone.now(), 'version': F('version') + 1},
+    'add_daily_bonus': lambda: {'coins': F('coins') + DAILY_BONUS_AMOUNT, 'version': F('version') + 1},
+    'deactivate_accounts': lambda: {'is_active': False, 'version': F('version') + 1},
+}
+# Actions changing what player search indexes; the UPDATEs bypass its save signals
+SEARCH_INDEXED_ACTIONS = {'deactivate_accounts'}
+
+
+def apply_bulk_action(queryset, action):
+    """Run a BULK_ACCOUNT_ACTIONS update on `queryset`; returns the number of accounts updated."""
+    updated = queryset.update(**BULK_ACCOUNT_ACTIONS[action]())
+    if updated and action in SEARCH_INDEXED_ACTIONS:
+        get_search_backend().reset()
+    return updated
+
+
+# Salt of the signed changelist filters handed to bulk_account_action
+FILTER_SALT = 'meta_api_app.bulk_account_action'
+
+
+def dump_filter(queryset):
+    """
+    The filter of an account queryset (e.g. an admin changelist selection) as
+    a task argument: its pickled query, signed with SECRET_KEY so a worker
+    only unpickles what this project produced.
+    """
+    data = base64.b64encode(pickle.dumps(queryset.query)).decode()
+    return signing.Signer(salt=FILTER_SALT).sign(data)
+
+
+def load_filter(value, using=DEFAULT_DB_ALIAS):
+    """The account queryset of a dump_filter() value; raises signing.BadSignature."""
+    data = signing.Signer(salt=FILTER_SALT).unsign(value)
+    queryset = GameAccount.objects.using(using).all()
+    queryset.query = pickle.loads(base64.b64decode(data))
+    return queryset
+
+
+@shared_task(**RETRY_OPTIONS)
+def bulk_account_action(action, first_id, last_id, account_ids=None, account_filter=None, using=None):
+    """
+    Apply a bulk admin action to accounts with first_id <= id <= last_id.
+    When `account_ids` is given only those ids in the range are touched;
+    `account_filter` (from dump_filter) limits the range to a changelist
+    selection on the `using` database.
+    """
+    if account_filter is not None:
+        querysets = [load_filter(account_filter, using or DEFAULT_DB_ALIAS)]
+    else:
+        querysets = [GameAccount.objects.using(shard) for shard in shard_aliases()]
+    updated = 0
+    for queryset in querysets:
+        queryset = queryset.filter(id__gte=first_id, id__lte=last_id)
+        if account_ids is not None:
+            queryset = queryset.filter(id__in=account_ids)
+        updated += apply_bulk_action(queryset, action)
+    logger.info(f"bulk_account_action {action} [{first_id}, {last_id}] updated {updated} accounts")
+    return updated
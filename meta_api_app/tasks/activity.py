@@ -0,0 +1,34 @@
+import logging
+from datetime import date, timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from meta_api_app.services.activity import get_activity_tracker
+from meta_api_app.tasks.account import RETRY_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(**RETRY_OPTIONS)
+def record_activity(events):
+    """Mark a batch of activity events in the daily bitmaps and refresh the day counts."""
+    return get_activity_tracker().record(events)
+
+
+@shared_task(**RETRY_OPTIONS)
+def rollup_activity(day=None):
+    """
+    Snapshot the bitmaps of `day` (ISO date) into DailyActivity.
+    Without a day, today and yesterday are persisted so late events are kept.
+    """
+    if day is not None:
+        days = [date.fromisoformat(day)]
+    else:
+        today = timezone.localdate()
+        days = [today - timedelta(days=1), today]
+    tracker = get_activity_tracker()
+    tracker.hydrate(days)
+    tracker.persist(days)
+    logger.info(f"rollup_activity persisted {', '.join(d.isoformat() for d in days)}")
+    return len(days)
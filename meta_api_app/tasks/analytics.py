@@ -0,0 +1,17 @@
+import json
+import logging
+
+from celery import shared_task
+
+from meta_api_app.tasks.account import RETRY_OPTIONS
+
+logger = logging.getLogger(__name__)
+analytics_logger = logging.getLogger('meta_api_app.analytics')
+
+
+@shared_task(**RETRY_OPTIONS)
+def record_analytics_events(events):
+    """Write a batch of analytics events, one JSON line per event."""
+    for event in events:
+        analytics_logger.info(json.dumps(event, separators=(',', ':'), default=str))
+    return len(events)
@@ -0,0 +1,16 @@
+import logging
+
+from celery import shared_task
+
+from meta_api_app.services.player_search import get_search_backend
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def warm_caches():
+    """Prime in-process caches of the process that runs this task."""
+    backend = get_search_backend()
+    if hasattr(backend, 'ensure_loaded'):
+        backend.ensure_loaded()
+    logger.info("warm_caches finished")
@@ -0,0 +1,123 @@
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+def uses_local_broker():
+    """The kombu memory transport only reaches consumers in this process."""
+    return str(settings.CELERY_BROKER_URL).startswith('memory://')
+
+
+class LocalTaskRunner:
+    """
+    In-process stand-in for a broker and worker, used with the memory:// broker.
+
+    Tasks are queued and executed on a daemon thread through Task.apply(), so
+    the request that enqueued them is not blocked and everything runs offline.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, task, args, kwargs):
+        self._ensure_started()
+        self._queue.put((task, args, kwargs))
+
+    def join(self):
+        """Block until every queued task has run."""
+        self._queue.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='local-task-runner', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            task, args, kwargs = self._queue.get()
+            try:
+                result = task.apply(args=args, kwargs=kwargs)
+                if result.failed():
+                    logger.error(f"Local task {task.name} failed: {result.result}")
+            except Exception as e:
+                logger.error(f"Local task {task.name} crashed: {str(e)}")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+local_runner = LocalTaskRunner()
+
+
+def dispatch(task, *args, **kwargs):
+    """
+    Queue a non-critical side effect.
+    Failures to enqueue are logged instead of failing the request that triggered them.
+    """
+    try:
+        if settings.CELERY_TASK_ALWAYS_EAGER:
+            return task.apply(args=args, kwargs=kwargs)
+        if uses_local_broker():
+            local_runner.submit(task, args, kwargs)
+            return None
+        return task.apply_async(args=args, kwargs=kwargs)
+    except Exception as e:
+        logger.error(f"Failed to dispatch task {task.name}: {str(e)}")
+        return None
+
+
+class EventBatcher:
+    """
+    Buffer small events and send them to `task` as one list.
+
+    A batch is flushed when it reaches `max_size` events or `max_delay`
+    seconds after its first event, whichever comes first. In eager mode
+    every event is flushed immediately so tests see the effect at once.
+    """
+
+    def __init__(self, task, max_size=None, max_delay=None):
+        self.task = task
+        self.max_size = max_size or settings.META_TASK_BATCH_SIZE
+        self.max_delay = max_delay if max_delay is not None else settings.META_TASK_BATCH_MAX_DELAY
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._timer = None
+        atexit.register(self.flush)
+
+    def add(self, event):
+        with self._lock:
+            self._buffer.append(event)
+            if settings.CELERY_TASK_ALWAYS_EAGER or len(self._buffer) >= self.max_size:
+                batch = self._take()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.max_delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            dispatch(self.task, batch)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            dispatch(self.task, batch)
+
+    def _take(self):
+        batch, self._buffer = self._buffer, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
@@ -0,0 +1,40 @@
+from django.utils import timezone
+
+from meta_api_app.tasks.account import record_logins
+from meta_api_app.tasks.activity import record_activity
+from meta_api_app.tasks.analytics import record_analytics_events
+from meta_api_app.tasks.dispatch import EventBatcher
+
+login_batcher = EventBatcher(record_logins)
+analytics_batcher = EventBatcher(record_analytics_events)
+activity_batcher = EventBatcher(record_activity)
+
+
+def publish_login(account, logged_in_at=None):
+    """Queue login bookkeeping for `account` and emit a login analytics event."""
+    logged_in_at = logged_in_at or timezone.now()
+    login_batcher.add({'account_id': account.id, 'logged_in_at': logged_in_at.isoformat()})
+    mark_activity('active', account.id, logged_in_at)
+    track_event('login', account_id=account.id, timestamp=logged_in_at)
+
+
+def publish_registration(account):
+    """Add a newly registered account to today's registration cohort."""
+    mark_activity('new', account.id, account.created_at)
+    track_event('register', account_id=account.id, timestamp=account.created_at)
+
+
+def mark_activity(kind, account_id, timestamp=None):
+    """Queue an update of the daily activity bitmaps (see meta_api_app/services/activity.py)."""
+    day = timezone.localdate(timestamp or timezone.now())
+    activity_batcher.add({'kind': kind, 'account_id': account_id, 'day': day.isoformat()})
+
+
+def track_event(name, account_id=None, timestamp=None, **properties):
+    """Queue an analytics event; events are delivered in batches."""
+    analytics_batcher.add({
+        'event': name,
+        'account_id': account_id,
+        'timestamp': (timestamp or timezone.now()).isoformat(),
+        'properties': properties,
+    })
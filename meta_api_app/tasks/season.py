@@ -0,0 +1,26 @@
+import logging
+
+from celery import shared_task
+
+from meta_api_app.services.season import run_chunks, start_run
+from meta_api_app.tasks.account import RETRY_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, **RETRY_OPTIONS)
+def apply_season_rewards(self, season, rules, chunk_size=5000):
+    """
+    Reward every account for `season`. A retry resumes from the last
+    checkpoint; progress is published as the PROGRESS task state.
+    """
+    run = start_run(season, rules)
+
+    def publish(run):
+        self.update_state(state='PROGRESS', meta={
+            'season': run.season, 'last_id': run.last_id, 'max_id': run.max_id,
+            'processed_accounts': run.processed_accounts, 'progress': run.progress,
+        })
+
+    run = run_chunks(run, chunk_size, progress=publish)
+    return run.processed_accounts
@@ -1,3 +1,880 @@
-from django.test import TestCase
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import tempfile
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+from meta_api_app import jwt_keys
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.models import AccountLookup, ArchivedAccount, DailyActivity, Friendship, GameAccount, Guild
+from meta_api_app.models.game_account import regenerate
+from meta_api_app.serializers.game_account import GameAccountRegistrationSerializer
+from meta_api_app.services.account_import import AccountImporter
+from meta_api_app.services import activity, export
+from meta_api_app.services.archive import archive_cold_accounts
+from meta_api_app.services.player_search import get_search_backend
+from meta_api_app.services.presence import MAX_PRESENCE_QUERY
+from meta_api_app.services.season import DEFAULT_SEASON_RULES, SeasonRewardError, run_chunks, start_run
+from meta_api_app.services.sharding import (
+    account_queryset, home_shard, jump_hash, misplaced_accounts, move_accounts, reconcile_shard, shard_counts,
+)
+from meta_api_app.tasks.account import bulk_account_action, load_filter, record_logins
+from meta_api_app.tasks.dispatch import dispatch
+from meta_project import idempotency, warmup
+from meta_project.profiling import PROFILE_ID_HEADER, StackSampler, create_token, get_profile
+from meta_project.middleware.admission import AdmissionControlMiddleware
+from meta_project.middleware.compression import CompressionMiddleware, compression_stats
+
+
+def api_client():
+    """API client carrying a valid client access token."""
+    token = MetaJWTAuthentication._create_tokens('tests', 'monday', 'may', '12345678')['access']
+    return APIClient(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+def create_accounts(count, **fields):
+    return [
+        GameAccount.objects.create(username=f'player{i}', email=f'player{i}@example.com', password_hash='x', **fields)
+        for i in range(count)
+    ]
+
+
+def register(client, username, email, password='secret12'):
+    return client.post('/api/game/register/', {
+        'username': username, 'email': email, 'password': password, 'password_confirm': password,
+    }, format='json')
+
+
+class RegistrationTests(TestCase):
+    def setUp(self):
+        self.client = api_client()
+        self.assertEqual(register(self.client, 'bestusername', 'best@example.com').status_code, 201)
+
+    def test_duplicate_username(self):
+        response = register(self.client, 'bestusername', 'other@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['username'])
+
+    def test_duplicate_email(self):
+        response = register(self.client, 'someone', 'best@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['email'])
+        self.assertEqual(GameAccount.objects.count(), 1)
+
+    def test_postgresql_violation_is_mapped_by_constraint_name(self):
+        # The DETAIL line echoes the submitted email, which contains "username"
+        error = IntegrityError(
+            'duplicate key value violates unique constraint "meta_api_app_gameaccount_email_key"\n'
+            'DETAIL:  Key (email)=(bestusername@example.com) already exists.'
+        )
+        cause = Exception()
+        cause.diag = SimpleNamespace(constraint_name='meta_api_app_gameaccount_email_key')
+        error.__cause__ = cause
+        self.assertEqual(GameAccountRegistrationSerializer.unique_violation_field(error), 'email')
+
+    def test_login_by_username_and_email(self):
+        for login in ('bestusername', 'best@example.com'):
+            response = self.client.post('/api/game/login/', {'username': login, 'password': 'secret12'}, format='json')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/game/login/', {'username': 'bestusername', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class ReadinessTests(TestCase):
+    def setUp(self):
+        warmup._ready.clear()
+        warmup._last_attempt = float('-inf')
+        self.addCleanup(warmup._ready.clear)
+
+    @override_settings(WARMUP_ON_START=False)
+    def test_ready_without_warm_up(self):
+        self.assertEqual(self.client.get('/ready/').status_code, 200)
+
+    @override_settings(WARMUP_ON_START=True)
+    def test_failed_warm_up_is_retried(self):
+        unreachable = mock.MagicMock()
+        unreachable.__getitem__.return_value.get.side_effect = ConnectionError('cache down')
+        with mock.patch.object(warmup, 'caches', unreachable):
+            self.assertFalse(warmup.warm_up())
+            self.assertEqual(self.client.get('/ready/').status_code, 503)
+
+        # Within the retry interval the failure is reported without another attempt
+        self.assertEqual(self.client.get('/ready/').status_code, 503)
+        warmup._last_attempt -= warmup.RETRY_INTERVAL
+        self.assertEqual(self.client.get('/ready/').status_code, 200)
+
+
+class AccountImportTests(TestCase):
+    def test_derived_counters_are_not_imported(self):
+        account, _, error = AccountImporter(workers=1).build_account({
+            'username': 'imported', 'email': 'imported@example.com', 'password_hash': 'x',
+            'coins': '50', 'friends_count': '12', 'version': '9',
+        })
+        self.assertIsNone(error)
+        self.assertEqual((account.coins, account.friends_count, account.version), (50, 0, 0))
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = api_client()
+        self.accounts = create_accounts(3)
+
+    def add_friend(self, account, friend, key, **extra):
+        return self.client.post(
+            f'/api/game/accounts/{account.id}/friends/', {'friend_id': friend.id, **extra},
+            format='json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_is_replayed(self):
+        first = self.add_friend(self.accounts[0], self.accounts[1], 'key-1')
+        retry = self.add_friend(self.accounts[0], self.accounts[1], 'key-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry[idempotency.REPLAYED_HEADER], 'true')
+        self.assertEqual(Friendship.objects.count(), 2)
+
+    def test_keys_are_scoped_per_account(self):
+        self.add_friend(self.accounts[0], self.accounts[1], 'key-1')
+        other = self.add_friend(self.accounts[2], self.accounts[1], 'key-1')
+        self.assertEqual(other.status_code, 201)
+        self.assertFalse(other.has_header(idempotency.REPLAYED_HEADER))
+        self.assertEqual(Friendship.objects.count(), 4)
+
+    def test_reused_key_with_another_body(self):
+        self.add_friend(self.accounts[0], self.accounts[1], 'key-1')
+        self.assertEqual(self.add_friend(self.accounts[0], self.accounts[2], 'key-1').status_code, 422)
+
+    @override_settings(META_IDEMPOTENCY_WAIT=0)
+    def test_duplicate_gets_409_once_the_wait_runs_out(self):
+        # The lock is held by a request still running elsewhere
+        with mock.patch.object(idempotency.cache, 'add', return_value=False):
+            response = self.add_friend(self.accounts[0], self.accounts[1], 'key-1')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], str(idempotency.RETRY_AFTER))
+        self.assertFalse(Friendship.objects.exists())
+
+
+
+class SlowView(idempotency.IdempotencyMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+    calls = 0
+
+    def post(self, request, account_id):
+        type(self).calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return Response({'call': self.calls}, status=201)
+
+
+class ConcurrentIdempotencyTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        SlowView.calls = 0
+        SlowView.started = threading.Event()
+        SlowView.release = threading.Event()
+
+    def post(self, responses):
+        request = APIRequestFactory().post('/slow/', {'n': 1}, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        responses.append(SlowView.as_view()(request, account_id=1))
+
+    def test_overlapping_duplicate_waits_for_the_first_result(self):
+        first, duplicate = [], []
+        runner = threading.Thread(target=self.post, args=(first,))
+        runner.start()
+        self.assertTrue(SlowView.started.wait(5))
+        waiter = threading.Thread(target=self.post, args=(duplicate,))
+        waiter.start()
+        time.sleep(0.2)
+        SlowView.release.set()
+        runner.join(5)
+        waiter.join(5)
+
+        self.assertEqual(SlowView.calls, 1)
+        self.assertEqual((first[0].status_code, first[0].data), (201, {'call': 1}))
+        self.assertEqual((duplicate[0].status_code, duplicate[0].data), (201, {'call': 1}))
+        self.assertEqual(duplicate[0][idempotency.REPLAYED_HEADER], 'true')
+
+
+class AdmissionControlTests(SimpleTestCase):
+    CONFIG = {
+        'client_ip_header': 'HTTP_X_FORWARDED_FOR',
+        'trusted_proxies': ['10.0.0.0/24'],
+        'classes': {'auth': {'paths': ['/api/game/login/'], 'rate': 0.001, 'burst': 2}},
+    }
+
+    def login(self, middleware, remote, forwarded=None):
+        extra = {'REMOTE_ADDR': remote}
+        if forwarded is not None:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded
+        return middleware(RequestFactory().post('/api/game/login/', **extra)).status_code
+
+    def test_clients_behind_the_proxy_get_their_own_bucket(self):
+        with override_settings(META_ADMISSION=self.CONFIG):
+            middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        statuses = [self.login(middleware, '10.0.0.5', '203.0.113.1') for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(self.login(middleware, '10.0.0.5', '203.0.113.2'), 200)
+
+    def test_client_supplied_entries_are_ignored(self):
+        with override_settings(META_ADMISSION=self.CONFIG):
+            middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        for spoofed in ('198.51.100.1', '198.51.100.2', '198.51.100.3'):
+            status = self.login(middleware, '10.0.0.5', f'{spoofed}, 203.0.113.1')
+        self.assertEqual(status, 429)
+        # Not sent by a trusted proxy: the header is not read at all
+        self.assertEqual([self.login(middleware, '192.0.2.9', f'203.0.113.{i}') for i in range(3)], [200, 200, 429])
+
+    def test_forwarded_header_requires_trusted_proxies(self):
+        with override_settings(META_ADMISSION={'client_ip_header': 'HTTP_X_FORWARDED_FOR'}):
+            with self.assertRaises(ImproperlyConfigured):
+                AdmissionControlMiddleware(lambda request: HttpResponse())
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        compression_stats.reset()
+        self.addCleanup(compression_stats.reset)
+
+    def compress(self, body):
+        with override_settings(META_COMPRESSION={'algorithms': ['gzip'], 'min_size': 16}):
+            middleware = CompressionMiddleware(lambda request: HttpResponse(body, content_type='application/json'))
+        return middleware(RequestFactory().get('/api/game/guilds/', HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_only_compressed_responses_are_counted(self):
+        self.assertEqual(self.compress(b'{"a": 1}' * 200)['Content-Encoding'], 'gzip')
+        incompressible = os.urandom(1024)
+        self.assertFalse(self.compress(incompressible).has_header('Content-Encoding'))
+
+        gzip_stats = compression_stats.snapshot()['gzip']
+        self.assertEqual((gzip_stats['responses'], gzip_stats['not_smaller']), (1, 1))
+        self.assertEqual(gzip_stats['original_bytes'], 1600)
+        self.assertGreater(gzip_stats['ratio'], 1)
+
+    def test_admin_page(self):
+        self.compress(b'{"a": 1}' * 200)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.get('/meta-admin/compression/')
+        self.assertContains(response, '<td>gzip</td>', html=False)
+        self.client.post('/meta-admin/compression/')
+        self.assertEqual(compression_stats.snapshot(), {})
+
+
+class RecordLoginsTests(TestCase):
+    def test_older_batches_do_not_overwrite_newer_logins(self):
+        now = timezone.now()
+        fresh, stale, never = create_accounts(3)
+        GameAccount.objects.filter(pk=fresh.pk).update(last_login_at=now)
+        GameAccount.objects.filter(pk=stale.pk).update(last_login_at=now - timedelta(hours=2))
+
+        earlier = (now - timedelta(hours=1)).isoformat()
+        self.assertEqual(record_logins([
+            {'account_id': account.pk, 'logged_in_at': earlier} for account in (fresh, stale, never)
+        ]), 3)
+        stored = dict(GameAccount.objects.values_list('pk', 'last_login_at'))
+        self.assertEqual(stored[fresh.pk], now)
+        self.assertEqual(stored[stale.pk].isoformat(), earlier)
+        self.assertEqual(stored[never.pk].isoformat(), earlier)
+
+
+class GameAccountAdminTests(TestCase):
+    def setUp(self):
+        create_accounts(3)
+        GameAccount.objects.filter(username='player0').update(rank_tier='Gold')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    @override_settings(ADMIN_LARGE_TABLE_MODE=True)
+    def test_large_table_changelist_runs_no_distinct_scans(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/meta-admin/meta_api_app/gameaccount/', {'rank_tier': 'Gold'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([account.username for account in response.context['cl'].result_list], ['player0'])
+        self.assertFalse(response.context['cl'].show_full_result_count)
+        self.assertFalse([query for query in queries if 'DISTINCT' in query['sql']])
+
+    @override_settings(ADMIN_LARGE_TABLE_MODE=False)
+    def test_small_table_changelist_shows_full_count(self):
+        response = self.client.get('/meta-admin/meta_api_app/gameaccount/')
+        self.assertTrue(response.context['cl'].show_full_result_count)
+
+
+    @override_settings(ADMIN_LARGE_TABLE_MODE=True)
+    def test_select_all_queues_id_ranges_with_the_changelist_filter(self):
+        ids = list(GameAccount.objects.order_by('id').values_list('id', flat=True))
+        GameAccount.objects.filter(id=ids[2]).update(rank_tier='Gold')
+        with mock.patch('meta_api_app.admin.game_account.BULK_ACTION_CHUNK_SIZE', 2), \
+                mock.patch('meta_api_app.admin.game_account.dispatch', side_effect=dispatch) as queued:
+            response = self.client.post('/meta-admin/meta_api_app/gameaccount/?rank_tier=Gold', {
+                'action': 'add_daily_bonus', 'select_across': '1', 'index': 0, '_selected_action': [ids[0]],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual([call.args[2:4] for call in queued.call_args_list], [(ids[0], ids[1]), (ids[2], ids[2])])
+        self.assertEqual(
+            dict(GameAccount.objects.values_list('username', 'coins')), {'player0': 100, 'player1': 0, 'player2': 100}
+        )
+        with self.assertRaises(signing.BadSignature):
+            load_filter(queued.call_args.kwargs['account_filter'] + 'x')
+
+class StackSamplerTests(SimpleTestCase):
+    def test_stop_waits_for_the_sampling_thread(self):
+        sampler = StackSampler(0.001)
+        sampler.start()
+        deadline = time.monotonic() + 0.05
+        while time.monotonic() < deadline:
+            pass
+        sampler.stop()
+        samples = dict(sampler.samples)
+        time.sleep(0.01)
+        self.assertTrue(samples)
+        self.assertEqual(dict(sampler.samples), samples)
+
+
+class ProfilingTests(TestCase):
+    def test_profiled_request_is_stored(self):
+        account = create_accounts(1)[0]
+        client = api_client()
+        self.assertFalse(client.get(f'/api/game/accounts/{account.id}/friends/').has_header(PROFILE_ID_HEADER))
+
+        response = client.get(f'/api/game/accounts/{account.id}/friends/', HTTP_X_META_PROFILE=create_token('tests'))
+        profile = get_profile(int(response[PROFILE_ID_HEADER]))
+        self.assertEqual((profile['status'], profile['trigger']), (200, 'header:tests'))
+        self.assertGreater(profile['query_count'], 0)
+        self.assertGreaterEqual(profile['stack_samples'], sum(stack['samples'] for stack in profile['stacks']))
+
+
+class SeasonRewardTests(TestCase):
+    def test_interrupted_run_resumes_from_its_checkpoint(self):
+        create_accounts(5, rank_tier='Silver')
+
+        def interrupt(run):
+            raise RuntimeError('worker stopped')
+
+        run = start_run('s1', DEFAULT_SEASON_RULES)
+        with self.assertRaises(RuntimeError):
+            run_chunks(run, chunk_size=2, progress=interrupt)
+
+        resumed = start_run('s1', DEFAULT_SEASON_RULES)
+        self.assertEqual((resumed.pk, resumed.last_id), (run.pk, 2))
+        run_chunks(resumed, chunk_size=2)
+        self.assertEqual(resumed.processed_accounts, 5)
+        self.assertEqual(
+            set(GameAccount.objects.values_list('coins', 'rank_tier')), {(200, 'Bronze')}
+        )
+        with self.assertRaisesMessage(SeasonRewardError, 'already rewarded'):
+            start_run('s1', DEFAULT_SEASON_RULES)
+
+    def test_second_worker_does_not_reward_twice(self):
+        create_accounts(3, rank_tier='Gold')
+        run = start_run('s1', DEFAULT_SEASON_RULES)
+        stale = start_run('s1', DEFAULT_SEASON_RULES)
+        run_chunks(run, chunk_size=2)
+
+        with self.assertRaisesMessage(SeasonRewardError, 'another worker'):
+            run_chunks(stale, chunk_size=2)
+        self.assertEqual(set(GameAccount.objects.values_list('coins', flat=True)), {400})
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Ties on total_experience straddle the page boundaries
+        for i, experience in enumerate([500, 300, 300, 300, 300, 100, 100]):
+            Guild.objects.create(name=f'guild{i}', total_experience=experience)
+        self.client = api_client()
+
+    def names(self, response):
+        return [guild['name'] for guild in response.json()['results']]
+
+    def test_pages_cover_every_row_once_in_both_directions(self):
+        expected = [guild.name for guild in Guild.objects.order_by('-total_experience', 'id')]
+        pages = []
+        response = self.client.get('/api/game/guilds/leaderboard/?page_size=3')
+        while True:
+            pages.append(self.names(response))
+            if not response.json()['next']:
+                break
+            response = self.client.get(response.json()['next'])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        response = self.client.get(response.json()['previous'])
+        self.assertEqual(self.names(response), pages[1])
+        response = self.client.get(response.json()['previous'])
+        self.assertEqual(self.names(response), pages[0])
+        self.assertIsNone(response.json()['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/game/guilds/leaderboard/?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+
+class ProfileUpdateTests(TestCase):
+    def test_stale_version_is_rejected(self):
+        account = create_accounts(1)[0]
+        client = api_client()
+        url = f'/api/game/accounts/{account.id}/profile/'
+        version = client.get(url).json()['account']['version']
+
+        response = client.patch(url, {'version': version, 'character_name': 'Hero'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated_fields'], ['character_name'])
+
+        response = client.patch(url, {'version': version, 'character_name': 'Villain'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['current_version'], version + 1)
+        account.refresh_from_db()
+        self.assertEqual(account.character_name, 'Hero')
+
+
+class KeyRotationTests(SimpleTestCase):
+    def setUp(self):
+        keys_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(keys_dir.cleanup)
+        self.keys_dir = keys_dir.name
+        settings_override = override_settings(META_JWT={'algorithm': 'EdDSA', 'keys_dir': self.keys_dir})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(jwt_keys.reset_keyring)
+        jwt_keys.reset_keyring()
+
+        # An old key that is already signing
+        self.old_kid = '20200101T000000Z-eddsa'
+        pem = jwt_keys.ed25519.Ed25519PrivateKey.generate().private_bytes(
+            jwt_keys.serialization.Encoding.PEM, jwt_keys.serialization.PrivateFormat.PKCS8,
+            jwt_keys.serialization.NoEncryption(),
+        )
+        with open(os.path.join(self.keys_dir, f'{self.old_kid}.pem'), 'wb') as f:
+            f.write(pem)
+
+    def kid(self, token):
+        return jwt_keys.jwt.get_unverified_header(token)['kid']
+
+    def test_new_key_signs_only_after_it_was_published(self):
+        old_token = jwt_keys.encode_token({'username': 'tests'})
+        self.assertEqual(self.kid(old_token), self.old_kid)
+
+        new_kid = jwt_keys.generate_key(self.keys_dir, 'EdDSA')
+        jwt_keys.reset_keyring()
+        keyring = jwt_keys.get_keyring()
+        self.assertEqual({key['kid'] for key in json.loads(keyring.jwks_body)['keys']}, {self.old_kid, new_kid})
+        self.assertEqual(self.kid(jwt_keys.encode_token({'username': 'tests'})), self.old_kid)
+
+        published = timezone.now() + timedelta(seconds=2 * keyring.jwks_max_age + 1)
+        self.assertEqual(keyring.active(published).kid, new_kid)
+        self.assertEqual(keyring.retired(published), [])
+        self.assertEqual(jwt_keys.decode_token(old_token)['username'], 'tests')
+
+        expired = published + jwt_keys.MAX_TOKEN_LIFETIME + timedelta(seconds=2 * keyring.jwks_max_age)
+        self.assertEqual([key.kid for key in keyring.retired(expired)], [self.old_kid])
+
+    def test_hs256_tokens_are_refused_once_cut_off(self):
+        token = jwt_keys.jwt.encode({'username': 'tests'}, settings.SECRET_KEY, algorithm='HS256')
+        self.assertEqual(jwt_keys.decode_token(token)['username'], 'tests')
+        with override_settings(META_JWT={'algorithm': 'EdDSA', 'keys_dir': self.keys_dir, 'accept_hs256': False}):
+            with self.assertRaises(jwt_keys.jwt.InvalidAlgorithmError):
+                jwt_keys.decode_token(token)
+
+
+class TokenRevocationTests(TestCase):
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        tokens = MetaJWTAuthentication._create_tokens('tests', 'monday', 'may', '12345678')
+        client = APIClient(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        response = client.post('/api/token/introspect/', {'tokens': [tokens['access']]}, format='json')
+        self.assertTrue(response.json()['results'][0]['active'])
+
+        response = client.post('/api/game/logout/', {'refresh_token': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.post('/api/token/introspect/', {'tokens': ['x']}, format='json').status_code, 401)
+
+        response = api_client().post('/api/token/introspect/', {'tokens': [tokens['access'], tokens['refresh']]}, format='json')
+        self.assertEqual([result['error'] for result in response.json()['results']], ['revoked', 'revoked'])
+        response = APIClient().post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class FriendTests(TestCase):
+    def counts(self, *accounts):
+        return [GameAccount.objects.get(id=account.id).friends_count for account in accounts]
+
+    def test_add_and_remove_keep_both_counters(self):
+        first, second, third = create_accounts(3)
+        client = api_client()
+        url = f'/api/game/accounts/{first.id}/friends/'
+        self.assertEqual(client.post(url, {'friend_id': second.id}, format='json').status_code, 201)
+        self.assertEqual(client.post(url, {'friend_id': second.id}, format='json').status_code, 200)
+        client.post(f'/api/game/accounts/{third.id}/friends/', {'friend_id': second.id}, format='json')
+        self.assertEqual(self.counts(first, second, third), [1, 2, 1])
+
+        response = client.get(f'/api/game/accounts/{first.id}/friends/mutual/{third.id}/')
+        self.assertEqual(response.json()['mutual_friends'], 1)
+
+        self.assertEqual(client.delete(f'{url}{second.id}/').status_code, 200)
+        self.assertEqual(client.delete(f'{url}{second.id}/').status_code, 404)
+        self.assertEqual(self.counts(first, second, third), [0, 1, 1])
+        self.assertEqual(Friendship.objects.count(), 2)
+
+    def test_rejected_requests_leave_no_edges(self):
+        account = create_accounts(1)[0]
+        client = api_client()
+        url = f'/api/game/accounts/{account.id}/friends/'
+        self.assertEqual(client.post(url, {'friend_id': account.id}, format='json').status_code, 400)
+        self.assertEqual(client.post(url, {'friend_id': account.id + 100}, format='json').status_code, 400)
+        self.assertFalse(Friendship.objects.exists())
+        self.assertEqual(self.counts(account), [0])
+
+
+class ArchiveTests(TestCase):
+    def test_archived_account_is_restored_on_login(self):
+        client = api_client()
+        register(client, 'sleeper', 'sleeper@example.com')
+        register(client, 'awake', 'awake@example.com')
+        sleeper = GameAccount.objects.get(username='sleeper')
+        awake = GameAccount.objects.get(username='awake')
+        client.post(f'/api/game/accounts/{sleeper.id}/friends/', {'friend_id': awake.id}, format='json')
+        created_at = timezone.now() - timedelta(days=400)
+        GameAccount.objects.filter(id=sleeper.id).update(
+            coins=75, created_at=created_at, last_login_at=timezone.now() - timedelta(days=200)
+        )
+        GameAccount.objects.filter(id=awake.id).update(last_login_at=timezone.now())
+
+        self.assertEqual(archive_cold_accounts(idle_days=180), 1)
+        self.assertFalse(GameAccount.objects.filter(id=sleeper.id).exists())
+        self.assertEqual(GameAccount.objects.get(id=awake.id).friends_count, 0)
+        self.assertFalse(Friendship.objects.exists())
+        response = register(client, 'sleeper', 'other@example.com')
+        self.assertIn('username', response.json()['errors'])
+
+        response = client.post('/api/game/login/', {'username': 'sleeper', 'password': 'secret12'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        restored = GameAccount.objects.get(username='sleeper')
+        self.assertEqual((restored.id, restored.coins, restored.created_at), (sleeper.id, 75, created_at))
+        self.assertEqual([restored.friends_count, GameAccount.objects.get(id=awake.id).friends_count], [1, 1])
+        self.assertEqual(Friendship.objects.count(), 2)
+        self.assertFalse(ArchivedAccount.objects.exists())
+
+
+class JumpHashTests(SimpleTestCase):
+    def test_growing_the_bucket_count_only_moves_keys_to_the_new_bucket(self):
+        keys = range(1, 10001)
+        before = [jump_hash(key, 4) for key in keys]
+        after = [jump_hash(key, 5) for key in keys]
+        moved = [new for old, new in zip(before, after) if old != new]
+        self.assertEqual(set(moved), {4})
+        # About 1/5 of the keys move and each bucket gets about a fifth
+        self.assertAlmostEqual(len(moved) / len(keys), 0.2, delta=0.02)
+        self.assertTrue(all(1800 < after.count(bucket) < 2200 for bucket in range(5)))
+        self.assertEqual(before, [jump_hash(key, 4) for key in keys])
+
+
+SHARDED = {'enabled': True, 'shards': ['default', 'shard1']}
+
+
+class ShardRebalanceTests(TestCase):
+    databases = {'default', 'shard1'}
+
+    def test_rebalance_moves_accounts_to_their_home_shard(self):
+        # Accounts created before sharding was enabled all live on the default database
+        ids = [account.id for account in create_accounts(20, coins=5)]
+        with override_settings(META_SHARDING=SHARDED):
+            self.assertEqual(reconcile_shard('default'), (20, 0))
+            batches = list(misplaced_accounts())
+            self.assertEqual(len(batches), 1)
+            moving = batches[0][('default', 'shard1')]
+            self.assertEqual(sorted(moving), [i for i in ids if home_shard(i) == 'shard1'])
+
+            self.assertEqual(move_accounts(moving, 'default', 'shard1'), len(moving))
+            self.assertEqual(shard_counts(), {'default': 20 - len(moving), 'shard1': len(moving)})
+            self.assertEqual(list(misplaced_accounts()), [])
+            self.assertEqual(
+                set(AccountLookup.objects.filter(id__in=moving).values_list('shard', flat=True)), {'shard1'}
+            )
+            moved = account_queryset(moving[0]).get(pk=moving[0])
+            self.assertEqual((moved._state.db, moved.coins), ('shard1', 5))
+
+    def test_reconcile_removes_copies_left_by_an_interrupted_move(self):
+        account = create_accounts(1)[0]
+        with override_settings(META_SHARDING=SHARDED):
+            reconcile_shard('default')
+            # The copy was committed on the target but the lookup entry was not repointed
+            GameAccount.objects.using('shard1')._insert(
+                [account], fields=GameAccount._meta.concrete_fields, raw=True, using='shard1'
+            )
+            self.assertEqual(reconcile_shard('shard1'), (0, 1))
+            self.assertEqual(shard_counts(), {'default': 1, 'shard1': 0})
+
+
+GEVENT_STARTUP = """
+import sys
+from meta_project.green import patch_if_enabled
+early = [name for name in ('threading', 'socket', 'ssl', 'celery') if name in sys.modules]
+assert not early, f'imported before patching: {early}'
+assert patch_if_enabled(['manage.py', 'runserver'])
+
+import django
+import threading
+from celery import current_app
+from gevent import monkey
+django.setup()
+assert monkey.is_module_patched('threading') and monkey.is_module_patched('ssl')
+assert threading.Lock.__module__.startswith('gevent')
+assert current_app.main == 'meta_project'
+"""
+
+
+class GeventStartupTests(SimpleTestCase):
+    def test_standard_library_is_patched_before_it_is_imported(self):
+        env = {**os.environ, 'META_SERVER_MODE': 'gevent', 'DJANGO_SETTINGS_MODULE': 'meta_project.settings_test'}
+        result = subprocess.run(
+            [sys.executable, '-c', GEVENT_STARTUP], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class ExportAccountsTests(TestCase):
+    def test_resumed_export_writes_every_account_once(self):
+        ids = [account.id for account in create_accounts(10)]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'accounts.ndjson')
+        checkpoint = os.path.join(directory.name, 'accounts.checkpoint')
+        options = {'output': output, 'checkpoint': checkpoint, 'checkpoint_every': 3, 'stderr': io.StringIO()}
+        real_chunks = export.export_chunks
+
+        def crash_after_seven_chunks(*args, **kwargs):
+            for number, chunk in enumerate(real_chunks(*args, **kwargs), 1):
+                yield chunk
+                if number == 7:
+                    raise RuntimeError('worker killed')
+
+        # One row per chunk: the seventh is written but only six are checkpointed
+        with mock.patch.object(export, 'BUFFER_SIZE', 1):
+            with mock.patch('meta_api_app.management.commands.export_accounts.export_chunks', crash_after_seven_chunks):
+                with self.assertRaises(RuntimeError):
+                    call_command('export_accounts', **options)
+            call_command('export_accounts', **options)
+
+        with open(output) as f:
+            exported = [json.loads(line)['id'] for line in f]
+        self.assertEqual(exported, ids)
+
+
+class RegenerationTests(SimpleTestCase):
+    now = timezone.now()
+
+    def test_value_is_capped_at_the_maximum(self):
+        self.assertEqual(regenerate(95, 100, self.now - timedelta(hours=2), 12, self.now), (100, self.now))
+        self.assertEqual(regenerate(100, 100, self.now - timedelta(hours=2), 12, self.now), (100, self.now))
+
+    def test_partial_tick_is_carried_forward(self):
+        # 12 per hour is a point every 300 s; 750 s give two points and leave 150 s
+        since = self.now - timedelta(seconds=750)
+        value, anchor = regenerate(10, 100, since, 12, self.now)
+        self.assertEqual((value, anchor), (12, since + timedelta(seconds=600)))
+        later = self.now + timedelta(seconds=150)
+        self.assertEqual(regenerate(value, 100, anchor, 12, later), (13, later))
+        self.assertEqual(regenerate(value, 100, anchor, 12, later - timedelta(seconds=1)), (12, anchor))
+
+    def test_missing_anchor_or_rate_does_not_regenerate(self):
+        self.assertEqual(regenerate(10, 100, None, 12, self.now), (10, self.now))
+        self.assertEqual(regenerate(10, 100, self.now - timedelta(hours=5), 0, self.now), (10, self.now))
+
+
+class SpendEnergyTests(TestCase):
+    def test_spending_counts_regenerated_energy(self):
+        since = timezone.now() - timedelta(seconds=630)
+        account = create_accounts(1, energy=3, energy_updated_at=since)[0]
+        self.assertEqual(account.current_energy(), 5)
+
+        self.assertFalse(account.spend_energy(6))
+        stored = GameAccount.objects.get(id=account.id)
+        self.assertEqual((stored.energy, stored.energy_updated_at), (3, since))
+
+        self.assertTrue(account.spend_energy(5))
+        stored = GameAccount.objects.get(id=account.id)
+        # The 30 s towards the next point are kept
+        self.assertEqual((stored.energy, stored.energy_updated_at), (0, since + timedelta(seconds=600)))
+
+
+class PlayerSearchTests(TestCase):
+    def setUp(self):
+        # The in-process index outlives the rolled-back rows of other tests
+        get_search_backend().reset()
+        self.addCleanup(get_search_backend().reset)
+        self.client = api_client()
+        self.accounts = [
+            GameAccount.objects.create(
+                username=f'player{i}', email=f'player{i}@example.com', password_hash='x', display_name=f'Dragon {i}'
+            )
+            for i in range(5)
+        ]
+        GameAccount.objects.create(username='other', email='other@example.com', password_hash='x', display_name='Knight')
+
+    def search_all(self, limit):
+        pages = []
+        url = f'/api/game/players/search/?q=drag&limit={limit}'
+        while url:
+            body = self.client.get(url).json()
+            pages.append([result['id'] for result in body['results']])
+            url = body['next'] and f'/api/game/players/search/?q=drag&limit={limit}&cursor={body["next"]}'
+        return pages
+
+    def test_cursor_walks_every_match_once(self):
+        ids = [account.id for account in self.accounts]
+        self.assertEqual(self.search_all(2), [ids[:2], ids[2:4], ids[4:]])
+
+    def test_accounts_deactivated_without_signals_do_not_shorten_pages(self):
+        self.search_all(2)
+        # Set-based update, as the admin bulk actions and tasks do: the index still holds them
+        GameAccount.objects.filter(id__in=[self.accounts[1].id, self.accounts[2].id]).update(is_active=False)
+        active = [self.accounts[i].id for i in (0, 3, 4)]
+        self.assertEqual(self.search_all(2), [active[:2], active[2:]])
+
+    def test_bulk_deactivation_drops_the_index(self):
+        self.search_all(2)
+        bulk_account_action('deactivate_accounts', self.accounts[0].id, self.accounts[3].id)
+        self.assertEqual(self.search_all(2), [[self.accounts[4].id]])
+        self.assertNotIn(self.accounts[0].id, get_search_backend()._documents)
+
+
+class BitmapTests(SimpleTestCase):
+    def test_bits_use_redis_ordering(self):
+        bitmap = bytearray()
+        activity.set_bits(bitmap, [0, 9, 9])
+        self.assertEqual(bytes(bitmap), b'\x80\x40')
+        self.assertEqual(activity.bit_count(bitmap), 2)
+
+    def test_combine_pads_shorter_bitmaps(self):
+        short, long = bytearray(), bytearray()
+        activity.set_bits(short, [1, 3])
+        activity.set_bits(long, [3, 20])
+        self.assertEqual(activity.bit_count(activity.combine([short, long], 'or')), 3)
+        combined = activity.combine([short, long], 'and')
+        self.assertEqual((len(combined), activity.bit_count(combined)), (3, 1))
+
+
+class ActivityTrackerTests(TestCase):
+    def setUp(self):
+        self.tracker = activity.ActivityTracker(activity.InMemoryBitmapStore())
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+
+    def record(self, kind, day, account_ids):
+        self.tracker.record([{'kind': kind, 'account_id': i, 'day': day.isoformat()} for i in account_ids])
+
+    def test_active_users_over_windows_and_retention(self):
+        self.record(activity.NEW, self.yesterday, [1, 2, 3, 4])
+        self.record(activity.ACTIVE, self.yesterday, [10])
+        self.record(activity.ACTIVE, self.today, [2, 3, 10, 11])
+
+        self.assertEqual(self.tracker.active_users(self.yesterday), 5)
+        self.assertEqual(self.tracker.summary(self.today), {'dau': 4, 'wau': 6, 'mau': 6})
+        self.assertEqual(self.tracker.retention(self.yesterday, 1), {'cohort': 4, 'retained': 2, 'rate': 0.5})
+        self.assertEqual(self.tracker.retention(self.today, 1)['rate'], None)
+
+    def test_rollups_are_persisted_and_reloaded(self):
+        self.record(activity.NEW, self.yesterday, [1, 2])
+        self.record(activity.ACTIVE, self.yesterday, [2, 5])
+        rollup = DailyActivity.objects.get(day=self.yesterday)
+        self.assertEqual((rollup.active_users, rollup.new_users, bytes(rollup.active_bitmap)), (3, 2, b''))
+
+        self.tracker.persist([self.yesterday])
+        # A process with an empty live store reads the snapshot back
+        fresh = activity.ActivityTracker(activity.InMemoryBitmapStore())
+        self.assertEqual(fresh.active_users(self.yesterday), 3)
+        self.assertEqual(fresh.retention(self.yesterday, 0)['retained'], 2)
+
+
+class PresenceTests(SimpleTestCase):
+    def setUp(self):
+        caches['presence'].clear()
+        self.client = api_client()
+
+    def online(self, ids):
+        response = self.client.get(f"/api/game/presence/?ids={','.join(map(str, ids))}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()['online']
+
+    def test_heartbeat_expires_after_the_ttl(self):
+        started = time.time()
+        with mock.patch('time.time', return_value=started):
+            self.client.post('/api/game/accounts/7/presence/', {'status': 'in_match'}, format='json')
+        with mock.patch('time.time', return_value=started + settings.META_PRESENCE_TTL - 1):
+            self.assertEqual(self.online([7, 8]), {'7': {'status': 'in_match', 'last_seen': int(started)}})
+        with mock.patch('time.time', return_value=started + settings.META_PRESENCE_TTL + 1):
+            self.assertEqual(self.online([7, 8]), {})
+
+    def test_logout_goes_offline_immediately(self):
+        self.client.post('/api/game/accounts/7/presence/', format='json')
+        self.client.delete('/api/game/accounts/7/presence/')
+        self.assertEqual(self.online([7]), {})
+
+    def test_bulk_lookup_is_one_get_many_and_capped(self):
+        for account_id in (1, 250, 500):
+            self.client.post(f'/api/game/accounts/{account_id}/presence/', format='json')
+        presence = caches['presence']
+        with mock.patch.object(presence, 'get_many', wraps=presence.get_many) as get_many:
+            self.assertEqual(set(self.online(range(1, MAX_PRESENCE_QUERY + 1))), {'1', '250', '500'})
+        self.assertEqual(get_many.call_count, 1)
+
+        ids = ','.join(map(str, range(1, MAX_PRESENCE_QUERY + 2)))
+        self.assertEqual(self.client.get(f'/api/game/presence/?ids={ids}').status_code, 400)
+
+
+class FullStackRoutingTests(TestCase):
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client = Client(enforce_csrf_checks=True)
+
+    def test_admin_enforces_csrf_and_login(self):
+        response = self.client.get('/meta-admin/meta_api_app/gameaccount/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/meta-admin/login/', response['Location'])
+
+        credentials = {'username': 'admin', 'password': 'pw'}
+        self.assertEqual(self.client.post('/meta-admin/login/', credentials).status_code, 403)
+        token = self.client.get('/meta-admin/login/').cookies['csrftoken'].value
+        response = self.client.post('/meta-admin/login/', {**credentials, 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get('/meta-admin/meta_api_app/gameaccount/').status_code, 200)
+
+    def test_api_skips_sessions_and_csrf(self):
+        token = MetaJWTAuthentication._create_tokens('tests', 'monday', 'may', '12345678')['access']
+        client = APIClient(enforce_csrf_checks=True, HTTP_AUTHORIZATION=f'Bearer {token}')
+        process_request = mock.patch.object(
+            SessionMiddleware, 'process_request', autospec=True, side_effect=SessionMiddleware.process_request
+        )
+        process_view = mock.patch.object(
+            CsrfViewMiddleware, 'process_view', autospec=True, side_effect=CsrfViewMiddleware.process_view
+        )
+        with process_request as session_loads, process_view as csrf_checks:
+            # No CSRF token, yet not rejected: the API is token-authenticated
+            response = register(client, 'newplayer', 'newplayer@example.com')
+            self.assertEqual(response.status_code, 201)
+            self.assertFalse(session_loads.called or csrf_checks.called)
+            self.assertNotIn('sessionid', response.cookies)
+
+            self.client.get('/meta-admin/login/')
+            self.assertTrue(session_loads.called and csrf_checks.called)
@@ -1,2 +1,4 @@
 from meta_api_app.views.tokenization import MetaTokenObtainView
 from meta_api_app.views.tokenization import MetaTokenRefreshView
+from meta_api_app.views.tokenization import TokenIntrospectionView
+from meta_api_app.views.tokenization import jwks_view
@@ -0,0 +1,114 @@
+import logging
+
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.serializers.friends import FriendRequestSerializer, FriendSerializer
+from meta_api_app.services.friends import (
+    FriendshipError, add_friend, attach_friends, friend_edges, mutual_friend_count, remove_friend
+)
+from meta_api_app.services.sharding import account_queryset
+from meta_project.idempotency import IdempotencyMixin
+from meta_project.pagination import MetaKeysetPagination
+
+logger = logging.getLogger(__name__)
+
+
+class FriendPagination(MetaKeysetPagination):
+    page_size = 50
+    max_page_size = 200
+
+
+class FriendListView(IdempotencyMixin, APIView):
+    """
+    List or add friends of a game account.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    # Newest friends first; served by friendship_account_recent_idx
+    keyset_ordering = ['-created_at', '-id']
+
+    def get(self, request, account_id):
+        """
+        Friend list page, loaded with the friends' cards in one query.
+
+        Query parameters:
+            page_size  1-200 (default 50)
+            cursor     value of `next`/`previous` from another page
+        """
+        get_object_or_404(account_queryset(account_id).only('id'), id=account_id)
+        paginator = FriendPagination()
+        page = attach_friends(paginator.paginate_queryset(friend_edges(account_id), request, view=self))
+        return Response({
+            'success': True,
+            'results': FriendSerializer(page, many=True).data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link()
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request, account_id):
+        """
+        Add a friend (both players' lists are updated).
+
+        Expected payload:
+        {
+            "friend_id": 42
+        }
+        """
+        serializer = FriendRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid friend request.',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            created = add_friend(account_id, serializer.validated_data['friend_id'])
+        except FriendshipError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': 'Friend added.' if created else 'Already friends.'
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class FriendDetailView(IdempotencyMixin, APIView):
+    """
+    Remove a friend.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, account_id, friend_id):
+        if not remove_friend(account_id, friend_id):
+            return Response({
+                'success': False,
+                'message': 'Not friends.'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'success': True,
+            'message': 'Friend removed.'
+        }, status=status.HTTP_200_OK)
+
+
+class MutualFriendsView(APIView):
+    """
+    Number of friends two players have in common.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, account_id, other_id):
+        return Response({
+            'success': True,
+            'mutual_friends': mutual_friend_count(account_id, other_id)
+        }, status=status.HTTP_200_OK)
@@ -2,23 +2,32 @@ import logging
 
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 from meta_api_app.authentication import MetaJWTAuthentication
 from meta_api_app.serializers.game_account import (
     GameAccountRegistrationSerializer,
     GameAccountLoginSerializer,
+    GameAccountProfileSerializer,
     GameAccountResponseSerializer
 )
+from meta_api_app.jwt_keys import decode_token
+from meta_api_app.services.profile import VersionConflict, update_profile
+from meta_api_app.services.sharding import account_queryset, with_guild
+from meta_api_app.services.tokens import decode, revoke
+from meta_api_app.tasks.events import publish_login, publish_registration
+from meta_project.idempotency import IdempotencyMixin
 
 logger = logging.getLogger(__name__)
 
 
-class GameAccountRegisterView(APIView):
+class GameAccountRegisterView(IdempotencyMixin, APIView):
     """
     Register a new game account with Bearer token authentication.
     """
@@ -44,12 +53,21 @@ class GameAccountRegisterView(APIView):
             try:
                 # Create the account
                 game_account = serializer.save()
+                publish_registration(game_account)
                 
                 return Response({
                     'success': True,
                     'message': 'Account created successfully.',
                     'username': game_account.username
                 }, status=status.HTTP_201_CREATED)
+
+            except ValidationError as e:
+                # Username/email taken, detected by the unique constraints on INSERT
+                return Response({
+                    'success': False,
+                    'message': 'Registration failed.',
+                    'errors': e.detail
+                }, status=status.HTTP_400_BAD_REQUEST)
                 
             except Exception as e:
                 return Response({
@@ -91,8 +109,9 @@ class GameAccountLoginView(APIView):
                 # Get the validated account
                 account = serializer.validated_data['account']
                 
-                # Update last login time
-                account.update_last_login()
+                # Login bookkeeping is persisted in batches off the request path
+                account.last_login_at = timezone.now()
+                publish_login(account, account.last_login_at)
                 
                 # Serialize account data (excluding timestamps)
                 account_serializer = GameAccountResponseSerializer(account)
@@ -148,6 +167,68 @@ class GameAccountProfileView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class GameAccountProfileUpdateView(IdempotencyMixin, APIView):
+    """
+    Read or partially update a game account's profile with optimistic concurrency.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, account_id):
+        """Current profile, including the `version` to send back with a PATCH."""
+        account = get_object_or_404(with_guild(account_queryset(account_id)), id=account_id)
+        return Response({
+            'success': True,
+            'account': GameAccountResponseSerializer(account).data
+        }, status=status.HTTP_200_OK)
+
+    def patch(self, request, account_id):
+        """
+        Update some profile fields.
+
+        Expected payload:
+        {
+            "version": 7,               // from the last profile read
+            "character_name": "Hero",   // any updatable profile fields
+            "energy": 40
+        }
+
+        Returns 409 with the current version when the account changed since `version`.
+        """
+        account = get_object_or_404(with_guild(account_queryset(account_id)), id=account_id)
+        serializer = GameAccountProfileSerializer(account, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Profile update failed.',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = dict(serializer.validated_data)
+        version = changes.pop('version', None)
+        if version is None:
+            return Response({
+                'success': False,
+                'message': 'Profile update failed.',
+                'errors': {'version': ['This field is required.']}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            account, updated_fields = update_profile(account, changes, version)
+        except VersionConflict as e:
+            return Response({
+                'success': False,
+                'message': 'The profile was changed by another request. Reload and retry.',
+                'current_version': e.current_version
+            }, status=status.HTTP_409_CONFLICT)
+
+        return Response({
+            'success': True,
+            'updated_fields': updated_fields,
+            'account': GameAccountResponseSerializer(account).data
+        }, status=status.HTTP_200_OK)
+
+
 class GameAccountLogoutView(APIView):
     """
     Logout user.
@@ -157,13 +238,13 @@ class GameAccountLogoutView(APIView):
 
     def post(self, request):
         """
-        Logout user by blacklisting the refresh token.
+        Logout user by revoking the access token and, when given, the refresh token.
         """
         try:
             refresh_token = request.data.get('refresh_token')
             if refresh_token:
-                token = MetaJWTAuthentication(refresh_token)
-                token.blacklist()
+                revoke(decode_token(refresh_token))
+            revoke(decode(request.auth))
                 
             return Response({
                 'success': True,
@@ -0,0 +1,89 @@
+import logging
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.models import Guild
+from meta_api_app.serializers.guild import GuildLeaderboardQuerySerializer, GuildListQuerySerializer, GuildSerializer
+from meta_project.pagination import MetaKeysetPagination
+
+logger = logging.getLogger(__name__)
+
+
+class GuildPagination(MetaKeysetPagination):
+    page_size = 50
+    max_page_size = 100
+
+
+def paginated_guilds(request, queryset, view):
+    paginator = GuildPagination()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    return Response({
+        'success': True,
+        'results': GuildSerializer(page, many=True).data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
+    }, status=status.HTTP_200_OK)
+
+
+class GuildListView(APIView):
+    """
+    List guilds by name with their member count, total XP and best score.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        List guilds.
+
+        Query parameters:
+            q          optional name prefix
+            page_size  1-100 (default 50)
+            cursor     value of `next`/`previous` from another page
+        """
+        query_serializer = GuildListQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid guild list parameters.',
+                'errors': query_serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Guild.objects.all()
+        prefix = query_serializer.validated_data.get('q')
+        if prefix:
+            queryset = queryset.filter(name__istartswith=prefix)
+        return paginated_guilds(request, queryset, self)
+
+
+class GuildLeaderboardView(APIView):
+    """
+    Guilds ranked by a precomputed aggregate (total XP, best score or member count).
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Guild leaderboard.
+
+        Query parameters:
+            by         total_experience (default), best_score or member_count
+            page_size  1-100 (default 50)
+            cursor     value of `next`/`previous` from another page
+        """
+        query_serializer = GuildLeaderboardQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid leaderboard parameters.',
+                'errors': query_serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Read by the paginator; matches the guild_<metric>_idx indexes
+        self.keyset_ordering = [f"-{query_serializer.validated_data['by']}", 'id']
+        return paginated_guilds(request, Guild.objects.all(), self)
@@ -0,0 +1,83 @@
+import base64
+import binascii
+import json
+import logging
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.serializers.player_search import PlayerSearchQuerySerializer, PlayerSearchResultSerializer
+from meta_api_app.services.player_search import search_players
+from meta_api_app.services.sharding import ShardingError
+
+logger = logging.getLogger(__name__)
+
+
+def encode_search_cursor(score, account_id):
+    raw = json.dumps([score, account_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_search_cursor(token):
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    score, account_id = json.loads(raw)
+    return float(score), int(account_id)
+
+
+class PlayerSearchView(APIView):
+    """
+    Find players by display, character or guild name (typo-tolerant prefix match).
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Search players.
+
+        Query parameters:
+            q       search text (at least 2 characters)
+            limit   page size, 1-50 (default 20)
+            cursor  value of `next` from the previous page
+        """
+        query_serializer = PlayerSearchQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid search parameters.',
+                'errors': query_serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        params = query_serializer.validated_data
+        after = None
+        if params.get('cursor'):
+            try:
+                after = decode_search_cursor(params['cursor'])
+            except (binascii.Error, ValueError, TypeError):
+                return Response({
+                    'success': False,
+                    'message': 'Invalid cursor.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = params['limit']
+        # One extra row tells whether another page exists
+        try:
+            accounts = search_players(params['q'], limit + 1, after)
+        except ShardingError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        next_cursor = None
+        if len(accounts) > limit:
+            accounts = accounts[:limit]
+            next_cursor = encode_search_cursor(accounts[-1].score, accounts[-1].id)
+
+        return Response({
+            'success': True,
+            'results': PlayerSearchResultSerializer(accounts, many=True).data,
+            'next': next_cursor
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,87 @@
+import logging
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from meta_api_app.authentication import MetaJWTAuthentication
+from meta_api_app.serializers.presence import HeartbeatSerializer, PresenceQuerySerializer
+from meta_api_app.services.friends import friend_ids
+from meta_api_app.services.presence import go_offline, heartbeat, online_status
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceHeartbeatView(APIView):
+    """
+    Presence heartbeat of a game account. Only the presence cache is written;
+    the account id is not checked against the database.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, account_id):
+        """
+        Report the account as present.
+
+        Expected payload (optional):
+        {
+            "status": "online"  // online, away or in_match
+        }
+        """
+        serializer = HeartbeatSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid heartbeat.',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        heartbeat(account_id, serializer.validated_data['status'])
+        return Response({'success': True}, status=status.HTTP_200_OK)
+
+    def delete(self, request, account_id):
+        """Mark the account offline immediately (e.g. on logout)."""
+        go_offline(account_id)
+        return Response({'success': True}, status=status.HTTP_200_OK)
+
+
+class PresenceQueryView(APIView):
+    """
+    Which of the given accounts are online.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Query parameters:
+            ids  comma-separated account ids (at most 500)
+        """
+        query_serializer = PresenceQuerySerializer(data=request.query_params)
+        if not query_serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid presence query.',
+                'errors': query_serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'online': online_status(query_serializer.validated_data['ids'])
+        }, status=status.HTTP_200_OK)
+
+
+class FriendsOnlineView(APIView):
+    """
+    Online friends of a game account, from the cached adjacency set and one presence lookup.
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, account_id):
+        return Response({
+            'success': True,
+            'online': online_status(friend_ids(account_id))
+        }, status=status.HTTP_200_OK)
@@ -2,14 +2,20 @@ import logging
 
 import jwt
 from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework import status
-from rest_framework.exceptions import ValidationError
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from meta_api_app.authentication import MetaJWTAuthentication
-from meta_api_app.serializers.tokenization import MetaTokenObtainSerializer, MetaTokenRefreshSerializer
+from meta_api_app.jwt_keys import get_keyring
+from meta_api_app.serializers.tokenization import (
+    MetaTokenObtainSerializer, MetaTokenRefreshSerializer, TokenIntrospectionSerializer,
+)
+from meta_api_app.services.tokens import introspect
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +73,12 @@ class MetaTokenRefreshView(APIView):
                     {"error": "Invalid refresh token"},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
+            except AuthenticationFailed as e:
+                # Expired, revoked or malformed refresh tokens
+                return Response(
+                    {"error": "Invalid refresh token", "detail": str(e.detail)},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
 
         except ValidationError as e:
             logger.error(f"Validation error during token refresh: {str(e)}")
@@ -80,3 +92,47 @@ class MetaTokenRefreshView(APIView):
                 {"error": "Token refresh failed", "detail": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+
+class TokenIntrospectionView(APIView):
+    """
+    Validate many tokens in one call, e.g. a dedicated server admitting every
+    player of a match. Each result has `active` and, for valid tokens, the
+    token type, expiry and claims; invalid ones carry `error`
+    (invalid, expired or revoked).
+    """
+    authentication_classes = [MetaJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Expected payload:
+        {
+            "tokens": ["<access token>", ...]
+        }
+        """
+        serializer = TokenIntrospectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid introspection request.',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'results': introspect(serializer.validated_data['tokens'])
+        }, status=status.HTTP_200_OK)
+
+
+@require_GET
+def jwks_view(request):
+    """
+    Public keys that verify EdDSA/ES256 tokens, by kid. The body is built once
+    per key ring load; verifiers may cache it for `jwks_max_age` seconds.
+    """
+    keyring = get_keyring()
+    response = HttpResponse(keyring.jwks_body, content_type='application/json')
+    response['Cache-Control'] = f'public, max-age={keyring.jwks_max_age}'
+    return response
@@ -0,0 +1,3 @@
+# The Celery app is loaded by MetaApiAppConfig.ready() rather than here: manage.py
+# and wsgi.py import meta_project.green before anything else so gevent can patch
+# the standard library, and Celery would import threading, socket and ssl first.
@@ -1,6 +1,9 @@
+import os
 import tomllib
 from pathlib import Path
 
+CONFIG_FILE = os.environ.get('META_CONFIG_FILE', "config_dev.toml")
+
 
 def load_config(config_file=None):
     if not config_file or not Path(config_file).exists():
@@ -8,4 +11,4 @@ def load_config(config_file=None):
 
     # Load the TOML configuration file
     with open(config_file, "rb") as f:
-        return tomllib.load(f)
\ No newline at end of file
+        return tomllib.load(f)
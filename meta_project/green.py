@@ -0,0 +1,97 @@
+"""
+Cooperative (gevent) server mode.
+
+This module is imported by manage.py and wsgi.py before Django so that
+monkey-patching happens first; keep its imports light.
+"""
+import os
+
+from meta_project.config import CONFIG_FILE, load_config
+
+_green = None
+
+
+def server_mode():
+    """'gevent' or 'sync', from META_SERVER_MODE or the server_mode config key."""
+    mode = os.environ.get('META_SERVER_MODE')
+    if mode:
+        return mode
+    try:
+        return load_config(CONFIG_FILE)['settings'].get('server_mode', 'sync')
+    except FileNotFoundError:
+        return 'sync'
+
+
+def patch_if_enabled(argv=None):
+    """Monkey-patch the standard library for gevent when the gevent server mode is on."""
+    argv = argv or []
+    if server_mode() != 'gevent' and argv[1:2] != ['rungevent']:
+        return False
+
+    from gevent import monkey
+    monkey.patch_all()
+
+    patch_psycopg()
+    configure_threadpool()
+    return True
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """psycopg2 wait callback that yields to the gevent hub instead of blocking."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def patch_psycopg():
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        # psycopg 3 waits through the (patched) selectors module on its own
+        return
+    extensions.set_wait_callback(gevent_wait_callback)
+
+
+def configure_threadpool():
+    """Size the hub threadpool that runs CPU-bound work such as password hashing."""
+    import gevent
+
+    try:
+        size = load_config(CONFIG_FILE)['settings'].get('gevent_threadpool_size')
+    except FileNotFoundError:
+        size = None
+    gevent.get_hub().threadpool.maxsize = size or os.cpu_count() or 4
+
+
+def is_green():
+    """True when the running process has been monkey-patched by gevent."""
+    global _green
+    if _green is None:
+        try:
+            from gevent import monkey
+        except ImportError:
+            _green = False
+        else:
+            _green = monkey.is_module_patched('socket')
+    return _green
+
+
+def run_blocking(func, *args, **kwargs):
+    """
+    Run CPU-bound work without stalling other greenlets.
+    Under gevent the call goes to a real OS thread; otherwise it runs inline.
+    """
+    if not is_green():
+        return func(*args, **kwargs)
+    import gevent
+    return gevent.get_hub().threadpool.apply(func, args, kwargs)
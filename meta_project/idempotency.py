@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# An in-flight marker outlives a crashed request by at most this many seconds
+LOCK_TIMEOUT = 30
+# A duplicate of an in-flight request polls for its result, backing off up to this many seconds
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+# Retry-After sent with the 409 when the in-flight request outlasts META_IDEMPOTENCY_WAIT
+RETRY_AFTER = 1
+
+
+def _subject(request, kwargs):
+    """
+    The player a request acts on: the account_id URL argument, or the
+    username/email being registered. The authenticated client identity is
+    shared by every player, so it cannot scope keys on its own.
+    """
+    if 'account_id' in kwargs:
+        return f"account:{kwargs['account_id']}"
+    data = request.data if isinstance(request.data, dict) else {}
+    return f"new:{data.get('username', '')}|{data.get('email', '')}"
+
+
+def _cache_keys(request, view, kwargs, key):
+    """Result and lock keys, scoped to the player, view, method and path."""
+    scope = f'{_subject(request, kwargs)}|{type(view).__name__}|{request.method}|{request.path}|{key}'
+    digest = hashlib.sha256(scope.encode()).hexdigest()
+    return f'idempotency:result:{digest}', f'idempotency:lock:{digest}'
+
+
+def _fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return _mismatch()
+    return Response(stored['data'], status=stored['status'], headers={REPLAYED_HEADER: 'true'})
+
+
+def _mismatch():
+    return Response({
+        'success': False,
+        'message': f'{IDEMPOTENCY_HEADER} was already used with a different request.'
+    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+def idempotent(ttl=None):
+    """
+    Make an APIView handler idempotent per `Idempotency-Key` header.
+
+    The first request with a key runs the handler and its response is cached
+    for `ttl` seconds (META_IDEMPOTENCY_TTL by default); retries with the same
+    key and body get the stored response back instead of running it again.
+    A duplicate that arrives while the first is still running polls for its
+    result for up to META_IDEMPOTENCY_WAIT seconds (a cheap sleep under gevent)
+    and gets 409 with Retry-After if it is still running then. Server errors are
+    not stored, so a waiting duplicate takes over once the first one fails.
+    Requests without the header are not affected.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return handler(self, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response({
+                    'success': False,
+                    'message': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            result_key, lock_key = _cache_keys(request, self, kwargs, key)
+            fingerprint = _fingerprint(request)
+            deadline = time.monotonic() + settings.META_IDEMPOTENCY_WAIT
+            delay = POLL_INTERVAL
+            while True:
+                stored = cache.get(result_key)
+                if stored is not None:
+                    return _replay(stored, fingerprint)
+                if cache.add(lock_key, fingerprint, LOCK_TIMEOUT):
+                    break
+                in_flight = cache.get(lock_key)
+                if in_flight is not None and in_flight != fingerprint:
+                    return _mismatch()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return Response({
+                        'success': False,
+                        'message': f'A request with this {IDEMPOTENCY_HEADER} is still in progress. Retry shortly.'
+                    }, status=status.HTTP_409_CONFLICT, headers={'Retry-After': str(RETRY_AFTER)})
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+            try:
+                response = handler(self, request, *args, **kwargs)
+                if response.status_code < 500 and hasattr(response, 'data'):
+                    cache.set(result_key, {
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'data': response.data,
+                    }, ttl or settings.META_IDEMPOTENCY_TTL)
+                return response
+            finally:
+                cache.delete(lock_key)
+
+        wrapper.idempotent = True
+        return wrapper
+    return decorator
+
+
+class IdempotencyMixin:
+    """
+    APIView mixin applying @idempotent to every handler listed in `idempotent_methods`.
+    """
+    idempotent_methods = ('post', 'put', 'patch', 'delete')
+    idempotency_ttl = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method in cls.idempotent_methods:
+            handler = cls.__dict__.get(method)
+            if handler is not None and not getattr(handler, 'idempotent', False):
+                setattr(cls, method, idempotent(cls.idempotency_ttl)(handler))
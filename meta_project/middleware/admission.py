@@ -0,0 +1,292 @@
+import ipaddress
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+
+try:
+    import redis
+except ImportError:  # Optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Route classes used when the config file has no [admission.classes] tables.
+# `paths` match exactly, `prefixes` by prefix; the first matching class wins.
+DEFAULT_CLASSES = {
+    'auth': {
+        'paths': ['/api/token/', '/api/token/refresh/', '/api/game/login/', '/api/game/register/'],
+        'max_in_flight': 8,
+        'max_queue': 64,
+        'queue_timeout': 1.0,
+        'rate': 1.0,
+        'burst': 10,
+    },
+}
+DEFAULT_MAX_RETRY_AFTER = 30
+# Weight of the newest sample in the per-class service time average
+EWMA_WEIGHT = 0.2
+LOCAL_BUCKETS_MAX_ENTRIES = 100000
+
+# Refill and take one token atomically, on the Redis clock; returns {allowed, wait in ms}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, wait}
+"""
+
+
+class LocalTokenBuckets:
+    """Process-local token buckets (dev, tests and setups without Redis)."""
+
+    def __init__(self, max_entries=LOCAL_BUCKETS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, rate, burst):
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - at) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, wait = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, wait = False, (1 - tokens) / rate
+            if len(self._buckets) > self.max_entries:
+                self._prune(now, rate, burst)
+        return allowed, wait
+
+    def _prune(self, now, rate, burst):
+        # A bucket that has refilled completely is the same as no bucket
+        full = [key for key, (tokens, at) in self._buckets.items() if tokens + (now - at) * rate >= burst]
+        for key in full:
+            del self._buckets[key]
+
+
+class RedisTokenBuckets:
+    """Token buckets shared by every process through one Lua script call per request."""
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key, rate, burst):
+        allowed, wait_ms = self._script(keys=[key], args=[rate, burst])
+        return bool(allowed), wait_ms / 1000
+
+
+class AdmissionGate:
+    """
+    In-flight limit for one route class in this process.
+
+    Up to `max_in_flight` requests run at once; up to `max_queue` more wait
+    for a slot, each for at most `queue_timeout` seconds. Anything beyond
+    that is rejected immediately instead of adding to everyone's latency.
+    """
+
+    def __init__(self, name, max_in_flight, max_queue, queue_timeout):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.service_time = 0.0
+        self._condition = threading.Condition()
+        self.stats = {'admitted': 0, 'queue_full': 0, 'queue_timeout': 0, 'rate_limited': 0, 'max_wait': 0.0}
+
+    def acquire(self):
+        """Return None when admitted, otherwise the reason for shedding the request."""
+        with self._condition:
+            if self.in_flight < self.max_in_flight and not self.waiting:
+                self.in_flight += 1
+                self.stats['admitted'] += 1
+                return None
+            if self.waiting >= self.max_queue:
+                self.stats['queue_full'] += 1
+                return 'queue_full'
+
+            self.waiting += 1
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['queue_timeout'] += 1
+                        return 'queue_timeout'
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.stats['admitted'] += 1
+            self.stats['max_wait'] = max(self.stats['max_wait'], time.monotonic() - started)
+            return None
+
+    def count(self, stat):
+        with self._condition:
+            self.stats[stat] += 1
+
+    def release(self, elapsed):
+        with self._condition:
+            self.in_flight -= 1
+            self.service_time += EWMA_WEIGHT * (elapsed - self.service_time)
+            self._condition.notify()
+
+    def retry_after(self, max_retry_after):
+        """Seconds until the current backlog should have drained, from the average service time."""
+        backlog = self.in_flight + self.waiting
+        estimate = backlog * self.service_time / max(1, self.max_in_flight)
+        return min(max_retry_after, max(1, math.ceil(estimate)))
+
+    def snapshot(self):
+        with self._condition:
+            return {**self.stats, 'in_flight': self.in_flight, 'waiting': self.waiting,
+                    'service_time': self.service_time}
+
+
+class AdmissionControlMiddleware:
+    """
+    Load shedding for expensive route classes (token issue, login, register).
+
+    Each class from the [admission] config section gets a per-client token
+    bucket (429 when empty) and a per-process in-flight gate (503 when the
+    queue is full or the queue-time budget runs out). Both answers carry
+    Retry-After so clients back off instead of retrying straight away.
+    Paths outside every class are not affected.
+
+    Clients are told apart by REMOTE_ADDR. Behind a load balancer set
+    `client_ip_header` (e.g. HTTP_X_FORWARDED_FOR) and `trusted_proxies`: the
+    header is only read on requests from a trusted proxy, and the client is
+    the nearest address in it that is not a trusted proxy itself, since the
+    entries before that are whatever the client sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, 'META_ADMISSION', {})
+        self.enabled = config.get('enabled', True)
+        self.max_retry_after = config.get('max_retry_after', DEFAULT_MAX_RETRY_AFTER)
+        self.client_ip_header = config.get('client_ip_header', 'REMOTE_ADDR')
+        self.trusted_proxies = [ipaddress.ip_network(network) for network in config.get('trusted_proxies', [])]
+        if self.client_ip_header != 'REMOTE_ADDR' and not self.trusted_proxies:
+            raise ImproperlyConfigured(
+                "[admission] client_ip_header needs trusted_proxies: without them any client could pick its own bucket."
+            )
+        self.classes = {}
+        self.exact = {}
+        self.prefixes = []
+        for name, options in config.get('classes', DEFAULT_CLASSES).items():
+            self.classes[name] = (
+                AdmissionGate(name, options.get('max_in_flight', 8), options.get('max_queue', 64),
+                              options.get('queue_timeout', 1.0)),
+                options.get('rate', 0),
+                options.get('burst', 1),
+            )
+            for path in options.get('paths', []):
+                self.exact.setdefault(path, name)
+            for prefix in options.get('prefixes', []):
+                self.prefixes.append((prefix, name))
+        self.buckets = get_token_buckets()
+        admission_gates.update({name: gate for name, (gate, _, _) in self.classes.items()})
+
+    def route_class(self, path):
+        name = self.exact.get(path)
+        if name is None:
+            for prefix, prefix_name in self.prefixes:
+                if path.startswith(prefix):
+                    return prefix_name
+        return name
+
+    def __call__(self, request):
+        name = self.route_class(request.path_info) if self.enabled else None
+        if name is None:
+            return self.get_response(request)
+        gate, rate, burst = self.classes[name]
+
+        if rate > 0:
+            client = self.client_ip(request)
+            allowed, wait = self._take(f'admission:{name}:{client}', rate, burst)
+            if not allowed:
+                gate.count('rate_limited')
+                return self._reject(429, 'Too many requests.', max(1, math.ceil(wait)))
+
+        reason = gate.acquire()
+        if reason is not None:
+            logger.warning(f"Admission control shed a {name} request ({reason})")
+            return self._reject(503, 'Server is busy, retry later.', gate.retry_after(self.max_retry_after))
+
+        started = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            gate.release(time.monotonic() - started)
+
+    def client_ip(self, request):
+        remote = request.META.get('REMOTE_ADDR', '')
+        if self.client_ip_header == 'REMOTE_ADDR' or not self._is_trusted(remote):
+            return remote
+        for address in reversed(request.META.get(self.client_ip_header, '').split(',')):
+            address = address.strip()
+            if address and not self._is_trusted(address):
+                return address
+        return remote
+
+    def _is_trusted(self, address):
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def _take(self, key, rate, burst):
+        try:
+            return self.buckets.take(key, rate, burst)
+        except Exception as e:
+            # Rate limiting fails open; the in-flight gate still bounds the load
+            logger.warning(f"Token bucket unavailable: {e}")
+            return True, 0.0
+
+    def _reject(self, status, message, retry_after):
+        response = JsonResponse({'success': False, 'message': message}, status=status)
+        response['Retry-After'] = str(min(self.max_retry_after, retry_after))
+        return response
+
+
+# Gates of the running middleware by route class, for admission_snapshot()
+admission_gates = {}
+
+
+def admission_snapshot():
+    return {name: gate.snapshot() for name, gate in admission_gates.items()}
+
+
+def get_token_buckets():
+    """Redis buckets when the Redis cache is configured, otherwise the in-process stand-in."""
+    if settings.META_RATE_LIMIT_REDIS_URL and redis is not None:
+        return RedisTokenBuckets(settings.META_RATE_LIMIT_REDIS_URL)
+    return LocalTokenBuckets()
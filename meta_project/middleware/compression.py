@@ -0,0 +1,297 @@
+import gzip
+import logging
+import re
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALGORITHMS = ['zstd', 'br', 'gzip']
+DEFAULT_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+DEFAULT_MIN_SIZE = 512
+# Log the running totals every this many compressed responses (0 disables)
+DEFAULT_STATS_LOG_EVERY = 1000
+
+# Content types that are already compressed and gain nothing from a second pass
+SKIP_CONTENT_TYPES = (
+    'image/', 'video/', 'audio/',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/zstd', 'application/x-brotli', 'application/octet-stream',
+)
+
+re_accepts_encoding = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+class CompressionStats:
+    """
+    Thread-safe running totals of compression ratio and time per algorithm.
+
+    `responses` counts responses sent compressed; `not_smaller` counts those
+    sent as they were because compressing did not make them smaller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._responses = 0
+
+    def _entry(self, algorithm):
+        return self._totals.setdefault(algorithm, {
+            'responses': 0, 'not_smaller': 0, 'original_bytes': 0, 'compressed_bytes': 0, 'seconds': 0.0
+        })
+
+    def record(self, algorithm, original_size, compressed_size, elapsed):
+        """Add one compressed response; returns the number of compressed responses so far."""
+        with self._lock:
+            totals = self._entry(algorithm)
+            totals['responses'] += 1
+            totals['original_bytes'] += original_size
+            totals['compressed_bytes'] += compressed_size
+            totals['seconds'] += elapsed
+            self._responses += 1
+            return self._responses
+
+    def record_not_smaller(self, algorithm, elapsed):
+        with self._lock:
+            totals = self._entry(algorithm)
+            totals['not_smaller'] += 1
+            totals['seconds'] += elapsed
+
+    def snapshot(self):
+        """Return a copy of the totals with the aggregate ratio and mean time per algorithm."""
+        with self._lock:
+            result = {}
+            for algorithm, totals in self._totals.items():
+                entry = dict(totals)
+                entry['ratio'] = (
+                    totals['original_bytes'] / totals['compressed_bytes']
+                    if totals['compressed_bytes'] else 0.0
+                )
+                attempts = totals['responses'] + totals['not_smaller']
+                entry['mean_ms'] = totals['seconds'] * 1000 / attempts if attempts else 0.0
+                result[algorithm] = entry
+            return result
+
+    def summary(self):
+        return ', '.join(
+            f"{algorithm}: {entry['responses']} responses, ratio {entry['ratio']:.2f}, "
+            f"{entry['mean_ms']:.2f} ms mean, {entry['not_smaller']} not smaller"
+            for algorithm, entry in sorted(self.snapshot().items())
+        )
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._responses = 0
+
+
+compression_stats = CompressionStats()
+
+
+def available_algorithms():
+    """Algorithms usable in this process, in no particular order."""
+    algorithms = {'gzip'}
+    if zstandard is not None:
+        algorithms.add('zstd')
+    if brotli is not None:
+        algorithms.add('br')
+    return algorithms
+
+
+def parse_accept_encoding(header):
+    """Parse an Accept-Encoding header into a {coding: qvalue} dict."""
+    accepted = {}
+    for part in header.split(','):
+        match = re_accepts_encoding.match(part)
+        if not match:
+            continue
+        coding = match.group(1).lower()
+        try:
+            qvalue = float(match.group(2)) if match.group(2) is not None else 1.0
+        except ValueError:
+            qvalue = 0.0
+        accepted[coding] = qvalue
+    return accepted
+
+
+def negotiate_encoding(header, preference):
+    """
+    Pick the best content coding for an Accept-Encoding header.
+    Highest q-value wins; ties are broken by the server preference order.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*')
+    best, best_q = None, 0.0
+    for algorithm in preference:
+        qvalue = accepted.get(algorithm, wildcard)
+        if algorithm == 'gzip' and qvalue is None:
+            qvalue = accepted.get('x-gzip')
+        if qvalue is not None and qvalue > best_q:
+            best, best_q = algorithm, qvalue
+    return best
+
+
+def compress_bytes(algorithm, data, level):
+    if algorithm == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if algorithm == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(algorithm, sequence, level, on_finish):
+    """Incrementally compress an iterable of byte chunks."""
+    original_size = 0
+    compressed_size = 0
+    elapsed = 0.0
+
+    if algorithm == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        process, flush, finish = (
+            compressor.compress,
+            lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+    elif algorithm == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, flush, finish = (
+            compressor.compress,
+            lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+    for chunk in sequence:
+        if not chunk:
+            continue
+        original_size += len(chunk)
+        start = time.perf_counter()
+        # Flush per chunk so each streamed piece reaches the client promptly
+        data = process(chunk) + flush()
+        elapsed += time.perf_counter() - start
+        if data:
+            compressed_size += len(data)
+            yield data
+
+    start = time.perf_counter()
+    data = finish()
+    elapsed += time.perf_counter() - start
+    if data:
+        compressed_size += len(data)
+        yield data
+    on_finish(original_size, compressed_size, elapsed)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd, brotli or gzip negotiated from Accept-Encoding.
+    Levels, minimum size and the server preference order come from the
+    [compression] section of the config file.
+
+    Per-algorithm totals of this process are kept in `compression_stats`,
+    shown at /meta-admin/compression/ and logged every `stats_log_every`
+    compressed responses.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, 'META_COMPRESSION', {})
+        self.enabled = config.get('enabled', True)
+        self.min_size = config.get('min_size', DEFAULT_MIN_SIZE)
+        self.compress_streams = config.get('compress_streams', True)
+        self.levels = {**DEFAULT_LEVELS, **config.get('levels', {})}
+        self.stats_log_every = config.get('stats_log_every', DEFAULT_STATS_LOG_EVERY)
+        usable = available_algorithms()
+        self.preference = [
+            algorithm for algorithm in config.get('algorithms', DEFAULT_ALGORITHMS)
+            if algorithm in usable
+        ]
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.enabled or not self.preference:
+            return response
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if content_type.startswith(SKIP_CONTENT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.streaming and not self.compress_streams:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        algorithm = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), self.preference
+        )
+        if algorithm is None:
+            return response
+
+        level = self.levels[algorithm]
+
+        if response.streaming:
+            if response.is_async:
+                # Async iterators are left untouched; they are not used by this project
+                return response
+
+            def on_finish(original_size, compressed_size, elapsed):
+                self._record(request, algorithm, original_size, compressed_size, elapsed)
+
+            response.streaming_content = compress_stream(
+                algorithm, response.streaming_content, level, on_finish
+            )
+            # Length of the compressed stream is not known up front
+            del response['Content-Length']
+        else:
+            original = response.content
+            start = time.perf_counter()
+            compressed = compress_bytes(algorithm, original, level)
+            elapsed = time.perf_counter() - start
+            if len(compressed) >= len(original):
+                compression_stats.record_not_smaller(algorithm, elapsed)
+                return response
+            self._record(request, algorithm, len(original), len(compressed), elapsed)
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag would no longer match the encoded representation
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+
+        response.headers['Content-Encoding'] = algorithm
+        return response
+
+    def _record(self, request, algorithm, original_size, compressed_size, elapsed):
+        count = compression_stats.record(algorithm, original_size, compressed_size, elapsed)
+        if self.stats_log_every and count % self.stats_log_every == 0:
+            logger.info(f"Compression totals after {count} responses: {compression_stats.summary()}")
+        logger.debug(
+            f"CompressionMiddleware {request.path} {algorithm}: "
+            f"{original_size} -> {compressed_size} bytes "
+            f"(ratio {original_size / compressed_size if compressed_size else 0:.2f}, "
+            f"{elapsed * 1000:.2f} ms)"
+        )
@@ -0,0 +1,61 @@
+import logging
+
+from django.conf import settings
+
+from meta_project.profiling import (
+    PROFILE_HEADER, PROFILE_ID_HEADER, FlagPoller, RequestProfiler, check_token, profiling_config, store_profile,
+)
+
+logger = logging.getLogger(__name__)
+
+# The profile browser does not profile itself
+EXCLUDED_PREFIXES = ('/meta-admin/profiling/',)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling of SQL, cache calls and a sampled stack.
+
+    A request is profiled when it carries a valid signed X-Meta-Profile header
+    (`manage.py profiling_token`) or matches the flag set from
+    /meta-admin/profiling/. Everything else costs one header lookup and, every
+    few seconds, one cache read for the flag. The profile id is returned in
+    X-Meta-Profile-Id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = profiling_config()
+        self.enabled = self.config['enabled']
+        self.header = 'HTTP_' + PROFILE_HEADER.upper().replace('-', '_')
+        self.flag = FlagPoller(self.config['flag_poll_interval'])
+
+    def __call__(self, request):
+        trigger = self._trigger(request) if self.enabled else None
+        if trigger is None:
+            return self.get_response(request)
+
+        with RequestProfiler(self.config) as profiler:
+            response = self.get_response(request)
+        try:
+            profile_id = store_profile(profiler.result(request, response, trigger), self.config)
+        except Exception as e:
+            # A full or unreachable cache must not fail the profiled request
+            logger.warning(f"Could not store request profile: {e}")
+            return response
+        response[PROFILE_ID_HEADER] = str(profile_id)
+        return response
+
+    def _trigger(self, request):
+        path = request.path_info
+        if path.startswith(EXCLUDED_PREFIXES):
+            return None
+        token = request.META.get(self.header)
+        if token:
+            label = check_token(token, self.config['token_max_age'])
+            if label is not None:
+                return f'header:{label}' if label else 'header'
+            logger.info(f"Ignoring invalid {PROFILE_HEADER} header on {path}")
+        if self.flag.matches(path):
+            return 'admin flag'
+        return None
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class FullStackMiddleware:
+    """
+    Run the session/CSRF/auth/messages middleware only for browser-facing paths.
+
+    The API authenticates with Bearer tokens (MetaJWTAuthentication), so loading
+    a session, checking CSRF and setting up message storage is wasted work on
+    every /api/ request. The middleware listed in FULL_STACK_MIDDLEWARE is built
+    into a nested chain here and only entered for FULL_STACK_PATH_PREFIXES
+    (the admin site); every other path goes straight to the next handler.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(getattr(settings, 'FULL_STACK_PATH_PREFIXES', ['/meta-admin/']))
+
+        handler = get_response
+        self.middleware = []
+        for middleware_path in reversed(getattr(settings, 'FULL_STACK_MIDDLEWARE', [])):
+            instance = import_string(middleware_path)(handler)
+            self.middleware.insert(0, instance)
+            handler = instance
+        self.full_stack_handler = handler
+
+    def uses_full_stack(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if self.uses_full_stack(request):
+            request._full_stack = True
+            return self.full_stack_handler(request)
+        return self.get_response(request)
+
+    # Django only collects these hooks from MIDDLEWARE itself, so they are
+    # forwarded to the wrapped instances (CsrfViewMiddleware relies on process_view).
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(request, '_full_stack', False):
+            return None
+        for instance in self.middleware:
+            if hasattr(instance, 'process_view'):
+                response = instance.process_view(request, view_func, view_args, view_kwargs)
+                if response is not None:
+                    return response
+        return None
+
+    def process_template_response(self, request, response):
+        if not getattr(request, '_full_stack', False):
+            return response
+        for instance in reversed(self.middleware):
+            if hasattr(instance, 'process_template_response'):
+                response = instance.process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if not getattr(request, '_full_stack', False):
+            return None
+        for instance in reversed(self.middleware):
+            if hasattr(instance, 'process_exception'):
+                response = instance.process_exception(request, exception)
+                if response is not None:
+                    return response
+        return None
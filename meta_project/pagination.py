@@ -1,7 +1,208 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class MetaPageNumberPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
-    max_page_size = 50000
\ No newline at end of file
+    max_page_size = 50000
+
+
+def estimate_count(queryset):
+    """
+    Approximate row count of a queryset from the planner's statistics.
+
+    On PostgreSQL an unfiltered queryset reads pg_class.reltuples and a
+    filtered one uses the row estimate from EXPLAIN, neither of which scans
+    the table. Other backends return None so callers can fall back to an
+    exact count when they want one.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 for a table that has never been analyzed
+            if row and row[0] >= 0:
+                return int(row[0])
+            return None
+
+        query = queryset.order_by().values('pk').query
+        sql, params = query.get_compiler(queryset.db).as_sql()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class MetaKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over an indexed, stable ordering.
+
+    Each page is fetched with `WHERE (ordering) > (last row)` instead of an
+    OFFSET, so deep pages cost the same as the first and no COUNT(*) is run.
+    The ordering defaults to the model's Meta.ordering with the primary key
+    appended as a tie-breaker; views can override it with `keyset_ordering`.
+    Ordering fields must be non-null concrete columns.
+
+    Cursors are opaque base64 tokens. Pass `?count=estimate` to include an
+    approximate total taken from planner statistics (PostgreSQL only).
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.keyset_ordering = self.get_ordering(queryset, view)
+        self.estimated_count = None
+        if request.query_params.get(self.count_query_param) == 'estimate':
+            self.estimated_count = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor['d'] == 'p'
+
+        order_by = [self._flip(field) if reverse else field for field in self.keyset_ordering]
+        queryset = queryset.order_by(*order_by)
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_filter(order_by, cursor['v']))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+
+        if reverse:
+            page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = page
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        if ordering is None:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+        ordering = [field for field in ordering if isinstance(field, str)]
+        pk_name = queryset.model._meta.pk.name
+        if pk_name not in [field.lstrip('-') for field in ordering]:
+            ordering.append(pk_name)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], 'n')
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], 'p')
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.estimated_count is not None:
+            payload['estimated_count'] = self.estimated_count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'estimated_count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def encode_cursor(self, obj, direction):
+        values = [self._cursor_value(getattr(obj, field.lstrip('-'))) for field in self.keyset_ordering]
+        raw = json.dumps({'d': direction, 'v': values}, cls=DjangoJSONEncoder, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            cursor = json.loads(raw)
+            if cursor['d'] not in ('n', 'p') or len(cursor['v']) != len(self.keyset_ordering):
+                raise ValueError
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound('Invalid cursor')
+        return cursor
+
+    @staticmethod
+    def _cursor_value(value):
+        # DjangoJSONEncoder drops microseconds below milliseconds, which would skip rows
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _seek_filter(order_by, values):
+        """
+        Build `(a, b, c) > (x, y, z)` for a mixed-direction ordering, expanded
+        as a OR (a = x AND b > y) OR ... so it works on every backend.
+
+        The expansion is ANDed with a redundant `a >= x` bound on the leading
+        column: planners cannot turn the OR into an index range, but they can
+        seek on that bound and filter the few rows that share the leading value.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(order_by, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        if len(order_by) > 1:
+            leading = order_by[0]
+            lookup = 'lte' if leading.startswith('-') else 'gte'
+            condition = Q(**{f'{leading.lstrip("-")}__{lookup}': values[0]}) & condition
+        return condition
@@ -0,0 +1,281 @@
+"""
+Opt-in per-request profiling (see meta_project/middleware/profiling.py).
+
+A profiled request records its SQL queries with timings, its cache calls and
+a sampled stack profile. Profiles are kept in a ring buffer in the default
+cache, shared by every process when Redis is configured, and browsed at
+/meta-admin/profiling/.
+"""
+import collections
+import logging
+import sys
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache, caches
+from django.db import connections
+from django.utils import timezone
+
+from meta_project.green import is_green
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Meta-Profile'
+PROFILE_ID_HEADER = 'X-Meta-Profile-Id'
+TOKEN_SALT = 'meta_project.profiling'
+DEFAULTS = {
+    'enabled': True,
+    'buffer_size': 200,
+    'entry_ttl': 24 * 3600,
+    'sample_interval': 0.005,
+    'token_max_age': 3600,
+    'flag_poll_interval': 5,
+}
+# Per-profile caps so one pathological request cannot fill the cache entry
+MAX_QUERIES = 500
+MAX_CACHE_CALLS = 500
+MAX_STACKS = 25
+STACK_DEPTH = 30
+CACHE_METHODS = ('get', 'set', 'add', 'delete', 'get_many', 'set_many', 'delete_many', 'incr', 'decr', 'touch')
+
+SEQUENCE_KEY = 'profiling:seq'
+FLAG_KEY = 'profiling:flag'
+FLAG_COUNT_KEY = 'profiling:flag:count'
+
+
+def profiling_config():
+    return {**DEFAULTS, **getattr(settings, 'META_PROFILING', {})}
+
+
+def create_token(label):
+    """Value for the X-Meta-Profile header; valid for token_max_age seconds."""
+    return signing.dumps({'by': label}, salt=TOKEN_SALT)
+
+
+def check_token(value, max_age):
+    """The label a header token was issued for, or None when it is invalid or expired."""
+    try:
+        return signing.loads(value, salt=TOKEN_SALT, max_age=max_age).get('by', '')
+    except signing.BadSignature:
+        return None
+
+
+# --- Admin flag: profile the next requests under a path prefix ---------------
+
+def set_flag(path_prefix, max_requests, minutes):
+    cache.set(FLAG_KEY, {
+        'path_prefix': path_prefix, 'max_requests': max_requests, 'until': time.time() + minutes * 60,
+    }, minutes * 60)
+    cache.set(FLAG_COUNT_KEY, 0, minutes * 60)
+
+
+def clear_flag():
+    cache.delete_many([FLAG_KEY, FLAG_COUNT_KEY])
+
+
+def get_flag():
+    flag = cache.get(FLAG_KEY)
+    if flag is None:
+        return None
+    return {**flag, 'profiled': cache.get(FLAG_COUNT_KEY) or 0}
+
+
+class FlagPoller:
+    """Process-local copy of the admin flag, refreshed from the cache at most every `interval` seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._flag = None
+        self._checked = float('-inf')
+
+    def matches(self, path):
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            self._checked = now
+            self._flag = cache.get(FLAG_KEY)
+        flag = self._flag
+        if flag is None or time.time() > flag['until'] or not path.startswith(flag['path_prefix']):
+            return False
+        try:
+            return cache.incr(FLAG_COUNT_KEY) <= flag['max_requests']
+        except ValueError:
+            # The flag was cleared or expired since the last poll
+            self._flag = None
+            return False
+
+
+# --- Ring buffer -------------------------------------------------------------
+
+def store_profile(profile, config):
+    """Write a profile into the next ring buffer slot and return its id."""
+    cache.add(SEQUENCE_KEY, 0, None)
+    profile_id = cache.incr(SEQUENCE_KEY)
+    profile['id'] = profile_id
+    cache.set(f"profiling:entry:{profile_id % config['buffer_size']}", profile, config['entry_ttl'])
+    return profile_id
+
+
+def list_profiles():
+    """Every buffered profile, newest first."""
+    size = profiling_config()['buffer_size']
+    entries = cache.get_many([f'profiling:entry:{slot}' for slot in range(size)])
+    return sorted(entries.values(), key=lambda profile: profile['id'], reverse=True)
+
+
+def get_profile(profile_id):
+    size = profiling_config()['buffer_size']
+    profile = cache.get(f'profiling:entry:{profile_id % size}')
+    return profile if profile is not None and profile['id'] == profile_id else None
+
+
+# --- Recording ---------------------------------------------------------------
+
+def _native_thread_tools():
+    """Real OS thread start/ident/sleep/lock, also when gevent has patched them."""
+    if is_green():
+        from gevent.monkey import get_original
+        return (get_original('_thread', 'start_new_thread'), get_original('_thread', 'get_ident'),
+                get_original('time', 'sleep'), get_original('_thread', 'allocate_lock'))
+    import _thread
+    return _thread.start_new_thread, _thread.get_ident, time.sleep, _thread.allocate_lock
+
+
+class StackSampler:
+    """Samples the stack of one thread every `interval` seconds from a native helper thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = False
+        self._running = None
+
+    def start(self):
+        start_new_thread, get_ident, self._sleep, allocate_lock = _native_thread_tools()
+        self._target = get_ident()
+        # Held by the helper thread while it runs; a native lock so stop() blocks the
+        # real thread (not just the greenlet) until the last sample is written
+        self._running = allocate_lock()
+        self._running.acquire()
+        start_new_thread(self._run, ())
+
+    def stop(self):
+        """Stop sampling and wait for the helper thread, so `samples` is no longer written to."""
+        self._stop = True
+        if self._running is not None:
+            self._running.acquire()
+            self._running.release()
+
+    def _run(self):
+        try:
+            while not self._stop:
+                frame = sys._current_frames().get(self._target)
+                if frame is not None:
+                    stack = []
+                    while frame is not None and len(stack) < STACK_DEPTH:
+                        code = frame.f_code
+                        stack.append(f"{code.co_filename.rsplit('/', 2)[-1]}:{code.co_name}:{frame.f_lineno}")
+                        frame = frame.f_back
+                    self.samples[tuple(reversed(stack))] += 1
+                self._sleep(self.interval)
+        finally:
+            self._running.release()
+
+    def top(self):
+        return [{'stack': list(stack), 'samples': count} for stack, count in self.samples.most_common(MAX_STACKS)]
+
+
+class RequestProfiler:
+    """
+    Context manager recording one request. SQL goes through an execute
+    wrapper on every connection; cache calls through wrappers set on this
+    thread's cache instances only, removed again on exit.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.queries = []
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.cache_calls = []
+        self.cache_seconds = 0.0
+        self._cache_depth = 0
+        self._patched = []
+        self._stack = ExitStack()
+        self.sampler = StackSampler(config['sample_interval']) if config['sample_interval'] else None
+
+    def __enter__(self):
+        self.started_at = timezone.now()
+        self.started = time.perf_counter()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._record_query))
+        for alias in settings.CACHES:
+            instance = caches[alias]
+            for method in CACHE_METHODS:
+                if hasattr(instance, method):
+                    setattr(instance, method, self._wrap_cache(alias, method, getattr(instance, method)))
+                    self._patched.append((instance, method))
+        if self.sampler is not None:
+            self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.started
+        if self.sampler is not None:
+            self.sampler.stop()
+        for instance, method in self._patched:
+            instance.__dict__.pop(method, None)
+        self._stack.close()
+
+    def _record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.query_count += 1
+            self.query_seconds += elapsed
+            if len(self.queries) < MAX_QUERIES:
+                # Parameters are not kept: they can hold credentials and personal data
+                self.queries.append({'sql': sql, 'ms': elapsed * 1000, 'many': many})
+
+    def _wrap_cache(self, alias, method, original):
+        def wrapper(*args, **kwargs):
+            # Backends call their own methods (get_many -> get); only the outer call is recorded
+            self._cache_depth += 1
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._cache_depth -= 1
+                if not self._cache_depth:
+                    elapsed = time.perf_counter() - started
+                    self.cache_seconds += elapsed
+                    if len(self.cache_calls) < MAX_CACHE_CALLS:
+                        key = args[0] if args else ''
+                        self.cache_calls.append({
+                            'alias': alias, 'method': method, 'ms': elapsed * 1000,
+                            'key': str(key)[:200] if not isinstance(key, (list, dict)) else f'{len(key)} keys',
+                        })
+        return wrapper
+
+    def result(self, request, response, trigger):
+        repeated = collections.Counter(query['sql'] for query in self.queries)
+        return {
+            'method': request.method,
+            'path': request.get_full_path()[:500],
+            'status': getattr(response, 'status_code', None),
+            'trigger': trigger,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration * 1000,
+            'query_count': self.query_count,
+            'query_ms': self.query_seconds * 1000,
+            'queries': self.queries,
+            'repeated_queries': [{'sql': sql, 'count': count} for sql, count in repeated.most_common(10) if count > 1],
+            'cache_count': len(self.cache_calls),
+            'cache_ms': self.cache_seconds * 1000,
+            'cache_calls': self.cache_calls,
+            'stacks': self.sampler.top() if self.sampler is not None else [],
+            'stack_samples': sum(self.sampler.samples.values()) if self.sampler is not None else 0,
+        }
@@ -1,13 +1,18 @@
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
-from meta_project.config import load_config
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
+
+from meta_project.config import CONFIG_FILE, load_config
+from meta_project.green import server_mode
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# CONFIG = load_config("config.toml")
-CONFIG = load_config("config_dev.toml")
+# The config file is chosen in meta_project/config.py (META_CONFIG_FILE overrides it)
+CONFIG = load_config(CONFIG_FILE)
 
 
 # Quick-start development settings - unsuitable for production
@@ -38,6 +43,8 @@ if CONFIG['settings'].get('allowed_hosts', None):
         ])
 
 CORS_ALLOW_ALL_ORIGINS = True
+# Retried mutations carry an Idempotency-Key (meta_project/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 CSRF_COOKIE_SECURE = False
 CSRF_COOKIE_HTTPONLY = False
@@ -80,15 +87,41 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'meta_project.middleware.profiling.ProfilingMiddleware',
+    'meta_project.middleware.admission.AdmissionControlMiddleware',
+    'meta_project.middleware.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'meta_project.middleware.routing.FullStackMiddleware',
+]
+
+# Session/CSRF/auth/messages only run for the admin site; token-authenticated
+# API routes skip them (see meta_project/middleware/routing.py).
+FULL_STACK_PATH_PREFIXES = ['/meta-admin/']
+FULL_STACK_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# The admin checks look for these middleware in MIDDLEWARE only; they are
+# provided through FULL_STACK_MIDDLEWARE instead.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# Admin changelist tuned for multi-million row tables (see meta_api_app/admin/game_account.py)
+ADMIN_LARGE_TABLE_MODE = CONFIG['settings'].get('admin_large_table_mode', True)
+
+# Response compression (see meta_project/middleware/compression.py)
+META_COMPRESSION = CONFIG.get('compression', {})
+
+# In-flight limits and per-client token buckets per route class (see meta_project/middleware/admission.py)
+META_ADMISSION = CONFIG.get('admission', {})
+
+# Opt-in per-request SQL, cache and stack profiling (see meta_project/middleware/profiling.py)
+META_PROFILING = CONFIG.get('profiling', {})
+
 ROOT_URLCONF = 'meta_project.urls'
 
 TEMPLATES = [
@@ -109,9 +142,26 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'meta_project.wsgi.application'
 
+# Prime URL resolvers, database and cache connections before /ready/ reports ready
+WARMUP_ON_START = CONFIG['settings'].get('warmup_on_start', True)
+
+# Cooperative server mode (manage.py rungevent); patching is done in meta_project/green.py
+GEVENT_POOL_SIZE = CONFIG['settings'].get('gevent_pool_size', 1000)
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Django keeps one connection per thread, i.e. per greenlet under gevent, so
+# persistent connections would grow up to gevent_pool_size and exhaust
+# PostgreSQL's max_connections. In gevent mode connections are closed after
+# each request unless db_pooler says a pooler (pgbouncer) sits in front.
+# (Settings can be imported while gevent is still patching, so the mode is read
+# from the configuration rather than from is_green().)
+DB_CONN_MAX_AGE = CONFIG['settings'].get('db_conn_max_age', 0)
+GEVENT_MODE = server_mode() == 'gevent' or sys.argv[1:2] == ['rungevent']
+if GEVENT_MODE and not CONFIG['settings'].get('db_pooler', False):
+    DB_CONN_MAX_AGE = 0
+
 SQLITE = CONFIG['settings']['use_sqlite']
 if DEBUG and SQLITE:
     DATABASES = {
@@ -129,9 +179,36 @@ else:
             'PASSWORD': CONFIG['settings']['db_password'],  # password
             'HOST': CONFIG['settings']['db_host'],          # DB Server IP
             'PORT': CONFIG['settings']['db_port'],          # DB Server port
+            # Persistent connections let warm-up and earlier requests be reused
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+# Optional hash sharding of GameAccount by id (see meta_api_app/services/sharding.py).
+# Each shard other than "default" is a [sharding.databases.<alias>] table: a
+# SQLite file name in DEBUG/SQLite mode, PostgreSQL settings otherwise.
+META_SHARDING = CONFIG.get('sharding', {})
+if META_SHARDING.get('enabled'):
+    for alias in META_SHARDING.get('shards', ['default']):
+        if alias == 'default':
+            continue
+        options = META_SHARDING.get('databases', {}).get(alias)
+        if options is None:
+            raise ImproperlyConfigured(f"Shard '{alias}' has no [sharding.databases.{alias}] section.")
+        if DEBUG and SQLITE:
+            DATABASES[alias] = {**DATABASES['default'], 'NAME': os.path.join(BASE_DIR, options['db_name'])}
+        else:
+            DATABASES[alias] = {
+                **DATABASES['default'],
+                'NAME': options['db_name'],
+                'USER': options.get('db_user', DATABASES['default']['USER']),
+                'PASSWORD': options.get('db_password', DATABASES['default']['PASSWORD']),
+                'HOST': options.get('db_host', DATABASES['default']['HOST']),
+                'PORT': options.get('db_port', DATABASES['default']['PORT']),
+            }
+    DATABASE_ROUTERS = ['meta_api_app.routers.AccountShardRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -183,8 +260,48 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
-CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 4
+# Tasks go to the broker (memory:// runs them on an in-process thread, see
+# meta_api_app/tasks/dispatch.py); meta_project.settings_test runs them inline
+CELERY_TASK_ALWAYS_EAGER = CONFIG['settings'].get('celery_always_eager', False)
 CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULE = {
+    # Snapshot today's and yesterday's activity bitmaps into DailyActivity
+    'rollup-activity': {
+        'task': 'meta_api_app.tasks.activity.rollup_activity',
+        'schedule': 3600.0,
+    },
+}
+
+# Small side-effect events (logins, analytics) are grouped into one task per batch
+META_TASK_BATCH_SIZE = CONFIG['settings'].get('task_batch_size', 200)
+META_TASK_BATCH_MAX_DELAY = CONFIG['settings'].get('task_batch_max_delay', 2.0)
+
+# Daily activity bitmaps live in Redis when the Redis cache is used, otherwise in-process
+META_ACTIVITY_REDIS_URL = CONFIG['settings'].get('redis_broker_url') if CONFIG['settings'].get('use_redis_cache', False) else None
+
+# Admission token buckets are shared through Redis when the Redis cache is used
+META_RATE_LIMIT_REDIS_URL = META_ACTIVITY_REDIS_URL
+
+# Responses stored per Idempotency-Key, and how long a duplicate waits for an in-flight request
+META_IDEMPOTENCY_TTL = CONFIG['settings'].get('idempotency_ttl', 24 * 3600)
+META_IDEMPOTENCY_WAIT = CONFIG['settings'].get('idempotency_wait', 5)
+
+# Token signing: HS256 with SECRET_KEY, or EdDSA/ES256 keys with a published JWKS (meta_api_app/jwt_keys.py)
+META_JWT = CONFIG.get('jwt', {})
+
+# Verified token payloads kept in-process (entries, seconds), shared by authentication and introspection
+META_TOKEN_DECODE_CACHE_SIZE = CONFIG['settings'].get('token_decode_cache_size', 10000)
+META_TOKEN_DECODE_CACHE_TTL = CONFIG['settings'].get('token_decode_cache_ttl', 60)
+# Largest token list accepted by one introspection call
+META_INTROSPECT_MAX_TOKENS = CONFIG['settings'].get('introspect_max_tokens', 256)
+
+# Accounts without a login for this many days are moved to the archive table (manage.py archive_accounts)
+META_ARCHIVE_IDLE_DAYS = CONFIG['settings'].get('archive_idle_days', 365)
+
+# Seconds a player's friend id set stays cached (0 reads the edge table every time)
+META_FRIEND_CACHE_TIMEOUT = CONFIG['settings'].get('friend_cache_timeout', 300)
 
 # CACHE SETTINGS
 if CONFIG['settings'].get('use_redis_cache', False):
@@ -209,6 +326,19 @@ else:
         }
     }
 
+# Presence heartbeats (meta_api_app/services/presence.py) never touch the database:
+# they share the Redis cache under their own prefix, or use a bounded in-process cache
+META_PRESENCE_TTL = CONFIG['settings'].get('presence_ttl', 90)
+if CONFIG['settings'].get('use_redis_cache', False):
+    CACHES['presence'] = {**CACHES['default'], 'KEY_PREFIX': 'presence', 'TIMEOUT': META_PRESENCE_TTL}
+else:
+    CACHES['presence'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'presence',
+        'TIMEOUT': META_PRESENCE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': CONFIG['settings'].get('presence_max_entries', 100000)},
+    }
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -258,6 +388,11 @@ LOGGING = {
             'level': CONFIG['logging']['level'],
             'propagate': True,
         },
+        'meta_api_app.analytics': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -0,0 +1,43 @@
+"""
+API-only settings profile for autoscaled API pods.
+
+Drops the admin, sessions, messages, static files, templates and the
+token blacklist from the app registry so a cold pod imports and readies
+less. The admin site is served by pods running meta_project.settings.
+
+Use with DJANGO_SETTINGS_MODULE=meta_project.settings_api.
+"""
+from meta_project.settings import *  # noqa: F401,F403
+
+API_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework_simplejwt.token_blacklist',
+    'django_filters',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]  # noqa: F405
+
+ROOT_URLCONF = 'meta_project.urls_api'
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE  # noqa: F405
+    if middleware != 'meta_project.middleware.routing.FullStackMiddleware'
+]
+FULL_STACK_MIDDLEWARE = []
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'meta_api_app.authentication.MetaJWTAuthentication',
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+SILENCED_SYSTEM_CHECKS = []
@@ -0,0 +1,30 @@
+"""
+Settings profile for the test suite.
+
+Celery tasks run inline, and activity bitmaps, admission token buckets and
+caches use their in-process stand-ins, so tests need neither a broker nor
+Redis. A second database alias serves as an extra account shard.
+`manage.py test` selects it unless DJANGO_SETTINGS_MODULE is set.
+"""
+from meta_project.settings import *  # noqa: F401,F403
+
+CELERY_TASK_ALWAYS_EAGER = True
+
+META_ACTIVITY_REDIS_URL = None
+META_RATE_LIMIT_REDIS_URL = None
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'presence': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'presence',
+        'TIMEOUT': META_PRESENCE_TTL,  # noqa: F405
+    },
+}
+
+# Second account shard for the sharding tests, which enable [sharding] with
+# override_settings; created only for test cases that list it in `databases`
+DATABASES['shard1'] = {  # noqa: F405
+    **DATABASES['default'],  # noqa: F405
+    'TEST': {'NAME': None if SQLITE else f"test_{DATABASES['default']['NAME']}_shard1"},  # noqa: F405
+}
@@ -1,32 +1,12 @@
 from django.contrib import admin
-from django.http import JsonResponse
-from django.urls import path
+from django.urls import include, path
 
-from meta_api_app.views import MetaTokenObtainView, MetaTokenRefreshView
-# Import game account views
-from meta_api_app.views.game_account import (
-    GameAccountRegisterView, GameAccountLoginView,
-    GameAccountProfileView, GameAccountLogoutView  # New class-based views
-)
-
-# Health check endpoint for monitoring
-def health_check(request):
-    return JsonResponse({"status": "ok"})
-
-urlpatterns = [
-    # Health check endpoint
-    path('health/', health_check, name='health-check'),
-
-    # Meta Token endpoints
-    path('api/token/', MetaTokenObtainView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', MetaTokenRefreshView.as_view(), name='token_refresh'),
-
-    # Game Account Authentication endpoints
-    path('api/game/register/', GameAccountRegisterView.as_view(), name='game_register'),
-    path('api/game/login/', GameAccountLoginView.as_view(), name='game_login'),
-    path('api/game/logout/', GameAccountLogoutView.as_view(), name='game_logout'),
-    path('api/game/profile/', GameAccountProfileView.as_view(), name='game_profile'),
+from meta_project.urls_api import urlpatterns as api_urlpatterns
 
+urlpatterns = api_urlpatterns + [
+    # Request profiles and compression totals, ahead of the admin catch-all
+    path('meta-admin/profiling/', include('meta_api_app.admin.profiling')),
+    path('meta-admin/compression/', include('meta_api_app.admin.compression')),
     # Django Admin (renamed to avoid confusion)
     path('meta-admin/', admin.site.urls),
 ]
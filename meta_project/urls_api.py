@@ -0,0 +1,64 @@
+from django.http import JsonResponse
+from django.urls import path
+
+from meta_api_app.views import MetaTokenObtainView, MetaTokenRefreshView, TokenIntrospectionView, jwks_view
+# Import game account views
+from meta_api_app.views.game_account import (
+    GameAccountRegisterView, GameAccountLoginView,
+    GameAccountProfileView, GameAccountLogoutView,  # New class-based views
+    GameAccountProfileUpdateView
+)
+from meta_api_app.views.friends import FriendDetailView, FriendListView, MutualFriendsView
+from meta_api_app.views.guild import GuildLeaderboardView, GuildListView
+from meta_api_app.views.player_search import PlayerSearchView
+from meta_api_app.views.presence import FriendsOnlineView, PresenceHeartbeatView, PresenceQueryView
+from meta_project.warmup import check_ready
+
+# Health check endpoint for monitoring
+def health_check(request):
+    return JsonResponse({"status": "ok"})
+
+# Readiness endpoint: 503 until the process has been warmed up (retried here after a failure)
+def readiness_check(request):
+    if not check_ready():
+        return JsonResponse({"status": "warming up"}, status=503)
+    return JsonResponse({"status": "ready"})
+
+# URL patterns served by both the full and the API-only settings profiles
+urlpatterns = [
+    # Health check endpoints
+    path('health/', health_check, name='health-check'),
+    path('ready/', readiness_check, name='readiness-check'),
+
+    # Meta Token endpoints
+    path('api/token/', MetaTokenObtainView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', MetaTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/introspect/', TokenIntrospectionView.as_view(), name='token_introspect'),
+    path('.well-known/jwks.json', jwks_view, name='jwks'),
+
+    # Game Account Authentication endpoints
+    path('api/game/register/', GameAccountRegisterView.as_view(), name='game_register'),
+    path('api/game/login/', GameAccountLoginView.as_view(), name='game_login'),
+    path('api/game/logout/', GameAccountLogoutView.as_view(), name='game_logout'),
+    path('api/game/profile/', GameAccountProfileView.as_view(), name='game_profile'),
+
+    # Player search
+    path('api/game/players/search/', PlayerSearchView.as_view(), name='player_search'),
+
+    # Account profile (PATCH with optimistic concurrency)
+    path('api/game/accounts/<int:account_id>/profile/', GameAccountProfileUpdateView.as_view(), name='account_profile'),
+
+    # Friends
+    path('api/game/accounts/<int:account_id>/friends/', FriendListView.as_view(), name='friend_list'),
+    path('api/game/accounts/<int:account_id>/friends/<int:friend_id>/', FriendDetailView.as_view(), name='friend_detail'),
+    path('api/game/accounts/<int:account_id>/friends/mutual/<int:other_id>/', MutualFriendsView.as_view(), name='mutual_friends'),
+    path('api/game/accounts/<int:account_id>/friends/online/', FriendsOnlineView.as_view(), name='friends_online'),
+
+    # Presence (cache only, no database writes)
+    path('api/game/accounts/<int:account_id>/presence/', PresenceHeartbeatView.as_view(), name='presence_heartbeat'),
+    path('api/game/presence/', PresenceQueryView.as_view(), name='presence_query'),
+
+    # Guilds
+    path('api/game/guilds/', GuildListView.as_view(), name='guild_list'),
+    path('api/game/guilds/leaderboard/', GuildLeaderboardView.as_view(), name='guild_leaderboard'),
+]
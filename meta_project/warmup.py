@@ -0,0 +1,97 @@
+import io
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Seconds between warm-up attempts made by the readiness check after a failure
+RETRY_INTERVAL = 5
+
+_ready = threading.Event()
+_attempt_lock = threading.Lock()
+_last_attempt = float('-inf')
+
+
+def is_ready():
+    """True once warmed up, and always when warm-up is disabled (warmup_on_start = false)."""
+    return _ready.is_set() or not settings.WARMUP_ON_START
+
+
+def check_ready():
+    """
+    is_ready(), warming up on the spot when the process is not ready yet: the
+    startup warm-up failed (database or cache unreachable) or never ran (runserver).
+    Attempts are spaced RETRY_INTERVAL seconds apart and never run concurrently.
+    """
+    if is_ready():
+        return True
+    if not _attempt_lock.acquire(blocking=False):
+        return False
+    try:
+        if time.monotonic() - _last_attempt < RETRY_INTERVAL:
+            return False
+        return warm_up()
+    finally:
+        _attempt_lock.release()
+
+
+def warm_up(application=None):
+    """
+    Prime the process before it reports ready: URL resolver and view imports,
+    one request through the middleware chain (given the WSGI application),
+    then database and cache connections.
+    """
+    global _last_attempt
+    _last_attempt = time.monotonic()
+    started = time.perf_counter()
+    timings = {}
+
+    step = time.perf_counter()
+    resolver = get_resolver()
+    resolver.url_patterns  # imports every view module
+    resolver.reverse_dict  # builds the reverse lookup tables
+    timings['urls'] = time.perf_counter() - step
+
+    # Runs before the connections are primed: request_finished closes them
+    if application is not None:
+        step = time.perf_counter()
+        host = settings.ALLOWED_HOSTS[0]
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': '/health/', 'SCRIPT_NAME': '',
+            'SERVER_NAME': host, 'SERVER_PORT': '80', 'HTTP_HOST': host,
+            'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+        }
+        response = application(environ, lambda status, headers, exc_info=None: None)
+        response.close()
+        timings['first_request'] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except Exception as e:
+            logger.error(f"warm_up could not connect to database '{alias}': {str(e)}")
+            return False
+    timings['databases'] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    for alias in settings.CACHES:
+        try:
+            caches[alias].get('meta:warmup')
+        except Exception as e:
+            logger.error(f"warm_up could not reach cache '{alias}': {str(e)}")
+            return False
+    timings['caches'] = time.perf_counter() - step
+
+    _ready.set()
+    logger.info(
+        f"warm_up finished in {(time.perf_counter() - started) * 1000:.1f} ms "
+        + ' '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items())
+    )
+    return True